@@ -1,159 +1,768 @@
 import sys
 import os
+import ast
 import json
+import queue
+import re
 import sqlite3
 import markdown
+import numpy as np
 import csv
+import codecs
+import hashlib
 import subprocess
 import shutil
-from datetime import datetime
-from PyQt6.QtCore import Qt, QSize, QTimer, QSettings, QUrl
+import threading
+import time
+import zipfile
+import zlib
+import operator
+from array import array
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape as xml_escape
+from PyQt6.QtCore import (Qt, QSize, QTimer, QSettings, QUrl, QAbstractListModel, QAbstractTableModel, QModelIndex,
+                          QThread, pyqtSignal)
 from PyQt6.QtGui import (QIcon, QFont, QAction, QKeySequence, QShortcut,QDesktopServices, QPixmap, QImage, QImageReader)
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QStackedWidget, QLineEdit, QTextEdit,
-                             QListWidget, QListWidgetItem, QComboBox, QFileDialog, QMessageBox,QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView, QToolBar,
-                             QStatusBar, QDialog, QFormLayout, QSpinBox, QCheckBox, QGroupBox, QScrollArea, QFrame, QSplitter, QSizePolicy, QSystemTrayIcon, QMenu,  QProgressBar)
+                             QListWidget, QListWidgetItem, QListView, QComboBox, QFileDialog, QMessageBox,QTabWidget, QTableWidget, QTableWidgetItem, QTableView, QHeaderView, QToolBar,
+                             QStatusBar, QDialog, QFormLayout, QSpinBox, QCheckBox, QGroupBox, QScrollArea, QFrame, QSplitter, QSizePolicy, QSystemTrayIcon, QMenu,  QProgressBar,
+                             QProgressDialog)
+
+# Células grandes (textos longos) em CSVs importados; definido uma vez para o processo
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
 
 class DatabaseManager:
     """Classe para gerenciamento completo do banco de dados SQLite"""
-    def __init__(self):
-        self.db_path = os.path.join(os.path.expanduser("~"), "AutomatePro", "automate_pro.db")
+    # Pragmas aplicados a cada conexão do pool
+    PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",
+        "PRAGMA mmap_size = 134217728",
+    )
+    # Tabelas indexadas pela busca global: código do módulo, nome do módulo,
+    # expressão do título e expressão do corpo ({t} é a tabela ou new/old)
+    SEARCH_SOURCES = {
+        'projects': (1, 'projects', "{t}.name",
+                     "coalesce({t}.description, '') || ' ' || coalesce({t}.tags, '')"),
+        'notes': (2, 'notes', "{t}.title",
+                  "coalesce({t}.content, '') || ' ' || coalesce({t}.tags, '')"),
+        'custom_commands': (3, 'commands', "{t}.name",
+                            "coalesce({t}.command, '') || ' ' || coalesce({t}.category, '') || ' ' || coalesce({t}.tags, '')"),
+        'utilities': (4, 'utilities', "{t}.name",
+                      "coalesce({t}.path, '') || ' ' || coalesce({t}.command, '')"),
+        'spreadsheets': (5, 'spreadsheets', "{t}.name",
+                         "replace(coalesce({t}.headers, ''), char(10), ' ')"),
+    }
+    def __init__(self, db_path=None, pool_size=4, statement_cache_size=256):
+        self.db_path = db_path or os.path.join(os.path.expanduser("~"), "AutomatePro", "automate_pro.db")
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.pool_size = pool_size
+        self.statement_cache_size = statement_cache_size
+        self._pool = []
+        self._connections = []
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self.history_writer = None
+        self.changes = ChangeBus()
         self.init_db()
+    def _connect(self):
+        """Abre uma nova conexão configurada para o pool"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    def _acquire(self):
+        """Obtém uma conexão do pool (ou a conexão fixada na thread atual)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        with self._pool_lock:
+            if self._pool:
+                return self._pool.pop()
+        conn = self._connect()
+        with self._pool_lock:
+            self._connections.append(conn)
+        return conn
+    def _release(self, conn):
+        """Devolve uma conexão ao pool"""
+        if getattr(self._local, 'conn', None) is conn:
+            return
+        with self._pool_lock:
+            if len(self._pool) < self.pool_size:
+                self._pool.append(conn)
+                return
+            self._connections.remove(conn)
+        conn.close()
+    def close(self):
+        """Grava o histórico pendente e fecha todas as conexões abertas pelo pool"""
+        if self.history_writer is not None:
+            self.history_writer.close()
+            self.history_writer = None
+        with self._pool_lock:
+            connections, self._connections, self._pool = self._connections, [], []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+    def backup_to(self, backup_file):
+        """Copia o banco para outro arquivo usando a API de backup do SQLite"""
+        conn = self._acquire()
+        try:
+            target = sqlite3.connect(backup_file)
+            try:
+                conn.backup(target)
+            finally:
+                target.close()
+        finally:
+            self._release(conn)
+    def restore_from(self, backup_file):
+        """Substitui o conteúdo do banco pelo de um arquivo de backup"""
+        conn = self._acquire()
+        try:
+            source = sqlite3.connect(backup_file)
+            try:
+                source.backup(conn)
+            finally:
+                source.close()
+            # Backups de versões anteriores chegam sem as migrações mais novas
+            self.migrate(conn)
+        finally:
+            self._release(conn)
     def init_db(self):
-        """Inicializa o banco de dados com todas as tabelas necessárias"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Tabela de projetos
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS downloads (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL,
-                    type TEXT NOT NULL,  -- 'video', 'audio', 'file'
-                    format TEXT,
-                    quality TEXT,
-                    save_path TEXT,
-                    status TEXT DEFAULT 'pending',  -- 'pending', 'downloading', 'paused', 'completed', 'failed', 'cancelled'
-                    progress REAL DEFAULT 0,
-                    total_size INTEGER,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Tabela de planilhas
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS spreadsheets (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    headers TEXT,
-                    data TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # Tabela de anotações
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    content TEXT,
-                    tags TEXT,
-                    is_favorite BOOLEAN DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+        """Inicializa o banco de dados e aplica as migrações pendentes"""
+        conn = self._acquire()
+        try:
+            # Só tem efeito em bancos novos (antes da primeira tabela); bancos
+            # existentes mantêm o modo atual, sem o VACUUM completo da conversão
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # WAL é persistente no arquivo: basta ativar uma vez
+            conn.execute("PRAGMA journal_mode = WAL")
+            self.migrate(conn)
+            self.fts_available = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'search_index'"
+            ).fetchone() is not None
+        finally:
+            self._release(conn)
+    def migrate(self, conn):
+        """Aplica em ordem as migrações com versão maior que PRAGMA user_version.
+
+        Cada migração roda na sua própria transação junto com a atualização de
+        user_version. Quando o banco já está na versão atual nada é executado.
+        """
+        latest = len(self.MIGRATIONS)
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= latest:
+            return latest
 
-            # Tabela de utilitários
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS utilities (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    type TEXT NOT NULL,  -- 'app', 'site', 'command'
-                    path TEXT,
-                    command TEXT,
-                    is_favorite BOOLEAN DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        for version, (description, migration) in enumerate(self.MIGRATIONS, start=1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                # Reler a versão dentro da transação: outra instância pode ter migrado antes
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                migration(self, conn.cursor())
+                conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise Exception(f"Falha na migração {version} ({description}): {str(e)}")
+        return latest
+    def _migration_base_schema(self, cursor):
+        """Migração 1: tabelas originais do sistema e índice de busca"""
+        # Tabela de downloads
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS downloads (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                type TEXT NOT NULL,  -- 'video', 'audio', 'file'
+                format TEXT,
+                quality TEXT,
+                save_path TEXT,
+                status TEXT DEFAULT 'pending',  -- 'pending', 'downloading', 'paused', 'completed', 'failed', 'cancelled'
+                progress REAL DEFAULT 0,
+                total_size INTEGER,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de planilhas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS spreadsheets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                headers TEXT,
+                data TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de anotações
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                content TEXT,
+                tags TEXT,
+                is_favorite BOOLEAN DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de utilitários
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS utilities (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type TEXT NOT NULL,  -- 'app', 'site', 'command'
+                path TEXT,
+                command TEXT,
+                is_favorite BOOLEAN DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de comandos personalizados
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS custom_commands (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                command TEXT NOT NULL,
+                category TEXT,
+                tags TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de configurações
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                value TEXT
+            )
+        ''')
+
+        # Tabela de usuários
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password TEXT NOT NULL,
+                is_admin BOOLEAN DEFAULT 0,
+                theme TEXT DEFAULT 'dark',
+                language TEXT DEFAULT 'pt',
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de lembretes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT,
+                due_date TEXT,
+                is_completed BOOLEAN DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tabela de histórico
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                action TEXT NOT NULL,
+                module TEXT NOT NULL,
+                details TEXT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Índice de busca textual global
+        self.init_search_index(cursor)
+
+        # Inserir usuário admin padrão se não existir
+        cursor.execute("SELECT * FROM users WHERE username = 'admin'")
+        if not cursor.fetchone():
+            cursor.execute('INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)',
+                           ('admin', 'admin123', 1))
+    def _migration_projects_table(self, cursor):
+        """Migração 2: tabela de projetos (consultada pelo ProjectManager, mas nunca criada)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS projects (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                type TEXT,
+                base_dir TEXT,
+                subfolders TEXT,
+                description TEXT,
+                tags TEXT,
+                is_favorite BOOLEAN DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Indexar a nova tabela na busca global
+        self.init_search_index(cursor)
+    def _migration_filter_indexes(self, cursor):
+        """Migração 3: índices nas colunas usadas em filtros e ordenações"""
+        indexes = {
+            'idx_downloads_status': 'downloads (status)',
+            'idx_downloads_created_at': 'downloads (created_at)',
+            'idx_reminders_pending': 'reminders (is_completed, due_date)',
+            'idx_history_timestamp': 'history (timestamp)',
+            'idx_projects_name': 'projects (name)',
+            'idx_projects_type_name': 'projects (type, name)',
+            'idx_projects_created_at': 'projects (created_at)',
+            'idx_notes_title': 'notes (title)',
+            'idx_utilities_type_name': 'utilities (type, name)',
+            'idx_custom_commands_name': 'custom_commands (name)',
+            'idx_spreadsheets_name': 'spreadsheets (name)',
+        }
+        for name, target in indexes.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    def _migration_history_rollup(self, cursor):
+        """Migração 4: agregados diários do histórico compactado"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS history_daily (
+                day TEXT NOT NULL,
+                module TEXT NOT NULL,
+                action TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, module, action)
+            )
+        ''')
+    def _migration_spreadsheet_chunks(self, cursor):
+        """Migração 5: linhas das planilhas em blocos, convertendo o JSON único antigo"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS spreadsheet_rows (
+                sheet_id INTEGER NOT NULL,
+                chunk_no INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                data BLOB,
+                PRIMARY KEY (sheet_id, chunk_no)
+            ) WITHOUT ROWID
+        ''')
+
+        cursor.execute("PRAGMA table_info(spreadsheets)")
+        if 'row_count' not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE spreadsheets ADD COLUMN row_count INTEGER DEFAULT 0")
+
+        # Converter planilhas gravadas como um único JSON em spreadsheets.data
+        chunk_rows = SpreadsheetManager.CHUNK_ROWS
+        cursor.execute("SELECT id FROM spreadsheets WHERE data IS NOT NULL")
+        for (sheet_id,) in cursor.fetchall():
+            cursor.execute("SELECT data FROM spreadsheets WHERE id = ?", (sheet_id,))
+            blob = cursor.fetchone()[0]
+            rows = json.loads(blob) if blob else []
+            for chunk_no, chunk_start in enumerate(range(0, len(rows), chunk_rows)):
+                chunk = rows[chunk_start:chunk_start + chunk_rows]
+                cursor.execute(
+                    "INSERT OR REPLACE INTO spreadsheet_rows (sheet_id, chunk_no, row_count, data) VALUES (?, ?, ?, ?)",
+                    (sheet_id, chunk_no, len(chunk), SpreadsheetManager.encode_chunk(chunk))
                 )
+            cursor.execute(
+                "UPDATE spreadsheets SET data = NULL, row_count = ? WHERE id = ?",
+                (len(rows), sheet_id)
+            )
+    def _migration_spreadsheet_column_types(self, cursor):
+        """Migração 6: tipos das colunas das planilhas (int, float ou text, um por linha)"""
+        cursor.execute("PRAGMA table_info(spreadsheets)")
+        if 'column_types' not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE spreadsheets ADD COLUMN column_types TEXT")
+    def _migration_spreadsheet_changes(self, cursor):
+        """Migração 7: diário de alterações de células das planilhas (desfazer/refazer)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS spreadsheet_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sheet_id INTEGER NOT NULL,
+                cells TEXT NOT NULL,
+                undone INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_spreadsheet_changes_sheet ON spreadsheet_changes(sheet_id, undone, id)"
+        )
+    def _migration_json_migration_map(self, cursor):
+        """Migração 8: registros já trazidos dos arquivos JSON do app.py (JsonMigrator)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS json_migration_map (
+                source TEXT NOT NULL,
+                collection TEXT NOT NULL,
+                source_id INTEGER NOT NULL,
+                target_id INTEGER NOT NULL,
+                PRIMARY KEY (source, collection, source_id)
+            ) WITHOUT ROWID
+        ''')
+    # Tabelas cujo total de linhas é mantido por triggers em table_counts
+    COUNTED_TABLES = ('projects', 'spreadsheets', 'notes', 'utilities', 'custom_commands')
+    def _migration_table_counts(self, cursor):
+        """Migração 9: totais de linhas das tabelas do dashboard, mantidos por triggers"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS table_counts (
+                name TEXT PRIMARY KEY,
+                count INTEGER NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        for table in self.COUNTED_TABLES:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO table_counts (name, count) SELECT '{table}', COUNT(*) FROM {table}"
+            )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} BEGIN
+                    UPDATE table_counts SET count = count + 1 WHERE name = '{table}';
+                END
             ''')
-
-            # Tabela de comandos personalizados
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS custom_commands (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    command TEXT NOT NULL,
-                    category TEXT,
-                    tags TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} BEGIN
+                    UPDATE table_counts SET count = count - 1 WHERE name = '{table}';
+                END
             ''')
+    def _migration_download_queue(self, cursor):
+        """Migração 10: prioridade dos downloads e índice da fila do DownloadScheduler"""
+        cursor.execute("PRAGMA table_info(downloads)")
+        if 'priority' not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE downloads ADD COLUMN priority INTEGER DEFAULT 0")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_downloads_queue ON downloads(status, priority DESC, id)"
+        )
+    def _migration_download_resume(self, cursor):
+        """Migração 11: bytes já baixados e validadores HTTP para retomar downloads com Range"""
+        cursor.execute("PRAGMA table_info(downloads)")
+        existing = {column[1] for column in cursor.fetchall()}
+        for column, definition in (('downloaded_bytes', 'INTEGER DEFAULT 0'),
+                                   ('etag', 'TEXT'),
+                                   ('last_modified', 'TEXT')):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE downloads ADD COLUMN {column} {definition}")
+    def _migration_download_segments(self, cursor):
+        """Migração 12: trechos que faltam de downloads segmentados pausados (JSON [[início, fim], ...])"""
+        cursor.execute("PRAGMA table_info(downloads)")
+        if 'segments' not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE downloads ADD COLUMN segments TEXT")
+    def _migration_download_contents(self, cursor):
+        """Migração 13: caminho e SHA-256 dos downloads e índice de conteúdo para deduplicação"""
+        cursor.execute("PRAGMA table_info(downloads)")
+        existing = {column[1] for column in cursor.fetchall()}
+        for column in ('file_path', 'sha256', 'expected_sha256'):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE downloads ADD COLUMN {column} TEXT")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS download_contents (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_url ON downloads(url, status)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_downloads_file_path ON downloads(file_path)")
+    def _migration_download_contents_mtime(self, cursor):
+        """Migração 14: mtime dos arquivos do índice de conteúdo, para só reler os que mudaram"""
+        cursor.execute("PRAGMA table_info(download_contents)")
+        if 'mtime_ns' not in {column[1] for column in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE download_contents ADD COLUMN mtime_ns INTEGER")
+    # Migrações em ordem; a versão de cada uma é a sua posição (1, 2, 3...)
+    MIGRATIONS = [
+        ("esquema base", _migration_base_schema),
+        ("tabela de projetos", _migration_projects_table),
+        ("índices de filtros", _migration_filter_indexes),
+        ("agregados do histórico", _migration_history_rollup),
+        ("planilhas em blocos", _migration_spreadsheet_chunks),
+        ("tipos das colunas das planilhas", _migration_spreadsheet_column_types),
+        ("diário de alterações das planilhas", _migration_spreadsheet_changes),
+        ("mapa da migração dos dados JSON", _migration_json_migration_map),
+        ("contadores do dashboard", _migration_table_counts),
+        ("fila de downloads", _migration_download_queue),
+        ("retomada de downloads", _migration_download_resume),
+        ("downloads segmentados", _migration_download_segments),
+        ("conteúdo dos downloads", _migration_download_contents),
+        ("mtime do conteúdo dos downloads", _migration_download_contents_mtime),
+    ]
+    def init_search_index(self, cursor):
+        """Cria o índice FTS5 da busca global e os triggers que o mantêm sincronizado.
+
+        O rowid do índice codifica módulo e id (id * 8 + código do módulo), o que
+        permite que os triggers atualizem e removam entradas sem varrer o índice.
+        Tabelas de origem ainda inexistentes são ignoradas e indexadas quando
+        esta função for chamada novamente após a sua criação.
+        """
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
 
-            # Tabela de configurações
+        try:
             cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    key TEXT NOT NULL UNIQUE,
-                    value TEXT
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                    module UNINDEXED,
+                    item_id UNINDEXED,
+                    title,
+                    body,
+                    tokenize = 'unicode61 remove_diacritics 2'
                 )
             ''')
-
-            # Tabela de usuários
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    password TEXT NOT NULL,
-                    is_admin BOOLEAN DEFAULT 0,
-                    theme TEXT DEFAULT 'dark',
-                    language TEXT DEFAULT 'pt',
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        except sqlite3.OperationalError:
+            # SQLite compilado sem FTS5: a busca global usa LIKE como alternativa
+            self.fts_available = False
+            return
+        self.fts_available = True
+
+        for table, (code, module, title_expr, body_expr) in self.SEARCH_SOURCES.items():
+            if table not in existing:
+                continue
+
+            row_values = f"new.id * 8 + {code}, '{module}', new.id, {title_expr.format(t='new')}, {body_expr.format(t='new')}"
+            if f"{table}_search_ai" not in existing:
+                cursor.execute(
+                    f"INSERT INTO search_index (rowid, module, item_id, title, body) "
+                    f"SELECT id * 8 + {code}, '{module}', id, {title_expr.format(t=table)}, "
+                    f"{body_expr.format(t=table)} FROM {table}"
                 )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO search_index (rowid, module, item_id, title, body) VALUES ({row_values});
+                END
             ''')
-
-            # Tabela de lembretes
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    due_date TEXT,
-                    is_completed BOOLEAN DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} BEGIN
+                    DELETE FROM search_index WHERE rowid = old.id * 8 + {code};
+                    INSERT INTO search_index (rowid, module, item_id, title, body) VALUES ({row_values});
+                END
             ''')
-
-            # Tabela de histórico
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    action TEXT NOT NULL,
-                    module TEXT NOT NULL,
-                    details TEXT,
-                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP
-                )
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN
+                    DELETE FROM search_index WHERE rowid = old.id * 8 + {code};
+                END
             ''')
+    @contextmanager
+    def transaction(self):
+        """Agrupa várias escritas em um único commit.
+
+        Dentro do bloco, execute_query e execute_many usam a conexão fixada na
+        thread atual e não fazem commit; o commit acontece uma única vez na
+        saída do bloco, ou tudo é desfeito em caso de exceção. Blocos
+        aninhados participam da transação mais externa. Os eventos de
+        publish_change feitos dentro do bloco são entregues após o commit.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
 
-            # Inserir usuário admin padrão se não existir
-            cursor.execute('SELECT * FROM users WHERE username = "admin"')
-            if not cursor.fetchone():
-                cursor.execute('INSERT INTO users (username, password, is_admin) VALUES (?, ?, ?)',
-                               ('admin', 'admin123', 1))
-
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.pending_changes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
             conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            changes, self._local.pending_changes = self._local.pending_changes, []
+            self._local.conn = None
+            self._release(conn)
+
+        # Só chega aqui após o commit: transações desfeitas não geram eventos
+        for event in changes:
+            self.changes.publish(event)
+    @contextmanager
+    def interruptible(self, is_cancelled):
+        """Dentro do bloco, as queries desta thread são interrompidas quando is_cancelled() retornar True.
+
+        A query interrompida levanta sqlite3.OperationalError ("interrupted").
+        """
+        self._local.is_cancelled = is_cancelled
+        try:
+            yield
+        finally:
+            self._local.is_cancelled = None
     def execute_query(self, query, params=None, fetchone=False, fetchall=False):
         """Executa uma query no banco de dados"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            conn.commit()
+        conn = self._acquire()
+        in_transaction_block = getattr(self._local, 'conn', None) is conn
+        is_cancelled = getattr(self._local, 'is_cancelled', None)
+        if is_cancelled is not None:
+            conn.set_progress_handler(is_cancelled, 1000)
+        try:
+            cursor = conn.execute(query, params or ())
 
             if fetchone:
-                return cursor.fetchone()
-            if fetchall:
-                return cursor.fetchall()
-            return cursor.lastrowid
+                result = cursor.fetchone()
+            elif fetchall:
+                result = cursor.fetchall()
+            else:
+                result = cursor.lastrowid
+
+            # Leituras não abrem transação, então só há commit após escritas
+            if conn.in_transaction and not in_transaction_block:
+                conn.commit()
+            return result
+        except Exception:
+            if conn.in_transaction and not in_transaction_block:
+                conn.rollback()
+            raise
+        finally:
+            if is_cancelled is not None:
+                conn.set_progress_handler(None, 0)
+            self._release(conn)
+    def execute_many(self, query, params_list):
+        """Executa a mesma query para vários conjuntos de parâmetros em um único commit"""
+        with self.transaction() as conn:
+            return conn.executemany(query, params_list).rowcount
+    def log_history(self, action, module, details):
+        """Registra uma ação na tabela de histórico.
+
+        Dentro de db.transaction() a linha entra na mesma transação da escrita
+        principal (sem custo extra de commit). Fora dela, o evento vai para o
+        HistoryWriter, que grava em lotes numa thread em segundo plano.
+        """
+        if getattr(self._local, 'conn', None) is not None:
+            self.execute_query(
+                '''INSERT INTO history (action, module, details)
+                   VALUES (?, ?, ?)''',
+                (action, module, details)
+            )
+            return
+
+        if self.history_writer is None:
+            with self._pool_lock:
+                if self.history_writer is None:
+                    self.history_writer = HistoryWriter(self)
+        self.history_writer.log(action, module, details)
+    def publish_change(self, entity, item_id, op):
+        """Publica um ChangeEvent no barramento `changes`.
+
+        Dentro de db.transaction() o evento fica retido até o commit (e é
+        descartado no rollback); fora dela é entregue imediatamente.
+        """
+        event = ChangeEvent(entity, item_id, op)
+        if getattr(self._local, 'conn', None) is not None:
+            self._local.pending_changes.append(event)
+        else:
+            self.changes.publish(event)
+    def flush_history(self):
+        """Aguarda a gravação de todos os eventos de histórico pendentes"""
+        if self.history_writer is not None:
+            self.history_writer.flush()
+class HistoryWriter:
+    """Gravador de histórico em segundo plano (write-behind).
+
+    Os eventos entram em uma fila e são gravados em INSERTs de várias linhas,
+    em uma única transação, quando o lote atinge batch_size eventos ou quando
+    passa flush_interval segundos desde o primeiro evento do lote.
+    """
+    _STOP = object()
+    def __init__(self, db, batch_size=500, flush_interval=1.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="HistoryWriter", daemon=True)
+        self._thread.start()
+    def log(self, action, module, details):
+        """Enfileira um evento; o horário é o do evento, não o da gravação"""
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        self.queue.put((action, module, details, timestamp))
+    def flush(self, timeout=10):
+        """Grava imediatamente os eventos enfileirados e aguarda a conclusão"""
+        if not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+    def close(self, timeout=10):
+        """Grava os eventos pendentes e encerra a thread"""
+        if self._thread.is_alive():
+            self.queue.put(self._STOP)
+            self._thread.join(timeout)
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = []
+            waiters = []
+            deadline = time.monotonic() + self.flush_interval
+
+            # Acumular eventos até encher o lote, vencer o prazo ou receber flush/stop
+            while True:
+                if item is self._STOP:
+                    self._write(batch)
+                    for event in waiters:
+                        event.set()
+                    return
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+            for event in waiters:
+                event.set()
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            with self.db.transaction():
+                # Blocos de 200 linhas respeitam o limite de 999 parâmetros de SQLites antigos
+                for start in range(0, len(batch), 200):
+                    rows = batch[start:start + 200]
+                    placeholders = ", ".join(["(?, ?, ?, ?)"] * len(rows))
+                    self.db.execute_query(
+                        f"INSERT INTO history (action, module, details, timestamp) VALUES {placeholders}",
+                        [value for event in rows for value in event]
+                    )
+        except Exception as e:
+            print(f"Erro ao gravar histórico: {str(e)}")
+# Alteração em uma tabela: entity é o nome da tabela, item_id o id da linha
+# (None quando várias linhas mudaram de uma vez) e op 'insert', 'update' ou 'delete'
+ChangeEvent = namedtuple('ChangeEvent', 'entity item_id op')
+class ChangeBus:
+    """Barramento de eventos de alteração dos dados, dentro do processo.
+
+    Os gerenciadores publicam um ChangeEvent por escrita, via
+    DatabaseManager.publish_change, depois do commit; as telas assinam e
+    atualizam só o que mudou. Os assinantes são chamados na thread que fez a
+    escrita e um assinante com erro não impede os demais.
+    """
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+    def subscribe(self, callback):
+        """Registra callback(event) para receber todos os eventos"""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [subscriber for subscriber in self._subscribers if subscriber != callback]
+    def publish(self, event):
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Erro ao notificar alteração {event}: {str(e)}")
 class SettingsManager:
     """Classe para gerenciamento completo de configurações do sistema"""
 
@@ -192,15 +801,22 @@ class SettingsManager:
             'enable_notifications': '1',
             'default_download_dir': os.path.expanduser('~/Downloads/AutomatePro'),
             'max_parallel_downloads': '3',
-            'download_notifications': '1'
+            'download_pool_size': '12',
+            'download_retries': '3',
+            'download_timeout': '60',
+            'download_notifications': '1',
+            'history_retention': '1',
+            'history_retention_days': '90',
+            'history_vacuum_pages': '2000'
 
         }
 
         # Aplicar padrões para configurações faltantes
-        for key, value in defaults.items():
-            if key not in self.settings:
-                self.settings[key] = value
-                self.save_setting(key, value)
+        with self.db.transaction():
+            for key, value in defaults.items():
+                if key not in self.settings:
+                    self.settings[key] = value
+                    self.save_setting(key, value)
     def save_setting(self, key, value):
         """Salva uma configuração no banco de dados"""
         self.db.execute_query(
@@ -307,7 +923,7 @@ class ThemeManager:
                 color: {theme['text_secondary']};
             }}
 
-            QLineEdit, QTextEdit, QComboBox, QListWidget, QTableWidget {{
+            QLineEdit, QTextEdit, QComboBox, QListWidget, QTableView {{
                 background-color: {theme['card_bg']};
                 color: {theme['text']};
                 border: 1px solid {theme['card_border']};
@@ -400,7 +1016,7 @@ class ThemeManager:
                 border-radius: 3px;
             }}
 
-            QTableWidget {{
+            QTableView {{
                 gridline-color: {theme['card_border']};
                 selection-background-color: {theme['primary']};
                 selection-color: white;
@@ -456,24 +1072,26 @@ class ProjectManager:
                         os.makedirs(os.path.join(base_dir, folder.strip()), exist_ok=True)
 
             # Salvar no banco de dados
-            project_id = self.db.execute_query(
-                '''INSERT INTO projects (name, type, base_dir, subfolders, description, tags) 
-                   VALUES (?, ?, ?, ?, ?, ?)''',
-                (name, project_type, base_dir, subfolders, description, tags)
-            )
+            with self.db.transaction():
+                project_id = self.db.execute_query(
+                    '''INSERT INTO projects (name, type, base_dir, subfolders, description, tags) 
+                       VALUES (?, ?, ?, ?, ?, ?)''',
+                    (name, project_type, base_dir, subfolders, description, tags)
+                )
 
-            # Registrar no histórico
-            self.db.execute_query(
-                '''INSERT INTO history (action, module, details) 
-                   VALUES (?, ?, ?)''',
-                ('create', 'projects', f'Created project {name}')
-            )
+                # Registrar no histórico
+                self.db.log_history('create', 'projects', f'Created project {name}')
+                self.db.publish_change('projects', project_id, 'insert')
 
             return project_id
         except Exception as e:
             raise Exception(f"Falha ao criar projeto: {str(e)}")
-    def get_projects(self, filter_type="all", search_query=""):
-        """Obtém projetos com filtro e pesquisa"""
+    def get_projects(self, filter_type="all", search_query="", after=None, limit=None):
+        """Obtém projetos com filtro e pesquisa.
+
+        Com `limit`, retorna uma página; `after` é o (nome, id) da última linha
+        da página anterior (paginação por chave).
+        """
         query = "SELECT * FROM projects"
         params = []
 
@@ -492,55 +1110,197 @@ class ProjectManager:
             query += " (name LIKE ? OR description LIKE ? OR tags LIKE ?)"
             params.extend([f"%{search_query}%"] * 3)
 
-        query += " ORDER BY name"
+        if after is not None:
+            query += " AND" if "WHERE" in query else " WHERE"
+            query += " (name, id) > (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY name, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         return self.db.execute_query(query, params, fetchall=True)
     def update_project(self, project_id, **kwargs):
         """Atualiza um projeto existente"""
         set_clause = ", ".join([f"{k} = ?" for k in kwargs])
         params = list(kwargs.values()) + [project_id]
 
-        self.db.execute_query(
-            f"UPDATE projects SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            params
-        )
+        with self.db.transaction():
+            self.db.execute_query(
+                f"UPDATE projects SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                params
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('update', 'projects', f'Updated project ID {project_id}')
-        )
+            # Registrar no histórico
+            self.db.log_history('update', 'projects', f'Updated project ID {project_id}')
+            self.db.publish_change('projects', project_id, 'update')
     def delete_project(self, project_id):
         """Exclui um projeto"""
-        self.db.execute_query("DELETE FROM projects WHERE id = ?", (project_id,))
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM projects WHERE id = ?", (project_id,))
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('delete', 'projects', f'Deleted project ID {project_id}')
-        )
+            # Registrar no histórico
+            self.db.log_history('delete', 'projects', f'Deleted project ID {project_id}')
+            self.db.publish_change('projects', project_id, 'delete')
+class XlsxStreamWriter:
+    """Gravador de arquivos XLSX em fluxo, sem dependências externas.
+
+    Gera o pacote SpreadsheetML diretamente em um zip: as partes fixas são
+    gravadas primeiro e a planilha é comprimida à medida que as linhas chegam,
+    então a memória usada não depende do número de linhas.
+    """
+    _INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    _NEEDS_ESCAPE = re.compile('[&<>\x00-\x08\x0b\x0c\x0e-\x1f]')
+    _CONTENT_TYPES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    )
+    _ROOT_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    )
+    _WORKBOOK_RELS = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    )
+    _STYLES = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    )
+    def __init__(self, file_path, sheet_name="Planilha1", buffer_rows=500):
+        self.buffer_rows = buffer_rows
+        self._buffer = []
+        self._zip = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED)
+        try:
+            sheet_name = re.sub(r'[\[\]:*?/\\]', '_', sheet_name)[:31] or "Planilha1"
+            self._zip.writestr('[Content_Types].xml', self._CONTENT_TYPES)
+            self._zip.writestr('_rels/.rels', self._ROOT_RELS)
+            self._zip.writestr('xl/_rels/workbook.xml.rels', self._WORKBOOK_RELS)
+            self._zip.writestr('xl/styles.xml', self._STYLES)
+            self._zip.writestr(
+                'xl/workbook.xml',
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                f'<sheets><sheet name="{xml_escape(sheet_name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            )
+            self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+            self._sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+        except Exception:
+            self._zip.close()
+            raise
+    def write_row(self, values, bold=False):
+        """Acrescenta uma linha à planilha"""
+        style = ' s="1"' if bold else ''
+        cells = []
+        for value in values:
+            kind = type(value)
+            if value is None or value == "":
+                cells.append('<c/>')
+            elif kind is int or (kind is float and value - value == 0):
+                # Números finitos viram células numéricas; NaN e infinito seguem como texto
+                cells.append(f'<c{style}><v>{value!r}</v></c>')
+            else:
+                text = value if kind is str else str(value)
+                if self._NEEDS_ESCAPE.search(text):
+                    text = xml_escape(self._INVALID_XML.sub('', text))
+                cells.append(f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>')
+        self._buffer.append(f'<row>{"".join(cells)}</row>')
+        if len(self._buffer) >= self.buffer_rows:
+            self._flush()
+    def close(self):
+        """Finaliza a planilha e o arquivo zip"""
+        if self._zip is None:
+            return
+        try:
+            self._flush()
+            self._sheet.write(b'</sheetData></worksheet>')
+            self._sheet.close()
+        finally:
+            self._zip.close()
+            self._zip = None
+    def _flush(self):
+        if self._buffer:
+            self._sheet.write("".join(self._buffer).encode('utf-8'))
+            self._buffer = []
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 class SpreadsheetManager:
-    """Classe para gerenciamento completo de planilhas"""
+    """Classe para gerenciamento completo de planilhas.
+
+    As linhas ficam em spreadsheet_rows, em blocos de CHUNK_ROWS linhas
+    (JSON compactado com zlib) indexados por (sheet_id, chunk_no). Leituras e
+    edições carregam apenas os blocos que contêm as linhas envolvidas.
+    """
+    CHUNK_ROWS = 1000
+    JOURNAL_LIMIT = 500  # Alterações guardadas por planilha para desfazer
+    _INT_PATTERN = re.compile(r'-?(?:0|[1-9]\d*)')
+    _FLOAT_PATTERN = re.compile(r'-?(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?')
+    # Valores (um por linha) que int()/float() aceitariam mudando o dado:
+    # espaços, "_", "+", inf/nan e zeros à esquerda
+    _CAST_SUSPECT_CHAR = re.compile(r'[^0-9.eE\n-]')
+    _CAST_LEADING_ZERO = re.compile(r'\n-?0[0-9]')
     def __init__(self, db):
         self.db = db
-    def create_spreadsheet(self, name, headers, data=None):
+    @staticmethod
+    def encode_chunk(rows):
+        """Serializa um bloco de linhas para gravação"""
+        return zlib.compress(json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 1)
+    @staticmethod
+    def decode_chunk(blob):
+        """Desserializa um bloco de linhas gravado"""
+        return json.loads(zlib.decompress(blob).decode('utf-8')) if blob else []
+    def create_spreadsheet(self, name, headers, data=None, column_types=None):
         """Cria uma nova planilha"""
         headers_str = "\n".join(headers)
-        data_str = json.dumps(data or [])
 
-        spreadsheet_id = self.db.execute_query(
-            '''INSERT INTO spreadsheets (name, headers, data) 
-               VALUES (?, ?, ?)''',
-            (name, headers_str, data_str)
-        )
+        with self.db.transaction():
+            spreadsheet_id = self.db.execute_query(
+                '''INSERT INTO spreadsheets (name, headers, column_types, row_count) 
+                   VALUES (?, ?, ?, 0)''',
+                (name, headers_str, "\n".join(column_types) if column_types else None)
+            )
+            if data:
+                self.append_rows(spreadsheet_id, data)
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('create', 'spreadsheets', f'Created spreadsheet {name}')
-        )
+            # Registrar no histórico
+            self.db.log_history('create', 'spreadsheets', f'Created spreadsheet {name}')
+            self.db.publish_change('spreadsheets', spreadsheet_id, 'insert')
 
         return spreadsheet_id
     def get_spreadsheets(self, search_query=""):
@@ -554,75 +1314,1058 @@ class SpreadsheetManager:
 
         query += " ORDER BY name"
         return self.db.execute_query(query, params, fetchall=True)
-    def update_spreadsheet(self, spreadsheet_id, **kwargs):
-        """Atualiza uma planilha existente"""
-        set_clause = ", ".join([f"{k} = ?" for k in kwargs])
-        params = list(kwargs.values()) + [spreadsheet_id]
+    def get_headers(self, spreadsheet_id):
+        """Obtém a lista de cabeçalhos de uma planilha"""
+        row = self.db.execute_query(
+            "SELECT headers FROM spreadsheets WHERE id = ?",
+            (spreadsheet_id,),
+            fetchone=True
+        )
 
-        self.db.execute_query(
-            f"UPDATE spreadsheets SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            params
+        if not row:
+            raise Exception("Planilha não encontrada")
+        return row[0].split('\n') if row[0] else []
+    def get_column_types(self, spreadsheet_id):
+        """Obtém os tipos das colunas ('int', 'float' ou 'text'); colunas sem tipo são texto"""
+        row = self.db.execute_query(
+            "SELECT headers, column_types FROM spreadsheets WHERE id = ?",
+            (spreadsheet_id,),
+            fetchone=True
         )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('update', 'spreadsheets', f'Updated spreadsheet ID {spreadsheet_id}')
+        if not row:
+            raise Exception("Planilha não encontrada")
+        column_count = len(row[0].split('\n')) if row[0] else 0
+        types = row[1].split('\n') if row[1] else []
+        return (types + ['text'] * column_count)[:column_count]
+    def get_row_count(self, spreadsheet_id):
+        """Obtém o número de linhas de uma planilha"""
+        row = self.db.execute_query(
+            "SELECT row_count FROM spreadsheets WHERE id = ?",
+            (spreadsheet_id,),
+            fetchone=True
+        )
+        return (row[0] or 0) if row else 0
+    def get_rows(self, spreadsheet_id, start=0, count=None):
+        """Obtém as linhas [start, start + count) lendo apenas os blocos necessários"""
+        total = self.get_row_count(spreadsheet_id)
+        end = total if count is None else min(total, start + count)
+        if start >= end:
+            return []
+
+        first_chunk = start // self.CHUNK_ROWS
+        last_chunk = (end - 1) // self.CHUNK_ROWS
+        chunks = self.db.execute_query(
+            '''SELECT chunk_no, data FROM spreadsheet_rows
+               WHERE sheet_id = ? AND chunk_no BETWEEN ? AND ?
+               ORDER BY chunk_no''',
+            (spreadsheet_id, first_chunk, last_chunk),
+            fetchall=True
         )
-def export_to_csv(self, spreadsheet_id, file_path):
-    """Exporta planilha para CSV"""
-    spreadsheet = self.db.execute_query(
-        "SELECT headers, data FROM spreadsheets WHERE id = ?",
-        (spreadsheet_id,),
-        fetchone=True
-    )
 
-    if not spreadsheet:
-        raise Exception("Planilha não encontrada")
+        rows = []
+        for chunk_no, blob in chunks:
+            chunk_start = chunk_no * self.CHUNK_ROWS
+            chunk_rows = self.decode_chunk(blob)
+            rows.extend(chunk_rows[max(start - chunk_start, 0):end - chunk_start])
+        return rows
+    def iter_rows(self, spreadsheet_id, start=0):
+        """Percorre as linhas de uma planilha bloco a bloco, sem carregá-la inteira"""
+        offset = start % self.CHUNK_ROWS
+        for chunk_rows in self.iter_chunks(spreadsheet_id, start // self.CHUNK_ROWS):
+            yield from chunk_rows[offset:]
+            offset = 0
+    def iter_chunks(self, spreadsheet_id, first_chunk=0):
+        """Percorre os blocos de linhas de uma planilha, a partir do bloco `first_chunk`"""
+        chunk_no = first_chunk
+        while True:
+            row = self.db.execute_query(
+                '''SELECT chunk_no, data FROM spreadsheet_rows
+                   WHERE sheet_id = ? AND chunk_no >= ?
+                   ORDER BY chunk_no LIMIT 1''',
+                (spreadsheet_id, chunk_no),
+                fetchone=True
+            )
+            if not row:
+                return
+            yield self.decode_chunk(row[1])
+            chunk_no = row[0] + 1
+    def write_rows(self, spreadsheet_id, start, rows):
+        """Sobrescreve as linhas a partir de `start`, estendendo a planilha se necessário.
 
-    try:
-        headers = spreadsheet[0].split('\n')
-        data = json.loads(spreadsheet[1]) if spreadsheet[1] else []
+        Apenas os blocos que contêm as linhas alteradas são lidos e regravados.
+        """
+        if not rows:
+            return
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
+        with self.db.transaction():
+            total = self.get_row_count(spreadsheet_id)
+            if start > total:
+                # Preencher o intervalo entre o fim atual e `start` com linhas vazias
+                rows = [[] for _ in range(start - total)] + list(rows)
+                start = total
+            end = start + len(rows)
+
+            for chunk_no in range(start // self.CHUNK_ROWS, (end - 1) // self.CHUNK_ROWS + 1):
+                chunk_start = chunk_no * self.CHUNK_ROWS
+                chunk_rows = self._load_chunk(spreadsheet_id, chunk_no)
+                for index in range(max(start, chunk_start), min(end, chunk_start + self.CHUNK_ROWS)):
+                    position = index - chunk_start
+                    if position < len(chunk_rows):
+                        chunk_rows[position] = rows[index - start]
+                    else:
+                        chunk_rows.append(rows[index - start])
+                self._save_chunk(spreadsheet_id, chunk_no, chunk_rows)
 
-            if data:
-                writer.writerows(data)
+            if end > total:
+                self.db.execute_query(
+                    "UPDATE spreadsheets SET row_count = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (end, spreadsheet_id)
+                )
+            else:
+                self.db.execute_query(
+                    "UPDATE spreadsheets SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (spreadsheet_id,)
+                )
+    def append_rows(self, spreadsheet_id, rows):
+        """Acrescenta linhas ao final da planilha"""
+        self.write_rows(spreadsheet_id, self.get_row_count(spreadsheet_id), rows)
+    def replace_rows(self, spreadsheet_id, rows):
+        """Substitui todas as linhas da planilha (e descarta o diário de alterações)"""
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM spreadsheet_rows WHERE sheet_id = ?", (spreadsheet_id,))
+            self.db.execute_query("DELETE FROM spreadsheet_changes WHERE sheet_id = ?", (spreadsheet_id,))
+            self.db.execute_query(
+                "UPDATE spreadsheets SET row_count = 0 WHERE id = ?",
+                (spreadsheet_id,)
+            )
+            self.write_rows(spreadsheet_id, 0, rows)
+    def patch_cells(self, spreadsheet_id, changes):
+        """Altera células [(linha, coluna, valor), ...] e registra a alteração no diário.
+
+        Só os blocos que contêm as células são lidos e regravados, e o diário
+        guarda apenas [linha, coluna, valor antigo, valor novo] de cada célula,
+        então o custo é proporcional ao número de células alteradas. Uma nova
+        alteração descarta o que havia para refazer. Retorna o id da alteração
+        no diário, ou None se nenhum valor mudou.
+        """
+        with self.db.transaction():
+            cells = self._apply_cells(spreadsheet_id, changes)
+            if not cells:
+                return None
+
+            self.db.execute_query(
+                "DELETE FROM spreadsheet_changes WHERE sheet_id = ? AND undone = 1",
+                (spreadsheet_id,)
+            )
+            change_id = self.db.execute_query(
+                "INSERT INTO spreadsheet_changes (sheet_id, cells) VALUES (?, ?)",
+                (spreadsheet_id, json.dumps(cells, ensure_ascii=False, separators=(',', ':')))
+            )
+            # Manter apenas as últimas JOURNAL_LIMIT alterações desta planilha (os ids são globais)
+            self.db.execute_query(
+                '''DELETE FROM spreadsheet_changes WHERE sheet_id = ? AND id NOT IN (
+                       SELECT id FROM spreadsheet_changes WHERE sheet_id = ? ORDER BY id DESC LIMIT ?
+                   )''',
+                (spreadsheet_id, spreadsheet_id, self.JOURNAL_LIMIT)
+            )
+
+            # Registrar no histórico
+            self.db.log_history('edit', 'spreadsheets', f'Edited {len(cells)} cells in spreadsheet ID {spreadsheet_id}')
+
+        return change_id
+    def undo(self, spreadsheet_id):
+        """Desfaz a última alteração de células; retorna as células afetadas [(linha, coluna)]"""
+        with self.db.transaction():
+            change = self.db.execute_query(
+                '''SELECT id, cells FROM spreadsheet_changes
+                   WHERE sheet_id = ? AND undone = 0 ORDER BY id DESC LIMIT 1''',
+                (spreadsheet_id,),
+                fetchone=True
+            )
+            if not change:
+                return []
+
+            cells = json.loads(change[1])
+            self._apply_cells(spreadsheet_id, [(row, column, old) for row, column, old, _ in reversed(cells)])
+            self.db.execute_query("UPDATE spreadsheet_changes SET undone = 1 WHERE id = ?", (change[0],))
+
+            # Registrar no histórico
+            self.db.log_history('undo', 'spreadsheets', f'Undid change {change[0]} in spreadsheet ID {spreadsheet_id}')
+
+        return [(row, column) for row, column, _, _ in cells]
+    def redo(self, spreadsheet_id):
+        """Refaz a alteração desfeita mais antiga; retorna as células afetadas [(linha, coluna)]"""
+        with self.db.transaction():
+            change = self.db.execute_query(
+                '''SELECT id, cells FROM spreadsheet_changes
+                   WHERE sheet_id = ? AND undone = 1 ORDER BY id LIMIT 1''',
+                (spreadsheet_id,),
+                fetchone=True
+            )
+            if not change:
+                return []
 
+            cells = json.loads(change[1])
+            self._apply_cells(spreadsheet_id, [(row, column, new) for row, column, _, new in cells])
+            self.db.execute_query("UPDATE spreadsheet_changes SET undone = 0 WHERE id = ?", (change[0],))
+
+            # Registrar no histórico
+            self.db.log_history('redo', 'spreadsheets', f'Redid change {change[0]} in spreadsheet ID {spreadsheet_id}')
+
+        return [(row, column) for row, column, _, _ in cells]
+    def _apply_cells(self, spreadsheet_id, changes):
+        """Grava os valores nas células, bloco a bloco; retorna [linha, coluna, antigo, novo] do que mudou"""
+        total = self.get_row_count(spreadsheet_id)
+        by_chunk = {}
+        for row, column, value in changes:
+            if not 0 <= row < total or column < 0:
+                raise Exception(f"Célula fora da planilha: linha {row + 1}, coluna {column + 1}")
+            by_chunk.setdefault(row // self.CHUNK_ROWS, []).append((row, column, value))
+
+        applied = []
+        for chunk_no, cells in sorted(by_chunk.items()):
+            chunk_start = chunk_no * self.CHUNK_ROWS
+            chunk_rows = self._load_chunk(spreadsheet_id, chunk_no)
+            changed = False
+            for row, column, value in cells:
+                position = row - chunk_start
+                if position >= len(chunk_rows):
+                    chunk_rows.extend([] for _ in range(position + 1 - len(chunk_rows)))
+                values = chunk_rows[position]
+                if column >= len(values):
+                    values.extend([None] * (column + 1 - len(values)))
+                old = values[column]
+                if old == value and type(old) is type(value):
+                    continue
+                values[column] = value
+                applied.append([row, column, old, value])
+                changed = True
+            if changed:
+                self._save_chunk(spreadsheet_id, chunk_no, chunk_rows)
+
+        if applied:
+            self.db.execute_query(
+                "UPDATE spreadsheets SET updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (spreadsheet_id,)
+            )
+        return applied
+    def _load_chunk(self, spreadsheet_id, chunk_no):
+        row = self.db.execute_query(
+            "SELECT data FROM spreadsheet_rows WHERE sheet_id = ? AND chunk_no = ?",
+            (spreadsheet_id, chunk_no),
+            fetchone=True
+        )
+        return self.decode_chunk(row[0]) if row else []
+    def _save_chunk(self, spreadsheet_id, chunk_no, rows):
         self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('export', 'spreadsheets', f'Exported spreadsheet ID {spreadsheet_id} to CSV')
+            '''INSERT OR REPLACE INTO spreadsheet_rows (sheet_id, chunk_no, row_count, data)
+               VALUES (?, ?, ?, ?)''',
+            (spreadsheet_id, chunk_no, len(rows), self.encode_chunk(rows))
+        )
+    def update_spreadsheet(self, spreadsheet_id, **kwargs):
+        """Atualiza uma planilha existente"""
+        data = kwargs.pop('data', None)
+        if isinstance(kwargs.get('headers'), (list, tuple)):
+            kwargs['headers'] = "\n".join(kwargs['headers'])
+
+        with self.db.transaction():
+            if kwargs:
+                set_clause = ", ".join([f"{k} = ?" for k in kwargs])
+                params = list(kwargs.values()) + [spreadsheet_id]
+                self.db.execute_query(
+                    f"UPDATE spreadsheets SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    params
+                )
+            if data is not None:
+                self.replace_rows(spreadsheet_id, data)
+
+            # Registrar no histórico
+            self.db.log_history('update', 'spreadsheets', f'Updated spreadsheet ID {spreadsheet_id}')
+            self.db.publish_change('spreadsheets', spreadsheet_id, 'update')
+    def delete_spreadsheet(self, spreadsheet_id):
+        """Exclui uma planilha, suas linhas e seu diário de alterações"""
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM spreadsheet_rows WHERE sheet_id = ?", (spreadsheet_id,))
+            self.db.execute_query("DELETE FROM spreadsheet_changes WHERE sheet_id = ?", (spreadsheet_id,))
+            self.db.execute_query("DELETE FROM spreadsheets WHERE id = ?", (spreadsheet_id,))
+
+            # Registrar no histórico
+            self.db.log_history('delete', 'spreadsheets', f'Deleted spreadsheet ID {spreadsheet_id}')
+            self.db.publish_change('spreadsheets', spreadsheet_id, 'delete')
+    def export(self, spreadsheet_id, file_path, progress_callback=None, is_cancelled=None):
+        """Exporta a planilha em fluxo para XLSX, TSV ou CSV (conforme a extensão).
+
+        As linhas são lidas bloco a bloco e gravadas imediatamente, então a
+        memória usada é constante em relação ao número de linhas.
+        progress_callback(linhas_gravadas, total) é chamado a cada bloco; se
+        is_cancelled() retornar True a exportação para, o arquivo parcial é
+        removido e o retorno é False.
+        """
+        completed = self.write_file(
+            file_path, self.get_headers(spreadsheet_id), self.iter_rows(spreadsheet_id),
+            self.get_row_count(spreadsheet_id), progress_callback, is_cancelled
         )
+        if completed:
+            file_format = {'.xlsx': 'XLSX', '.tsv': 'TSV'}.get(os.path.splitext(file_path)[1].lower(), 'CSV')
+            self.db.log_history('export', 'spreadsheets', f'Exported spreadsheet ID {spreadsheet_id} to {file_format}')
+        return completed
+    @classmethod
+    def write_file(cls, file_path, headers, rows, total, progress_callback=None, is_cancelled=None):
+        """Grava cabeçalhos e um iterador de linhas em XLSX, TSV ou CSV (conforme a extensão).
+
+        Usado pela exportação de planilhas e de resultados de consultas; tem o
+        mesmo contrato de progresso e cancelamento que export().
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        file_format = {'.xlsx': 'XLSX', '.tsv': 'TSV'}.get(extension, 'CSV')
 
+        try:
+            if file_format == 'XLSX':
+                with XlsxStreamWriter(file_path) as writer:
+                    writer.write_row(headers, bold=True)
+                    completed = cls._write_rows(rows, writer.write_row, total, progress_callback, is_cancelled)
+            else:
+                with open(file_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f, delimiter='\t' if file_format == 'TSV' else ',')
+                    writer.writerow(headers)
+                    completed = cls._write_rows(rows, writer.writerow, total, progress_callback, is_cancelled)
+        except Exception as e:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            raise Exception(f"Erro ao exportar para {file_format}: {str(e)}")
+
+        if not completed:
+            os.remove(file_path)
+        return completed
+    @classmethod
+    def _write_rows(cls, rows, write_row, total, progress_callback, is_cancelled):
+        written = 0
+        for row in rows:
+            write_row(row)
+            written += 1
+            if written % cls.CHUNK_ROWS == 0:
+                if is_cancelled and is_cancelled():
+                    return False
+                if progress_callback:
+                    progress_callback(written, total)
+        if progress_callback:
+            progress_callback(written, total)
         return True
-    except Exception as e:
-        raise Exception(f"Erro ao exportar para CSV: {str(e)}")
+    def export_to_csv(self, spreadsheet_id, file_path):
+        """Exporta planilha para CSV"""
+        return self.export(spreadsheet_id, file_path)
+    def import_file(self, file_path, name=None, progress_callback=None, is_cancelled=None, batch_chunks=50):
+        """Importa um arquivo CSV, TSV ou XLSX como uma nova planilha, em fluxo.
+
+        A primeira linha é o cabeçalho. Os tipos das colunas são inferidos no
+        primeiro bloco de CHUNK_ROWS linhas e os números são gravados como
+        int/float; valores de blocos seguintes fora do formato do tipo (texto,
+        zeros à esquerda) ficam como texto e são contados no histórico da
+        importação. Os blocos vão direto para spreadsheet_rows, `batch_chunks`
+        blocos por transação, então a memória usada não depende do tamanho do
+        arquivo.
+        progress_callback(linhas_importadas, total_estimado) é chamado a cada
+        transação; se is_cancelled() retornar True a importação para, a
+        planilha parcial é removida e o retorno é None. Retorna o id da nova
+        planilha.
+        """
+        name = name or os.path.splitext(os.path.basename(file_path))[0]
+        spreadsheet_id = None
+        imported = 0
+        kept_as_text = 0
+
+        try:
+            with self._open_import_file(file_path) as (rows, read_fraction):
+                header_row = next(rows, None)
+                if header_row is None:
+                    raise Exception("O arquivo está vazio")
+                chunk = list(islice(rows, self.CHUNK_ROWS))
+                column_count = max([len(header_row)] + [len(row) for row in chunk])
+                headers = [
+                    str(header).replace('\n', ' ').strip() if header not in (None, "") else f"Coluna {index + 1}"
+                    for index, header in enumerate(list(header_row) + [None] * (column_count - len(header_row)))
+                ]
+                column_types = self.infer_column_types(chunk, column_count)
+                casts = [(index, int if kind == 'int' else float)
+                         for index, kind in enumerate(column_types) if kind != 'text']
+
+                with self.db.transaction():
+                    spreadsheet_id = self.db.execute_query(
+                        '''INSERT INTO spreadsheets (name, headers, column_types, row_count)
+                           VALUES (?, ?, ?, 0)''',
+                        (name, "\n".join(headers), "\n".join(column_types))
+                    )
+
+                chunk_no = 0
+                pending = []
+                while chunk:
+                    for index, cast in casts:
+                        kept_as_text += self._cast_column(chunk, index, cast)
+                    pending.append((spreadsheet_id, chunk_no, len(chunk), self.encode_chunk(chunk)))
+                    chunk_no += 1
+                    imported += len(chunk)
+                    chunk = list(islice(rows, self.CHUNK_ROWS))
+
+                    if len(pending) >= batch_chunks or not chunk:
+                        self._insert_chunks(spreadsheet_id, pending, imported)
+                        pending = []
+                        if is_cancelled and is_cancelled():
+                            self._discard_spreadsheet(spreadsheet_id)
+                            return None
+                        if progress_callback:
+                            fraction = read_fraction()
+                            estimate = int(imported / fraction) if chunk and fraction > 0 else imported
+                            progress_callback(imported, max(estimate, imported))
+        except Exception as e:
+            if spreadsheet_id is not None:
+                self._discard_spreadsheet(spreadsheet_id)
+            raise Exception(f"Erro ao importar arquivo: {str(e)}")
+
+        details = f'{imported} rows' + (f', {kept_as_text} values kept as text' if kept_as_text else '')
+        self.db.log_history('import', 'spreadsheets', f'Imported spreadsheet {name} ({details})')
+        self.db.publish_change('spreadsheets', spreadsheet_id, 'insert')
+        return spreadsheet_id
+    @classmethod
+    def infer_column_types(cls, rows, column_count):
+        """Infere o tipo de cada coluna ('int', 'float' ou 'text') a partir de uma amostra de linhas.
+
+        Valores com zeros à esquerda (CEPs, códigos) são tratados como texto.
+        """
+        types = []
+        for index in range(column_count):
+            kind = None
+            for row in rows:
+                value = row[index] if index < len(row) else None
+                if value is None or value == "":
+                    continue
+                if isinstance(value, bool):
+                    kind = 'text'
+                elif isinstance(value, int):
+                    kind = kind or 'int'
+                elif isinstance(value, float):
+                    kind = 'float'
+                else:
+                    text = str(value).strip()
+                    if kind in (None, 'int') and cls._INT_PATTERN.fullmatch(text):
+                        kind = 'int'
+                    elif cls._FLOAT_PATTERN.fullmatch(text):
+                        kind = 'float'
+                    else:
+                        kind = 'text'
+                if kind == 'text':
+                    break
+            types.append(kind or 'text')
+        return types
+    @classmethod
+    def _cast_column(cls, rows, index, cast):
+        """Converte a coluna `index` para `cast`; retorna quantos valores ficaram como texto"""
+        # Caminho rápido para colunas homogêneas, conferidas com um único regex
+        # no texto da coluna; em qualquer valor fora do padrão (linha curta,
+        # texto, zeros à esquerda) a coluna é refeita célula a célula
+        try:
+            values = [row[index] for row in rows]
+            text = "\n" + "\n".join(values)
+            if cls._CAST_SUSPECT_CHAR.search(text) or cls._CAST_LEADING_ZERO.search(text):
+                raise ValueError(index)
+            for row, value in zip(rows, values):
+                row[index] = cast(value) if value != "" else None
+            return 0
+        except (IndexError, TypeError, ValueError, OverflowError):
+            kept = 0
+            for row in rows:
+                if index < len(row):
+                    row[index] = cls._cast_number(cast, row[index])
+                    kept += isinstance(row[index], str)
+            return kept
+    @classmethod
+    def _cast_number(cls, cast, value):
+        # Valores que não seguem o tipo inferido na amostra (texto, zeros à
+        # esquerda como em "00123") são mantidos como estão
+        if value is None or value == "":
+            return None
+        if type(value) is cast:
+            return value
+        pattern = cls._INT_PATTERN if cast is int else cls._FLOAT_PATTERN
+        if isinstance(value, str) and not pattern.fullmatch(value.strip()):
+            return value
+        try:
+            return cast(value)
+        except (TypeError, ValueError, OverflowError):
+            return value
+    @contextmanager
+    def _open_import_file(self, file_path):
+        """Abre um arquivo para importação e produz (linhas, fração_lida).
+
+        `linhas` é um iterador de listas (a primeira é o cabeçalho) e
+        fração_lida() estima quanto do arquivo já foi consumido.
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in ('.xlsx', '.xlsm'):
+            try:
+                from openpyxl import load_workbook
+            except ImportError:
+                raise Exception("openpyxl não está instalado; instale-o para importar arquivos XLSX")
+
+            workbook = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                sheet = workbook.worksheets[0]
+                total = sheet.max_row or 0
+                read = [0]
+
+                def rows():
+                    for values in sheet.iter_rows(values_only=True):
+                        read[0] += 1
+                        # Datas e horas viram texto ISO para caber no JSON dos blocos
+                        yield [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+
+                yield rows(), lambda: read[0] / total if total else 0.0
+            finally:
+                workbook.close()
+            return
+
+        size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            sample = f.read(65536)
+        try:
+            sample_text = codecs.getincrementaldecoder('utf-8-sig')().decode(sample)
+            encoding = 'utf-8-sig'
+        except UnicodeDecodeError:
+            # Arquivos exportados pelo Excel em português costumam vir em cp1252
+            sample_text = sample.decode('cp1252', errors='replace')
+            encoding = 'cp1252'
+
+        if extension == '.tsv':
+            delimiter = '\t'
+        else:
+            try:
+                complete_lines = sample_text[:sample_text.rfind('\n') + 1] or sample_text
+                delimiter = csv.Sniffer().sniff(complete_lines, delimiters=',;\t|').delimiter
+            except csv.Error:
+                delimiter = ','
+
+        with open(file_path, 'r', newline='', encoding=encoding, errors='replace') as f:
+            raw = f.buffer
+            yield csv.reader(f, delimiter=delimiter), lambda: raw.tell() / size if size else 1.0
+    def _insert_chunks(self, spreadsheet_id, chunks, row_count):
+        with self.db.transaction():
+            self.db.execute_many(
+                '''INSERT OR REPLACE INTO spreadsheet_rows (sheet_id, chunk_no, row_count, data)
+                   VALUES (?, ?, ?, ?)''',
+                chunks
+            )
+            self.db.execute_query(
+                "UPDATE spreadsheets SET row_count = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (row_count, spreadsheet_id)
+            )
+    def _discard_spreadsheet(self, spreadsheet_id):
+        # Remove uma importação incompleta sem registrar no histórico
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM spreadsheet_rows WHERE sheet_id = ?", (spreadsheet_id,))
+            self.db.execute_query("DELETE FROM spreadsheets WHERE id = ?", (spreadsheet_id,))
+class SpreadsheetQuery:
+    """Consulta sobre o conteúdo de uma planilha: filtros, colunas calculadas,
+    agrupamento com agregações e ordenação por várias chaves.
+
+    A planilha é percorrida em lotes de `batch_chunks` blocos. Cada lote vira
+    um array NumPy por coluna usada, e filtros, expressões e agregações são
+    avaliados sobre os arrays inteiros. Colunas de inteiros usam int64 (sem
+    perder precisão acima de 2**53) nos lotes sem vazios, as demais colunas
+    numéricas usam float64 (NaN para vazios) e colunas de texto usam arrays
+    de objetos com "" para vazios.
+
+    As expressões usam a sintaxe do Python: nomes de colunas (entre crases se
+    tiverem espaços ou símbolos), números, textos, + - * / // % **,
+    comparações, and/or/not, `in [...]` e as funções de FUNCTIONS.
+    Exemplo: query.compute("total", "preco * quantidade").where("total > 100")
+    """
+    AGGREGATES = ('sum', 'avg', 'count', 'min', 'max')
+    FUNCTIONS = ('abs', 'round', 'lower', 'upper', 'contains', 'startswith', 'endswith', 'isempty')
+    _BINARY_OPERATORS = {
+        ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+        ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv,
+        ast.Mod: operator.mod, ast.Pow: operator.pow,
+    }
+    _COMPARISONS = {
+        ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+        ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    }
+    def __init__(self, spreadsheet_manager, spreadsheet_id, batch_chunks=50):
+        self.spreadsheet_manager = spreadsheet_manager
+        self.spreadsheet_id = spreadsheet_id
+        self.batch_chunks = batch_chunks
+        self.headers = spreadsheet_manager.get_headers(spreadsheet_id)
+        self.column_types = {}
+        for header, kind in zip(self.headers, spreadsheet_manager.get_column_types(spreadsheet_id)):
+            self.column_types.setdefault(header, kind)
+        self._filters = []
+        self._computed = []
+        self._group_by = []
+        self._aggregates = []
+        self._order_by = []
+        self._columns = None
+    def where(self, expression):
+        """Mantém apenas as linhas em que a expressão é verdadeira"""
+        self._filters.append(self._parse(expression))
+        return self
+    def compute(self, name, expression):
+        """Acrescenta uma coluna calculada, que pode ser usada nas chamadas seguintes"""
+        name = name.strip()
+        if not name or name in self.column_types:
+            raise Exception(f"Nome inválido para coluna calculada: '{name}'")
+        self._computed.append((name, self._parse(expression)))
+        self.column_types[name] = None  # O tipo só é conhecido após a avaliação
+        return self
+    def group_by(self, *columns):
+        """Agrupa o resultado pelas colunas informadas"""
+        self._check_columns(columns)
+        self._group_by = list(columns)
+        return self
+    def aggregate(self, func, column=None, name=None):
+        """Acrescenta uma agregação (sum, avg, count, min ou max) ao resultado"""
+        func = func.lower()
+        if func not in self.AGGREGATES:
+            raise Exception(f"Agregação desconhecida: {func}")
+        if column is None and func != 'count':
+            raise Exception(f"A agregação {func} exige uma coluna")
+        if column is not None:
+            self._check_columns([column])
+            if func != 'count' and self.column_types[column] == 'text':
+                raise Exception(f"A agregação {func} exige uma coluna numérica: {column}")
+        self._aggregates.append((name or (f"{func}({column})" if column else "count"), func, column))
+        return self
+    def order_by(self, column, descending=False):
+        """Acrescenta uma chave de ordenação (a primeira chamada é a chave principal)"""
+        self._order_by.append((column, descending))
+        return self
+    def select(self, *columns):
+        """Define as colunas do resultado (padrão: todas, ou grupos e agregações)"""
+        self._columns = list(columns)
+        return self
+    def execute(self, progress_callback=None, is_cancelled=None):
+        """Executa a consulta e retorna um QueryResult (None se for cancelada).
+
+        progress_callback(linhas_lidas, total) é chamado a cada lote.
+        """
+        grouped = bool(self._group_by or self._aggregates)
+        output = self._output_columns(grouped)
+        kept = list(dict.fromkeys(output + [column for column, _ in self._order_by]))
+        if not grouped:
+            self._check_columns(kept)
+
+        needed = set(self._group_by) | {column for _, _, column in self._aggregates if column} | set(kept)
+        for _, names in self._filters + [expression for _, expression in self._computed]:
+            needed |= names
+        computed = {name for name, _ in self._computed}
+        base_columns = [column for column in dict.fromkeys(self.headers) if column in needed - computed]
+
+        total = self.spreadsheet_manager.get_row_count(self.spreadsheet_id)
+        batch_rows = self.batch_chunks * self.spreadsheet_manager.CHUNK_ROWS
+        groups = {}
+        parts = {column: [] for column in kept}
+        types = {}
+        scanned = 0
+        batch = []
+        chunks = self.spreadsheet_manager.iter_chunks(self.spreadsheet_id)
+        while True:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                batch.extend(chunk)
+                if len(batch) < batch_rows:
+                    continue
+            if not batch:
+                break
+
+            size = len(batch)
+            env = self._decode_batch(batch, base_columns)
+            batch = []
+            for name, (tree, _) in self._computed:
+                env[name] = self._as_column(self._evaluate(tree, env), size)
+            mask = np.ones(size, dtype=bool)
+            for tree, _ in self._filters:
+                mask &= np.asarray(self._evaluate(tree, env), dtype=bool)
+
+            if grouped:
+                self._accumulate_groups(groups, env, mask, types)
+            else:
+                for column in kept:
+                    parts[column].append(env[column][mask])
+
+            scanned += size
+            if is_cancelled and is_cancelled():
+                return None
+            if progress_callback:
+                progress_callback(scanned, total)
+            if chunk is None:
+                break
+
+        if grouped:
+            columns = self._finish_groups(groups, types)
+        else:
+            columns = {}
+            for column in kept:
+                if parts[column]:
+                    columns[column] = np.concatenate(parts[column])
+                else:
+                    columns[column] = np.array([], dtype=object if self.column_types[column] == 'text' else float)
+
+        if self._order_by:
+            missing = [column for column, _ in self._order_by if column not in columns]
+            if missing:
+                raise Exception(f"Colunas de ordenação fora do resultado: {', '.join(missing)}")
+            order = QueryResult.sort_indices([(columns[column], descending)
+                                              for column, descending in self._order_by])
+            columns = {column: values[order] for column, values in columns.items()}
+
+        return QueryResult(output, [columns[column] for column in output])
+    def _output_columns(self, grouped):
+        available = self._group_by + [name for name, _, _ in self._aggregates] if grouped else list(self.column_types)
+        if self._columns is None:
+            return available
+        missing = [column for column in self._columns if column not in available]
+        if missing:
+            raise Exception(f"Colunas indisponíveis no resultado: {', '.join(missing)}")
+        return self._columns
+    def _check_columns(self, columns):
+        missing = [column for column in columns if column not in self.column_types]
+        if missing:
+            raise Exception(f"Coluna desconhecida: {', '.join(missing)}")
+    def _parse(self, expression):
+        """Converte a expressão em AST e resolve os nomes de colunas"""
+        quoted = {}
+
+        def quote(match):
+            placeholder = f"_coluna_{len(quoted)}"
+            quoted[placeholder] = match.group(1)
+            return placeholder
+
+        source = re.sub(r'`([^`]*)`', quote, expression.strip())
+        try:
+            tree = ast.parse(source, mode='eval').body
+        except SyntaxError:
+            raise Exception(f"Expressão inválida: {expression}")
+
+        functions = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in self.FUNCTIONS or node.keywords:
+                    raise Exception(f"Função não suportada em: {expression}")
+                functions.add(id(node.func))
+
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and id(node) not in functions:
+                node.id = quoted.get(node.id, node.id)
+                self._check_columns([node.id])
+                names.add(node.id)
+        return tree, names
+    def _decode_batch(self, rows, columns):
+        """Transpõe as linhas do lote em um array por coluna"""
+        width = len(self.headers)
+        if min(map(len, rows)) < width:
+            rows = [row + [None] * (width - len(row)) if len(row) < width else row for row in rows]
+        transposed = list(zip(*rows))
+
+        env = {}
+        for column in columns:
+            values = transposed[self.headers.index(column)]
+            if self.column_types[column] == 'text':
+                text = np.array(values, dtype=object)
+                text[np.equal(text, None)] = ""
+                env[column] = text.astype(str).astype(object)
+            else:
+                if self.column_types[column] == 'int':
+                    # Só inteiros no lote (sem vazios ou textos): int64 guarda o valor exato
+                    integers = np.array(values)
+                    if integers.dtype.kind == 'i':
+                        env[column] = integers.astype(np.int64, copy=False)
+                        continue
+                try:
+                    env[column] = np.array(values, dtype=np.float64)
+                except (TypeError, ValueError):
+                    # Células fora do tipo inferido (texto em coluna numérica) viram NaN
+                    env[column] = np.array([self._to_float(value) for value in values], dtype=np.float64)
+        return env
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+    @staticmethod
+    def _as_column(value, size):
+        if isinstance(value, np.ndarray) and value.shape == (size,):
+            return value
+        # Expressões constantes são expandidas para o tamanho do lote
+        return np.full(size, value, dtype=object if isinstance(value, str) else np.float64)
+    def _evaluate(self, node, env):
+        """Avalia um nó da expressão sobre os arrays do lote"""
+        try:
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool)):
+                return node.value
+            if isinstance(node, ast.Name):
+                return env[node.id]
+            if isinstance(node, (ast.List, ast.Tuple)):
+                return [self._evaluate(element, env) for element in node.elts]
+            if isinstance(node, ast.BinOp) and type(node.op) in self._BINARY_OPERATORS:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    return self._BINARY_OPERATORS[type(node.op)](
+                        self._evaluate(node.left, env), self._evaluate(node.right, env)
+                    )
+            if isinstance(node, ast.UnaryOp):
+                operand = self._evaluate(node.operand, env)
+                if isinstance(node.op, ast.Not):
+                    return np.logical_not(operand)
+                if isinstance(node.op, ast.USub):
+                    return -operand
+                if isinstance(node.op, ast.UAdd):
+                    return operand
+            if isinstance(node, ast.BoolOp):
+                values = [np.asarray(self._evaluate(value, env), dtype=bool) for value in node.values]
+                reduce = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+                return reduce.reduce(values)
+            if isinstance(node, ast.Compare):
+                left = self._evaluate(node.left, env)
+                result = np.bool_(True)
+                for op, comparator in zip(node.ops, node.comparators):
+                    right = self._evaluate(comparator, env)
+                    if isinstance(op, (ast.In, ast.NotIn)):
+                        matches = np.isin(left, right)
+                        matches = matches if isinstance(op, ast.In) else ~matches
+                    elif type(op) in self._COMPARISONS:
+                        matches = np.asarray(self._COMPARISONS[type(op)](left, right), dtype=bool)
+                    else:
+                        break
+                    result = result & matches
+                    left = right
+                else:
+                    return result
+            if isinstance(node, ast.Call):
+                return self._call(node.func.id, [self._evaluate(arg, env) for arg in node.args])
+        except (TypeError, ValueError) as e:
+            raise Exception(f"Erro ao avaliar '{ast.unparse(node)}': {str(e)}")
+        raise Exception(f"Expressão não suportada: {ast.unparse(node)}")
+    @staticmethod
+    def _call(name, args):
+        if not args:
+            raise Exception(f"A função {name} exige argumentos")
+        value = args[0]
+        if name == 'abs':
+            return np.abs(value)
+        if name == 'round':
+            return np.round(value, int(args[1]) if len(args) > 1 else 0)
+        if name == 'isempty':
+            value = np.asarray(value)
+            return np.equal(value, "") if value.dtype == object else np.isnan(value)
+
+        text = np.asarray(value).astype(str)
+        if name == 'lower':
+            return np.char.lower(text).astype(object)
+        if name == 'upper':
+            return np.char.upper(text).astype(object)
+        if len(args) < 2:
+            raise Exception(f"A função {name} exige dois argumentos")
+        pattern = str(args[1])
+        if name == 'contains':
+            # Busca sem diferenciar maiúsculas de minúsculas
+            return np.char.find(np.char.lower(text), pattern.lower()) >= 0
+        if name == 'startswith':
+            return np.char.startswith(text, pattern)
+        return np.char.endswith(text, pattern)
+    def _accumulate_groups(self, groups, env, mask, types):
+        """Soma as agregações parciais do lote aos acumuladores de cada grupo.
+
+        As chaves de cada lote são codificadas com np.unique e as agregações
+        usam bincount e minimum.at/maximum.at, então o custo em Python é por
+        grupo, não por linha.
+        """
+        count = int(mask.sum())
+        if self._group_by:
+            codes, uniques = [], []
+            for column in self._group_by:
+                values = env[column][mask]
+                types[column] = np.result_type(types.get(column, values.dtype), values.dtype)
+                unique_values, inverse = np.unique(values, return_inverse=True)
+                uniques.append(unique_values)
+                codes.append(inverse.ravel())
+            shape = tuple(len(values) for values in uniques)
+            combined = np.ravel_multi_index(codes, shape) if len(codes) > 1 else codes[0]
+            group_codes, inverse = np.unique(combined, return_inverse=True)
+            inverse = inverse.ravel()
+            key_codes = np.unravel_index(group_codes, shape)
+            key_columns = [[self._key_value(value) for value in values[positions].tolist()]
+                           for values, positions in zip(uniques, key_codes)]
+            keys = list(zip(*key_columns))
+        else:
+            inverse = np.zeros(count, dtype=np.intp)
+            keys = [()]
+        if not keys:
+            return
+
+        size = len(keys)
+        partials = []
+        for _, func, column in self._aggregates:
+            if column is None:
+                partials.append((np.bincount(inverse, minlength=size), None, None, None))
+                continue
+            values = env[column][mask]
+            if values.dtype == object:
+                if func != 'count':
+                    raise Exception(f"A agregação {func} exige uma coluna numérica: {column}")
+                valid = values != ""
+            else:
+                valid = ~np.isnan(values)
+            groups_of_valid = inverse[valid]
+            counts = np.bincount(groups_of_valid, minlength=size)
+            sums = minimums = maximums = None
+            if values.dtype.kind == 'i':
+                # Inteiros somados em int64 (bincount com pesos converteria para float64)
+                if func in ('sum', 'avg'):
+                    sums = np.zeros(size, dtype=np.int64)
+                    np.add.at(sums, groups_of_valid, values[valid])
+                elif func == 'min':
+                    minimums = np.full(size, np.iinfo(np.int64).max)
+                    np.minimum.at(minimums, groups_of_valid, values[valid])
+                elif func == 'max':
+                    maximums = np.full(size, np.iinfo(np.int64).min)
+                    np.maximum.at(maximums, groups_of_valid, values[valid])
+            elif func in ('sum', 'avg'):
+                sums = np.bincount(groups_of_valid, weights=values[valid], minlength=size)
+            elif func == 'min':
+                minimums = np.full(size, np.inf)
+                np.minimum.at(minimums, groups_of_valid, values[valid])
+            elif func == 'max':
+                maximums = np.full(size, -np.inf)
+                np.maximum.at(maximums, groups_of_valid, values[valid])
+            partials.append((counts, sums, minimums, maximums))
+
+        for position, key in enumerate(keys):
+            accumulators = groups.get(key)
+            if accumulators is None:
+                accumulators = groups[key] = [[0, 0, float('inf'), float('-inf')] for _ in self._aggregates]
+            for accumulator, (counts, sums, minimums, maximums) in zip(accumulators, partials):
+                accumulator[0] += int(counts[position])
+                # item() mantém int para colunas int64 e float para as demais
+                if sums is not None:
+                    accumulator[1] += sums[position].item()
+                if minimums is not None:
+                    accumulator[2] = min(accumulator[2], minimums[position].item())
+                if maximums is not None:
+                    accumulator[3] = max(accumulator[3], maximums[position].item())
+    @staticmethod
+    def _key_value(value):
+        # NaN não é igual a si mesmo; None mantém os vazios em um único grupo
+        return None if isinstance(value, float) and value != value else value
+    def _finish_groups(self, groups, types):
+        keys = list(groups)
+        columns = {}
+        for position, column in enumerate(self._group_by):
+            dtype = types.get(column, np.dtype(object))
+            dtype = object if dtype == object else np.int64 if dtype.kind == 'i' else np.float64
+            columns[column] = np.array([key[position] for key in keys], dtype=dtype)
+        for index, (name, func, _) in enumerate(self._aggregates):
+            values = []
+            for key in keys:
+                count, total, minimum, maximum = groups[key][index]
+                if func == 'count':
+                    values.append(count)
+                elif not count:
+                    values.append(None)
+                elif func == 'sum':
+                    values.append(total)
+                elif func == 'avg':
+                    values.append(total / count)
+                else:
+                    values.append(minimum if func == 'min' else maximum)
+            columns[name] = self._number_column(values)
+        return columns
+    @staticmethod
+    def _number_column(values):
+        # int64 se todos os valores forem inteiros que cabem nele; senão float64 (None vira NaN)
+        if all(type(value) is int for value in values):
+            try:
+                return np.array(values, dtype=np.int64)
+            except OverflowError:
+                pass
+        return np.array(values, dtype=np.float64)
+class QueryResult:
+    """Resultado de uma SpreadsheetQuery, com uma coluna NumPy por cabeçalho.
+
+    As linhas são convertidas para valores Python só quando lidas, em fatias,
+    para exibição na tabela, exportação ou gravação como nova planilha.
+    """
+    def __init__(self, headers, columns):
+        self.headers = headers
+        self.columns = columns
+        self.row_count = len(columns[0]) if columns else 0
+    @staticmethod
+    def sort_indices(keys):
+        """Índices que ordenam o resultado por [(array, decrescente), ...]; a primeira chave é a principal"""
+        sort_keys = []
+        for values, descending in reversed(keys):
+            if values.dtype == object:
+                # Textos são ordenados pela posição entre os valores únicos
+                _, values = np.unique(values.astype(str), return_inverse=True)
+                values = values.ravel()
+            sort_keys.append(-values if descending else values)
+        return np.lexsort(sort_keys)
+    def get_rows(self, start=0, count=None):
+        """Obtém as linhas [start, start + count) como listas de valores Python"""
+        end = self.row_count if count is None else min(self.row_count, start + count)
+        if start >= end:
+            return []
+        values = [self._to_python(column[start:end]) for column in self.columns]
+        return [list(row) for row in zip(*values)]
+    def iter_rows(self, batch_rows=1000):
+        """Percorre as linhas do resultado em fatias"""
+        for start in range(0, self.row_count, batch_rows):
+            yield from self.get_rows(start, batch_rows)
+    def value(self, row, column):
+        """Obtém o valor de uma célula"""
+        return self._to_python(self.columns[column][row:row + 1])[0]
+    def export(self, file_path, progress_callback=None, is_cancelled=None):
+        """Exporta o resultado para XLSX, TSV ou CSV, como SpreadsheetManager.export"""
+        return SpreadsheetManager.write_file(
+            file_path, self.headers, self.iter_rows(), self.row_count, progress_callback, is_cancelled
+        )
+    def to_spreadsheet(self, spreadsheet_manager, name):
+        """Grava o resultado como uma nova planilha e retorna o seu id"""
+        column_types = ['text' if column.dtype == object else 'int' if column.dtype.kind == 'i' else 'float'
+                        for column in self.columns]
+        with spreadsheet_manager.db.transaction():
+            spreadsheet_id = spreadsheet_manager.create_spreadsheet(name, self.headers, column_types=column_types)
+            for start in range(0, self.row_count, spreadsheet_manager.CHUNK_ROWS):
+                spreadsheet_manager.append_rows(
+                    spreadsheet_id, self.get_rows(start, spreadsheet_manager.CHUNK_ROWS)
+                )
+        return spreadsheet_id
+    @staticmethod
+    def _to_python(values):
+        if values.dtype == object or values.dtype.kind == 'i':
+            return values.tolist()
+        # Números inteiros voltam como int; NaN vira célula vazia
+        return [None if value != value else int(value) if value.is_integer() and abs(value) < 2 ** 53 else value
+                for value in values.tolist()]
 class NotesManager:
     """Classe para gerenciamento completo de anotações"""
     def __init__(self, db):
         self.db = db
     def create_note(self, title, content, tags=""):
         """Cria uma nova anotação"""
-        note_id = self.db.execute_query(
-            '''INSERT INTO notes (title, content, tags) 
-               VALUES (?, ?, ?)''',
-            (title, content, tags)
-        )
+        with self.db.transaction():
+            note_id = self.db.execute_query(
+                '''INSERT INTO notes (title, content, tags) 
+                   VALUES (?, ?, ?)''',
+                (title, content, tags)
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('create', 'notes', f'Created note {title}')
-        )
+            # Registrar no histórico
+            self.db.log_history('create', 'notes', f'Created note {title}')
+            self.db.publish_change('notes', note_id, 'insert')
 
         return note_id
-    def get_notes(self, search_query="", favorite_only=False):
-        """Obtém anotações com pesquisa"""
+    def get_notes(self, search_query="", favorite_only=False, after=None, limit=None):
+        """Obtém anotações com pesquisa (página de `limit` linhas após o (título, id) `after`)"""
         query = "SELECT * FROM notes"
         params = []
 
@@ -634,27 +2377,40 @@ class NotesManager:
         if favorite_only:
             conditions.append("is_favorite = 1")
 
+        if after is not None:
+            conditions.append("(title, id) > (?, ?)")
+            params.extend(after)
+
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
 
-        query += " ORDER BY title"
+        query += " ORDER BY title, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         return self.db.execute_query(query, params, fetchall=True)
     def update_note(self, note_id, **kwargs):
         """Atualiza uma anotação existente"""
         set_clause = ", ".join([f"{k} = ?" for k in kwargs])
         params = list(kwargs.values()) + [note_id]
 
-        self.db.execute_query(
-            f"UPDATE notes SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            params
-        )
+        with self.db.transaction():
+            self.db.execute_query(
+                f"UPDATE notes SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                params
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('update', 'notes', f'Updated note ID {note_id}')
-        )
+            # Registrar no histórico
+            self.db.log_history('update', 'notes', f'Updated note ID {note_id}')
+            self.db.publish_change('notes', note_id, 'update')
+    def delete_note(self, note_id):
+        """Exclui uma anotação"""
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM notes WHERE id = ?", (note_id,))
+
+            # Registrar no histórico
+            self.db.log_history('delete', 'notes', f'Deleted note ID {note_id}')
+            self.db.publish_change('notes', note_id, 'delete')
     def export_to_markdown(self, note_id, file_path):
         """Exporta anotação para Markdown"""
         note = self.db.execute_query(
@@ -671,11 +2427,7 @@ class NotesManager:
                 f.write(f"# {note[0]}\n\n")  # Título
                 f.write(note[1])  # Conteúdo
 
-            self.db.execute_query(
-                '''INSERT INTO history (action, module, details) 
-                   VALUES (?, ?, ?)''',
-                ('export', 'notes', f'Exported note ID {note_id} to Markdown')
-            )
+            self.db.log_history('export', 'notes', f'Exported note ID {note_id} to Markdown')
 
             return True
         except Exception as e:
@@ -686,22 +2438,39 @@ class UtilitiesManager:
         self.db = db
     def add_utility(self, name, utility_type, path=None, command=None):
         """Adiciona um novo utilitário"""
-        utility_id = self.db.execute_query(
-            '''INSERT INTO utilities (name, type, path, command) 
-               VALUES (?, ?, ?, ?)''',
-            (name, utility_type, path, command)
-        )
+        with self.db.transaction():
+            utility_id = self.db.execute_query(
+                '''INSERT INTO utilities (name, type, path, command) 
+                   VALUES (?, ?, ?, ?)''',
+                (name, utility_type, path, command)
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('add', 'utilities', f'Added utility {name}')
-        )
+            # Registrar no histórico
+            self.db.log_history('add', 'utilities', f'Added utility {name}')
+            self.db.publish_change('utilities', utility_id, 'insert')
 
         return utility_id
-    def get_utilities(self, utility_type=None, search_query=""):
-        """Obtém utilitários com filtro e pesquisa"""
+    def update_utility(self, utility_id, **kwargs):
+        """Atualiza um utilitário existente"""
+        set_clause = ", ".join([f"{k} = ?" for k in kwargs])
+        params = list(kwargs.values()) + [utility_id]
+
+        with self.db.transaction():
+            self.db.execute_query(f"UPDATE utilities SET {set_clause} WHERE id = ?", params)
+
+            # Registrar no histórico
+            self.db.log_history('update', 'utilities', f'Updated utility ID {utility_id}')
+            self.db.publish_change('utilities', utility_id, 'update')
+    def delete_utility(self, utility_id):
+        """Exclui um utilitário"""
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM utilities WHERE id = ?", (utility_id,))
+
+            # Registrar no histórico
+            self.db.log_history('delete', 'utilities', f'Deleted utility ID {utility_id}')
+            self.db.publish_change('utilities', utility_id, 'delete')
+    def get_utilities(self, utility_type=None, search_query="", after=None, limit=None):
+        """Obtém utilitários com filtro e pesquisa (página de `limit` linhas após o (nome, id) `after`)"""
         query = "SELECT * FROM utilities"
         params = []
 
@@ -714,10 +2483,17 @@ class UtilitiesManager:
             conditions.append("name LIKE ?")
             params.append(f"%{search_query}%")
 
+        if after is not None:
+            conditions.append("(name, id) > (?, ?)")
+            params.extend(after)
+
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
 
-        query += " ORDER BY name"
+        query += " ORDER BY name, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         return self.db.execute_query(query, params, fetchall=True)
     def execute_utility(self, utility_id):
         """Executa um utilitário"""
@@ -752,11 +2528,7 @@ class UtilitiesManager:
             elif utility_type == "command" and command:
                 subprocess.Popen(command, shell=True)
 
-            self.db.execute_query(
-                '''INSERT INTO history (action, module, details) 
-                   VALUES (?, ?, ?)''',
-                ('execute', 'utilities', f'Executed utility ID {utility_id}')
-            )
+            self.db.log_history('execute', 'utilities', f'Executed utility ID {utility_id}')
 
             return True
         except Exception as e:
@@ -767,30 +2539,58 @@ class CommandsManager:
         self.db = db
     def add_command(self, name, command, category=None, tags=None):
         """Adiciona um novo comando personalizado"""
-        command_id = self.db.execute_query(
-            '''INSERT INTO custom_commands (name, command, category, tags) 
-               VALUES (?, ?, ?, ?)''',
-            (name, command, category, tags)
-        )
+        with self.db.transaction():
+            command_id = self.db.execute_query(
+                '''INSERT INTO custom_commands (name, command, category, tags) 
+                   VALUES (?, ?, ?, ?)''',
+                (name, command, category, tags)
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('add', 'commands', f'Added command {name}')
-        )
+            # Registrar no histórico
+            self.db.log_history('add', 'commands', f'Added command {name}')
+            self.db.publish_change('custom_commands', command_id, 'insert')
 
         return command_id
-    def get_commands(self, search_query=""):
-        """Obtém comandos com pesquisa"""
+    def update_command(self, command_id, **kwargs):
+        """Atualiza um comando personalizado existente"""
+        set_clause = ", ".join([f"{k} = ?" for k in kwargs])
+        params = list(kwargs.values()) + [command_id]
+
+        with self.db.transaction():
+            self.db.execute_query(f"UPDATE custom_commands SET {set_clause} WHERE id = ?", params)
+
+            # Registrar no histórico
+            self.db.log_history('update', 'commands', f'Updated command ID {command_id}')
+            self.db.publish_change('custom_commands', command_id, 'update')
+    def delete_command(self, command_id):
+        """Exclui um comando personalizado"""
+        with self.db.transaction():
+            self.db.execute_query("DELETE FROM custom_commands WHERE id = ?", (command_id,))
+
+            # Registrar no histórico
+            self.db.log_history('delete', 'commands', f'Deleted command ID {command_id}')
+            self.db.publish_change('custom_commands', command_id, 'delete')
+    def get_commands(self, search_query="", after=None, limit=None):
+        """Obtém comandos com pesquisa (página de `limit` linhas após o (nome, id) `after`)"""
         query = "SELECT * FROM custom_commands"
         params = []
 
+        conditions = []
         if search_query:
-            query += " WHERE name LIKE ? OR command LIKE ? OR category LIKE ? OR tags LIKE ?"
+            conditions.append("(name LIKE ? OR command LIKE ? OR category LIKE ? OR tags LIKE ?)")
             params.extend([f"%{search_query}%"] * 4)
 
-        query += " ORDER BY name"
+        if after is not None:
+            conditions.append("(name, id) > (?, ?)")
+            params.extend(after)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY name, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         return self.db.execute_query(query, params, fetchall=True)
     def execute_command(self, command_id):
         """Executa um comando personalizado"""
@@ -813,11 +2613,7 @@ class CommandsManager:
             )
             stdout, stderr = process.communicate()
 
-            self.db.execute_query(
-                '''INSERT INTO history (action, module, details) 
-                   VALUES (?, ?, ?)''',
-                ('execute', 'commands', f'Executed command ID {command_id}')
-            )
+            self.db.log_history('execute', 'commands', f'Executed command ID {command_id}')
 
             if stderr:
                 raise Exception(stderr)
@@ -825,24 +2621,261 @@ class CommandsManager:
             return stdout
         except Exception as e:
             raise Exception(f"Falha ao executar comando: {str(e)}")
+class JsonMigrator:
+    """Migra os dados do app.py (data/*.json) para o banco do Automate Pro.
+
+    Cada arquivo é lido em fluxo, registro a registro, com
+    JSONDecoder.raw_decode sobre um buffer de `chunk_size` bytes, sem
+    carregar a lista inteira. O log de operações do JsonStore
+    (<arquivo>.json.log) é aplicado por cima do snapshot: registros
+    alterados usam a última versão, excluídos são ignorados e os criados
+    depois do snapshot entram no fim. As inserções são feitas em transações
+    de `batch_size` registros, e cada registro migrado fica em
+    json_migration_map junto com o seu novo id, pela chave (arquivo, coleção,
+    id no JsonStore), que não muda se a pasta de dados for movida nem quando
+    o app.py atribui ids aos registros antigos. Uma migração interrompida
+    (cancelada, com erro ou com o programa fechado) continua de onde parou
+    ao ser executada de novo, e executar de novo uma migração completa não
+    duplica nada.
+    """
+    COLLECTIONS = ('projects', 'utilities', 'notes', 'commands')
+    # Coleção do app.py -> (tabela, colunas)
+    TARGETS = {
+        'projects': ('projects', ('name', 'base_dir', 'subfolders', 'description', 'tags', 'created_at')),
+        'utilities': ('utilities', ('name', 'type', 'path')),
+        'notes': ('notes', ('title', 'content', 'tags', 'created_at')),
+        'commands': ('custom_commands', ('name', 'command', 'tags')),
+    }
+    def __init__(self, db, data_dir="data", batch_size=5000, chunk_size=1 << 16):
+        self.db = db
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+    def source_files(self):
+        """Arquivos JSON existentes no diretório de dados, por coleção"""
+        files = {}
+        for collection in self.COLLECTIONS:
+            path = os.path.abspath(os.path.join(self.data_dir, f"{collection}.json"))
+            if os.path.exists(path) or os.path.exists(path + ".log"):
+                files[collection] = path
+        return files
+    def migrate(self, progress_callback=None, is_cancelled=None):
+        """Migra todas as coleções encontradas em data_dir.
+
+        progress_callback(registros_migrados, total_estimado) é chamado a cada
+        transação; se is_cancelled() retornar True a migração para depois da
+        transação atual e o retorno é None (o que já foi gravado fica, e a
+        próxima execução continua dali). Retorna um dicionário com
+        'migrated' (registros inseridos por coleção), 'skipped' (já migrados
+        antes) e 'seconds'.
+        """
+        files = self.source_files()
+        if not files:
+            raise Exception(f"Nenhum arquivo de dados encontrado em {os.path.abspath(self.data_dir)}")
+
+        sizes = {collection: self._file_size(path) for collection, path in files.items()}
+        total_bytes = sum(sizes.values()) or 1
+        stats = {'migrated': {}, 'skipped': 0, 'seconds': 0.0}
+        started = time.perf_counter()
+        done_bytes = 0
+        migrated = 0
+
+        for collection, path in files.items():
+            table, columns = self.TARGETS[collection]
+            insert = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                      f"({', '.join('COALESCE(?, CURRENT_TIMESTAMP)' if c == 'created_at' else '?' for c in columns)})")
+            source = os.path.basename(path)
+            already = {row[0] for row in self.db.execute_query(
+                "SELECT source_id FROM json_migration_map WHERE source = ? AND collection = ?",
+                (source, collection), fetchall=True
+            )}
+            stats['migrated'][collection] = 0
+
+            batch = []
+            fraction = 0.0
+            records = self._iter_records(path)
+            while True:
+                item = next(records, None)
+                if item is not None:
+                    source_id, record, fraction = item
+                    if source_id in already:
+                        stats['skipped'] += 1
+                    else:
+                        batch.append((source_id, self._convert(collection, record)))
+                    if len(batch) < self.batch_size:
+                        continue
+                if batch:
+                    self._insert_batch(insert, source, collection, batch)
+                    stats['migrated'][collection] += len(batch)
+                    migrated += len(batch)
+                    batch = []
+                if is_cancelled and is_cancelled():
+                    records.close()
+                    return None
+                if progress_callback:
+                    read = (done_bytes + sizes[collection] * fraction) / total_bytes
+                    progress_callback(migrated, max(int(migrated / read) if read > 0 else migrated, migrated))
+                if item is None:
+                    break
+            done_bytes += sizes[collection]
+
+        stats['seconds'] = time.perf_counter() - started
+        if migrated:
+            self.db.log_history('import', 'migration', f'Migrated {migrated} records from {os.path.abspath(self.data_dir)}')
+        return stats
+    def _insert_batch(self, insert, source, collection, batch):
+        with self.db.transaction() as conn:
+            mapping = []
+            for source_id, values in batch:
+                mapping.append((source, collection, source_id, conn.execute(insert, values).lastrowid))
+            conn.executemany(
+                "INSERT INTO json_migration_map (source, collection, source_id, target_id) VALUES (?, ?, ?, ?)",
+                mapping
+            )
+            # Lote inteiro: um único evento sem id
+            self.db.publish_change(self.TARGETS[collection][0], None, 'insert')
+    def _iter_records(self, path):
+        """Percorre (id de origem, registro, fração lida) do snapshot com o log aplicado"""
+        log = self._read_log(path + ".log")
+        if os.path.exists(path):
+            next_id = None
+            for record, fraction in self.iter_json_array(path, self.chunk_size):
+                if not isinstance(record, dict):
+                    continue
+                if isinstance(record.get('id'), int):
+                    source_id = record['id']
+                else:
+                    # Arquivos que o app.py ainda não regravou não têm ids: usar o id que o
+                    # JsonStore atribui a eles na primeira carga (maior id + 1, 2... na ordem do arquivo)
+                    if next_id is None:
+                        next_id = self._max_id(path) + 1
+                    source_id = next_id
+                    next_id += 1
+                op = log.pop(source_id, None)
+                if op is not None:
+                    if op['op'] == 'delete':
+                        continue
+                    record = op['record']
+                yield source_id, record, fraction
+        for source_id, op in log.items():
+            if op['op'] == 'put':
+                yield source_id, op['record'], 1.0
+    def _max_id(self, path):
+        return max((record['id'] for record, _ in self.iter_json_array(path, self.chunk_size)
+                    if isinstance(record, dict) and isinstance(record.get('id'), int)), default=0)
+    @staticmethod
+    def _read_log(path):
+        # Última operação de cada id; o log é limitado pela compactação do JsonStore
+        ops = {}
+        if not os.path.exists(path):
+            return ops
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # Linha incompleta de uma gravação interrompida
+                    break
+                ops[op['id']] = op
+        return ops
+    @staticmethod
+    def iter_json_array(path, chunk_size=1 << 16):
+        """Lê em fluxo um arquivo com uma lista JSON, produzindo (item, fração do arquivo lida)"""
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+        size = os.path.getsize(path) or 1
+        with open(path, 'rb') as f:
+            buffer = ""
+            pos = 0
+            eof = False
+            started = False
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] != ']' and started:
+                    try:
+                        item, pos = decoder.raw_decode(buffer, pos)
+                    except ValueError:
+                        if eof:
+                            raise Exception(f"JSON inválido em {os.path.basename(path)}")
+                    else:
+                        yield item, f.tell() / size
+                        continue
+                elif pos < len(buffer):
+                    if buffer[pos] == ']':
+                        return
+                    if buffer[pos] != '[':
+                        raise Exception(f"{os.path.basename(path)} não contém uma lista JSON")
+                    started = True
+                    pos += 1
+                    continue
+                elif eof:
+                    if not started:
+                        return
+                    raise Exception(f"Lista JSON incompleta em {os.path.basename(path)}")
+
+                # Buffer vazio ou item incompleto: ler mais (ao menos o tamanho atual, para itens grandes)
+                data = f.read(max(chunk_size, len(buffer) - pos))
+                eof = not data
+                buffer = buffer[pos:] + utf8.decode(data, final=eof)
+                pos = 0
+    @staticmethod
+    def _file_size(path):
+        return sum(os.path.getsize(p) for p in (path, path + ".log") if os.path.exists(p))
+    @staticmethod
+    def _tags(value):
+        if isinstance(value, (list, tuple)):
+            return ", ".join(str(tag) for tag in value)
+        return value or ""
+    def _convert(self, collection, record):
+        """Valores das colunas de TARGETS para um registro do app.py"""
+        if collection == 'projects':
+            # No app.py o "tipo" digitado é o nome do projeto
+            name = record.get('type') or os.path.basename(record.get('project_dir') or '') or "Projeto"
+            subfolders = record.get('subfolders') or []
+            return (
+                name,
+                record.get('project_dir') or record.get('base_dir'),
+                "\n".join(subfolders) if isinstance(subfolders, list) else subfolders,
+                record.get('description') or "",
+                self._tags(record.get('tags')),
+                record.get('date') or None,
+            )
+        if collection == 'utilities':
+            path = record.get('path') or ""
+            return (
+                record.get('name') or path,
+                'site' if path.startswith(('http://', 'https://')) else 'app',
+                path,
+            )
+        if collection == 'notes':
+            return (
+                record.get('title') or "Sem título",
+                record.get('content') or "",
+                self._tags(record.get('tags')),
+                record.get('date') or None,
+            )
+        return (
+            record.get('title') or record.get('name') or "Sem título",
+            record.get('command') or "",
+            self._tags(record.get('tags')),
+        )
 class RemindersManager:
     """Classe para gerenciamento completo de lembretes"""
     def __init__(self, db):
         self.db = db
     def add_reminder(self, title, description, due_date):
         """Adiciona um novo lembrete"""
-        reminder_id = self.db.execute_query(
-            '''INSERT INTO reminders (title, description, due_date) 
-               VALUES (?, ?, ?)''',
-            (title, description, due_date)
-        )
+        with self.db.transaction():
+            reminder_id = self.db.execute_query(
+                '''INSERT INTO reminders (title, description, due_date) 
+                   VALUES (?, ?, ?)''',
+                (title, description, due_date)
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('add', 'reminders', f'Added reminder {title}')
-        )
+            # Registrar no histórico
+            self.db.log_history('add', 'reminders', f'Added reminder {title}')
+            self.db.publish_change('reminders', reminder_id, 'insert')
 
         return reminder_id
     def get_reminders(self, upcoming_only=True):
@@ -856,17 +2889,15 @@ class RemindersManager:
         return self.db.execute_query(query, fetchall=True)
     def mark_completed(self, reminder_id):
         """Marca um lembrete como concluído"""
-        self.db.execute_query(
-            "UPDATE reminders SET is_completed = 1 WHERE id = ?",
-            (reminder_id,)
-        )
+        with self.db.transaction():
+            self.db.execute_query(
+                "UPDATE reminders SET is_completed = 1 WHERE id = ?",
+                (reminder_id,)
+            )
 
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('complete', 'reminders', f'Completed reminder ID {reminder_id}')
-        )
+            # Registrar no histórico
+            self.db.log_history('complete', 'reminders', f'Completed reminder ID {reminder_id}')
+            self.db.publish_change('reminders', reminder_id, 'update')
 class BackupManager:
     """Classe para gerenciamento completo de backups"""
     def __init__(self, db):
@@ -879,15 +2910,11 @@ class BackupManager:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_file = os.path.join(backup_dir, f"automatepro_backup_{timestamp}.db")
 
-        # Copiar o arquivo do banco de dados
-        shutil.copy2(self.db.db_path, backup_file)
+        # Copiar o banco de dados (inclui o conteúdo ainda no arquivo WAL)
+        self.db.backup_to(backup_file)
 
         # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('backup', 'system', 'Created system backup')
-        )
+        self.db.log_history('backup', 'system', 'Created system backup')
 
         return backup_file
     def restore_backup(self, backup_file):
@@ -900,19 +2927,644 @@ class BackupManager:
             os.path.dirname(self.db.db_path),
             f"automatepro_pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
         )
-        shutil.copy2(self.db.db_path, current_backup)
+        self.db.flush_history()
+        self.db.backup_to(current_backup)
 
         # Restaurar o backup
-        shutil.copy2(backup_file, self.db.db_path)
+        self.db.restore_from(backup_file)
 
         # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('restore', 'system', 'Restored system from backup')
+        self.db.log_history('restore', 'system', 'Restored system from backup')
+class HistoryRetentionManager:
+    """Classe para retenção e compactação da tabela de histórico"""
+    def __init__(self, db):
+        self.db = db
+        self._lock = threading.Lock()
+    def run(self, retention_days, vacuum_pages=2000):
+        """Agrega e remove o histórico antigo e libera páginas livres do arquivo.
+
+        Linhas com mais de retention_days dias viram contagens diárias por
+        módulo e ação em history_daily e são apagadas na mesma transação.
+        Retorna o número de linhas removidas, ou None se já estiver em execução.
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            cutoff = f"-{int(retention_days)} days"
+            self.db.flush_history()
+
+            with self.db.transaction():
+                self.db.execute_query(
+                    '''INSERT INTO history_daily (day, module, action, count)
+                       SELECT date(timestamp), module, action, COUNT(*)
+                       FROM history
+                       WHERE timestamp < datetime('now', ?)
+                       GROUP BY date(timestamp), module, action
+                       ON CONFLICT (day, module, action) DO UPDATE SET count = count + excluded.count''',
+                    (cutoff,)
+                )
+                self.db.execute_query(
+                    "DELETE FROM history WHERE timestamp < datetime('now', ?)",
+                    (cutoff,)
+                )
+                removed = self.db.execute_query("SELECT changes()", fetchone=True)[0]
+
+            self.vacuum(vacuum_pages)
+            return removed
+        finally:
+            self._lock.release()
+    def vacuum(self, pages):
+        """Devolve ao sistema até `pages` páginas livres (VACUUM incremental).
+
+        Só vale para bancos criados com auto_vacuum = INCREMENTAL (init_db);
+        nos mais antigos nada é feito, já que converter exigiria um VACUUM
+        completo que bloqueia o banco.
+        """
+        if self.db.execute_query("PRAGMA auto_vacuum", fetchone=True)[0] != 2:
+            return
+        self.db.execute_query(f"PRAGMA incremental_vacuum({int(pages)})", fetchall=True)
+    def get_daily_summary(self, module=None):
+        """Obtém as contagens diárias agregadas do histórico"""
+        query = "SELECT day, module, action, count FROM history_daily"
+        params = []
+
+        if module:
+            query += " WHERE module = ?"
+            params.append(module)
+
+        query += " ORDER BY day DESC, module, action"
+        return self.db.execute_query(query, params, fetchall=True)
+class DashboardStats:
+    """Classe para os números e listas do dashboard.
+
+    Os totais vêm de table_counts, mantida por triggers a cada inclusão e
+    exclusão, e as listas usam índices com LIMIT: o custo de abrir o
+    dashboard não depende da quantidade de dados.
+    """
+    def __init__(self, db):
+        self.db = db
+    def counts(self):
+        """Obtém o total de linhas de cada tabela contada ({tabela: total})"""
+        rows = self.db.execute_query("SELECT name, count FROM table_counts", fetchall=True)
+        counts = dict.fromkeys(DatabaseManager.COUNTED_TABLES, 0)
+        counts.update(rows)
+        return counts
+    def recent_projects(self, limit=5):
+        """Obtém os projetos criados mais recentemente (id, nome)"""
+        return self.db.execute_query(
+            "SELECT id, name FROM projects ORDER BY created_at DESC LIMIT ?",
+            (limit,), fetchall=True
+        )
+    def upcoming_reminders(self, limit=5):
+        """Obtém os próximos lembretes pendentes (id, título, vencimento)"""
+        return self.db.execute_query(
+            "SELECT id, title, due_date FROM reminders "
+            "WHERE is_completed = 0 AND due_date >= datetime('now') "
+            "ORDER BY due_date LIMIT ?",
+            (limit,), fetchall=True
+        )
+    def snapshot(self):
+        """Obtém de uma vez tudo o que o dashboard exibe"""
+        return {
+            'counts': self.counts(),
+            'recent_projects': self.recent_projects(),
+            'reminders': self.upcoming_reminders(),
+        }
+class BackgroundTask(QThread):
+    """Executa uma tarefa longa fora da thread da interface.
+
+    A função recebe progress(feito, total) e is_cancelled(); o progresso, o
+    resultado e os erros chegam à interface por sinais.
+    """
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    def __init__(self, task, parent=None):
+        super().__init__(parent)
+        self.task = task
+        self._cancelled = threading.Event()
+    def cancel(self):
+        self._cancelled.set()
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+    def run(self):
+        try:
+            result = self.task(self.progress.emit, self.is_cancelled)
+            self.succeeded.emit(result)
+        except Exception as e:
+            self.failed.emit(str(e))
+class SpreadsheetTableModel(QAbstractTableModel):
+    """Modelo virtualizado para exibir planilhas grandes em um QTableView.
+
+    As linhas são buscadas sob demanda (canFetchMore/fetchMore) em blocos do
+    SpreadsheetManager, e apenas os últimos `cache_chunks` blocos lidos ficam
+    em memória (LRU). Ordenação e filtro mantêm somente um índice das linhas
+    de origem, sem materializar a planilha inteira; esse índice é calculado
+    em uma BackgroundTask e o sinal `busy` avisa a interface enquanto isso.
+
+    Edições ficam pendentes em memória (o sinal `edited` avisa a interface) e
+    save() as grava de uma vez com SpreadsheetManager.patch_cells.
+    """
+    edited = pyqtSignal()
+    busy = pyqtSignal(bool)
+    def __init__(self, spreadsheet_manager, spreadsheet_id, cache_chunks=32, parent=None):
+        super().__init__(parent)
+        self.spreadsheet_manager = spreadsheet_manager
+        self.spreadsheet_id = spreadsheet_id
+        self.chunk_rows = spreadsheet_manager.CHUNK_ROWS
+        self.cache_chunks = cache_chunks
+        self.headers = spreadsheet_manager.get_headers(spreadsheet_id)
+        self.column_types = spreadsheet_manager.get_column_types(spreadsheet_id)
+        self._pending = {}  # (linha de origem, coluna) -> valor ainda não gravado
+        self._cache = OrderedDict()
+        self._order = None  # Índice das linhas de origem após ordenação/filtro
+        self._sort = None  # (coluna, decrescente) da ordenação ativa
+        self._filter = ("", None)  # (texto, coluna) do filtro ativo
+        self._worker = None
+        self._generation = 0
+        self._total = spreadsheet_manager.get_row_count(spreadsheet_id)
+        self._loaded = 0
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._visible_count()
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.chunk_rows, self._visible_count() - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole,
+                                               Qt.ItemDataRole.EditRole):
+            return None
+        row = self.source_row(index.row())
+        key = (row, index.column())
+        if key in self._pending:
+            value = self._pending[key]
+        else:
+            values = self._row(row)
+            if values is None or index.column() >= len(values):
+                return None
+            value = values[index.column()]
+        return "" if value is None else str(value)
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """Guarda a edição como pendente, convertendo números conforme o tipo da coluna"""
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        column = index.column()
+        kind = self.column_types[column] if column < len(self.column_types) else 'text'
+        if kind != 'text':
+            value = SpreadsheetManager._cast_number(int if kind == 'int' else float, str(value).strip())
+        self._pending[(self.source_row(index.row()), column)] = value
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        self.edited.emit()
+        return True
+    def has_pending_changes(self):
+        return bool(self._pending)
+    def save(self):
+        """Grava as edições pendentes como uma única alteração no diário"""
+        if not self._pending:
+            return None
+        changes = [(row, column, value) for (row, column), value in self._pending.items()]
+        change_id = self.spreadsheet_manager.patch_cells(self.spreadsheet_id, changes)
+        self._invalidate(row for row, _ in self._pending)
+        self._pending = {}
+        return change_id
+    def undo(self):
+        """Desfaz a última alteração gravada (as pendentes são gravadas antes)"""
+        self.save()
+        self._refresh_cells(self.spreadsheet_manager.undo(self.spreadsheet_id))
+    def redo(self):
+        """Refaz a última alteração desfeita"""
+        self.save()
+        self._refresh_cells(self.spreadsheet_manager.redo(self.spreadsheet_id))
+    def _refresh_cells(self, cells):
+        if not cells:
+            return
+        self._invalidate(row for row, _ in cells)
+        if self._loaded:
+            self.dataChanged.emit(self.index(0, 0), self.index(self._loaded - 1, len(self.headers) - 1))
+    def _invalidate(self, rows):
+        for chunk_no in {row // self.chunk_rows for row in rows}:
+            self._cache.pop(chunk_no, None)
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(self.source_row(section) + 1)
+    def source_row(self, row):
+        """Converte a linha exibida no índice da linha na planilha"""
+        return self._order[row] if self._order is not None else row
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Ordena pela coluna guardando apenas as chaves dessa coluna"""
+        if column < 0:
+            return
+        self._sort = (column, order == Qt.SortOrder.DescendingOrder)
+        self._reorder()
+    def set_filter(self, text, column=None):
+        """Mostra apenas as linhas que contêm `text` (em uma coluna ou em qualquer uma)"""
+        self._filter = (text.strip().lower(), column)
+        self._reorder()
+    def is_busy(self):
+        return self._worker is not None
+    def close(self):
+        """Cancela a varredura em andamento antes de o modelo ser descartado.
+
+        Espera a BackgroundTask parar (ela confere o cancelamento a cada bloco),
+        para que não seja destruída rodando junto com o modelo, e emite
+        busy(False) se a varredura ainda não tinha terminado.
+        """
+        self._generation += 1
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.cancel()
+            worker.wait()
+            self.busy.emit(False)
+    def _reorder(self):
+        """Recalcula o índice das linhas com o filtro e a ordenação ativos.
+
+        A planilha é percorrida em uma BackgroundTask, guardando só as linhas
+        que passam no filtro e as chaves da coluna ordenada; o índice novo é
+        aplicado quando a tarefa termina. Cada chamada inicia uma nova
+        geração: a tarefa anterior é cancelada e seu resultado, descartado.
+        """
+        self.save()
+        if self._worker is not None:
+            self._worker.cancel()
+        else:
+            self.busy.emit(True)
+        self._generation += 1
+        generation = self._generation
+        manager = self.spreadsheet_manager
+        spreadsheet_id = self.spreadsheet_id
+        text, filter_column = self._filter
+        sort_column, descending = self._sort or (None, False)
+        sort_key = self._sort_key
+        total = self._total
+
+        def task(progress, is_cancelled):
+            if not text and sort_column is None:
+                return None
+            rows = array('l')
+            keys = []
+            for row, values in enumerate(manager.iter_rows(spreadsheet_id)):
+                if row % manager.CHUNK_ROWS == 0:
+                    if is_cancelled():
+                        return None
+                    progress(row, total)
+                if text:
+                    cells = values[filter_column:filter_column + 1] if filter_column is not None else values
+                    if not any(text in str(value).lower() for value in cells if value is not None):
+                        continue
+                rows.append(row)
+                if sort_column is not None:
+                    keys.append(sort_key(values[sort_column] if sort_column < len(values) else None))
+            if sort_column is None:
+                return rows
+            positions = sorted(range(len(rows)), key=keys.__getitem__, reverse=descending)
+            return array('l', (rows[position] for position in positions))
+
+        worker = BackgroundTask(task, self)
+        worker.succeeded.connect(lambda order: self._reordered(worker, generation, order))
+        worker.failed.connect(lambda message: self._reorder_failed(worker, generation, message))
+        worker.finished.connect(worker.deleteLater)
+        self._worker = worker
+        worker.start()
+    def _reordered(self, worker, generation, order):
+        if worker is not self._worker or generation != self._generation:
+            return
+        self._worker = None
+        self.beginResetModel()
+        self._order = order
+        self._loaded = min(self._loaded or self.chunk_rows, self._visible_count())
+        self.endResetModel()
+        self.busy.emit(False)
+    def _reorder_failed(self, worker, generation, message):
+        if worker is not self._worker or generation != self._generation:
+            return
+        self._worker = None
+        self.busy.emit(False)
+        print(f"Erro ao ordenar/filtrar a planilha: {message}")
+    def _visible_count(self):
+        return len(self._order) if self._order is not None else self._total
+    @staticmethod
+    def _sort_key(value):
+        # Números antes de textos, comparando números pelo valor
+        if value is None or value == "":
+            return (2, 0, "")
+        try:
+            return (0, float(value), "")
+        except (TypeError, ValueError):
+            return (1, 0, str(value).lower())
+    def _row(self, row):
+        chunk_no = row // self.chunk_rows
+        chunk = self._cache.get(chunk_no)
+        if chunk is None:
+            chunk = self.spreadsheet_manager.get_rows(
+                self.spreadsheet_id, chunk_no * self.chunk_rows, self.chunk_rows
+            )
+            self._cache[chunk_no] = chunk
+            if len(self._cache) > self.cache_chunks:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(chunk_no)
+        offset = row - chunk_no * self.chunk_rows
+        return chunk[offset] if offset < len(chunk) else None
+class QueryResultTableModel(QAbstractTableModel):
+    """Modelo para exibir um QueryResult no QTableView das planilhas.
+
+    Segue o SpreadsheetTableModel: linhas inseridas sob demanda e ordenação e
+    filtro mantidos como um índice das linhas do resultado, calculado com NumPy.
+    """
+    def __init__(self, result, chunk_rows=1000, parent=None):
+        super().__init__(parent)
+        self.result = result
+        self.headers = result.headers
+        self.chunk_rows = chunk_rows
+        self._order = None  # Índice das linhas do resultado após ordenação/filtro
+        self._loaded = min(chunk_rows, result.row_count)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self._visible_count()
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.chunk_rows, self._visible_count() - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        value = self.result.value(self.source_row(index.row()), index.column())
+        return "" if value is None else str(value)
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(self.source_row(section) + 1)
+    def source_row(self, row):
+        """Converte a linha exibida no índice da linha no resultado"""
+        return int(self._order[row]) if self._order is not None else row
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Ordena pela coluna, mantendo o filtro atual"""
+        if column < 0:
+            return
+        indices = QueryResult.sort_indices(
+            [(self.result.columns[column], order == Qt.SortOrder.DescendingOrder)]
+        )
+        if self._order is not None:
+            indices = indices[np.isin(indices, self._order)]
+
+        self.beginResetModel()
+        self._order = indices
+        self._loaded = min(self._loaded or self.chunk_rows, len(self._order))
+        self.endResetModel()
+    def set_filter(self, text, column=None):
+        """Mostra apenas as linhas que contêm `text` (em uma coluna ou em qualquer uma)"""
+        text = text.strip().lower()
+        self.beginResetModel()
+        if not text:
+            self._order = None
+        else:
+            columns = self.result.columns if column is None else [self.result.columns[column]]
+            matches = np.zeros(self.result.row_count, dtype=bool)
+            for values in columns:
+                matches |= np.char.find(np.char.lower(values.astype(str)), text) >= 0
+            self._order = np.flatnonzero(matches)
+        self._loaded = min(self.chunk_rows, self._visible_count())
+        self.endResetModel()
+    def _visible_count(self):
+        return len(self._order) if self._order is not None else self.result.row_count
+class RecordListModel(QAbstractListModel):
+    """Modelo das listas de registros (projetos, anotações, aplicativos, sites e comandos).
+
+    Exibe o título de cada linha e guarda o id em UserRole, como os antigos
+    QListWidgetItem. As linhas vêm do banco em páginas de PAGE_SIZE por uma
+    função fetch_page(after, limit), em que `after` é o (título, id) da última
+    linha já carregada (paginação por chave); fetchMore pede a próxima página
+    quando a view chega ao fim.
+
+    As páginas são lidas em uma BackgroundTask. Cada set_query inicia uma nova
+    geração: a consulta anterior é interrompida (DatabaseManager.interruptible)
+    e resultados de gerações antigas são descartados. As linhas atuais
+    continuam visíveis até a nova primeira página chegar.
+
+    Com `entity` (a tabela exibida), apply_change atualiza só a linha
+    afetada por um ChangeEvent, sem recarregar a lista.
+    """
+    PAGE_SIZE = 200
+    # Coluna de título de cada tabela, a mesma da ordenação de fetch_page
+    TITLE_FIELDS = {'projects': 'name', 'notes': 'title', 'utilities': 'name', 'custom_commands': 'name'}
+    def __init__(self, db, title_column=1, parent=None, entity=None):
+        super().__init__(parent)
+        self.db = db
+        self.title_column = title_column
+        self.entity = entity
+        self._patch_workers = set()
+        self._rows = []  # (id, título)
+        self._fetch_page = None
+        self._generation = 0
+        self._worker = None
+        self._exhausted = True
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._rows[index.row()][1]
+        if role == Qt.ItemDataRole.UserRole:
+            return self._rows[index.row()][0]
+        return None
+    def set_query(self, fetch_page):
+        """Troca a consulta da lista e carrega a primeira página em segundo plano"""
+        self._fetch_page = fetch_page
+        self._generation += 1
+        self._load(None)
+    def refresh(self):
+        """Recarrega a consulta atual (após incluir, alterar ou excluir registros)"""
+        if self._fetch_page is not None:
+            self.set_query(self._fetch_page)
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and self._worker is None
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent) and self._rows:
+            last_id, last_title = self._rows[-1]
+            self._load((last_title, last_id))
+    def _load(self, after):
+        if self._worker is not None:
+            # A consulta em andamento ficou obsoleta
+            self._worker.cancel()
+
+        generation = self._generation
+        fetch_page = self._fetch_page
+        limit = self.PAGE_SIZE
+
+        def task(progress, is_cancelled):
+            with self.db.interruptible(is_cancelled):
+                return fetch_page(after, limit)
+
+        worker = BackgroundTask(task, self)
+        worker.succeeded.connect(lambda rows: self._page_loaded(worker, generation, after, rows))
+        worker.failed.connect(lambda message: self._page_failed(worker, generation, message))
+        worker.finished.connect(worker.deleteLater)
+        self._worker = worker
+        worker.start()
+    def _page_loaded(self, worker, generation, after, rows):
+        if worker is self._worker:
+            self._worker = None
+        if generation != self._generation:
+            return
+
+        rows = [(row[0], row[self.title_column]) for row in rows]
+        self._exhausted = len(rows) < self.PAGE_SIZE
+        if after is None:
+            self.beginResetModel()
+            self._rows = rows
+            self.endResetModel()
+        elif rows:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+    def _page_failed(self, worker, generation, message):
+        if worker is self._worker:
+            self._worker = None
+        # Consultas interrompidas por uma pesquisa mais nova não são erros
+        if generation == self._generation:
+            self._exhausted = True
+            print(f"Erro ao carregar a lista: {message}")
+    def apply_change(self, event):
+        """Aplica um ChangeEvent da tabela da lista.
+
+        Exclusões removem a linha carregada. Em inclusões e alterações o
+        título é relido e fetch_page((título, id - 1), 1) diz se a linha
+        pertence à consulta atual; se pertencer, ela entra na posição da
+        ordenação (ou fica para o fetchMore, se cair depois da última página
+        carregada). Eventos sem id recarregam a lista.
+        """
+        if event.entity != self.entity or self._fetch_page is None:
+            return
+        if event.item_id is None or self._worker is not None:
+            self.refresh()
+            return
+        if event.op == 'delete':
+            self._remove_row(event.item_id)
+            return
+
+        generation = self._generation
+        fetch_page = self._fetch_page
+        item_id = event.item_id
+        title_query = f"SELECT {self.TITLE_FIELDS[self.entity]} FROM {self.entity} WHERE id = ?"
+
+        def task(progress, is_cancelled):
+            row = self.db.execute_query(title_query, (item_id,), fetchone=True)
+            if row is None:
+                return None
+            rows = fetch_page((row[0], item_id - 1), 1)
+            return rows[0] if rows and rows[0][0] == item_id else None
+
+        worker = BackgroundTask(task, self)
+        worker.succeeded.connect(lambda row: self._patch_row(generation, item_id, row))
+        worker.failed.connect(lambda message: print(f"Erro ao atualizar a lista: {message}"))
+        worker.finished.connect(lambda: self._patch_workers.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        self._patch_workers.add(worker)
+        worker.start()
+    def _patch_row(self, generation, item_id, row):
+        if generation != self._generation:
+            return
+        if self._worker is not None:
+            # Uma página chegando agora pode ou não conter a linha
+            self.refresh()
+            return
+
+        self._remove_row(item_id)
+        if row is None:
+            return
+        key = (row[self.title_column], item_id)
+        position = next(
+            (index for index, (row_id, title) in enumerate(self._rows) if (title, row_id) > key),
+            len(self._rows)
+        )
+        if position == len(self._rows) and not self._exhausted:
+            return
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, (item_id, row[self.title_column]))
+        self.endInsertRows()
+    def _remove_row(self, item_id):
+        for position, (row_id, title) in enumerate(self._rows):
+            if row_id == item_id:
+                self.beginRemoveRows(QModelIndex(), position, position)
+                del self._rows[position]
+                self.endRemoveRows()
+                return
+class SearchManager:
+    """Classe para busca global em todos os módulos"""
+    def __init__(self, db):
+        self.db = db
+    @staticmethod
+    def build_match_query(text):
+        """Converte o texto digitado em uma consulta FTS5 segura (prefixo por termo)"""
+        terms = re.findall(r"\w+", text)
+        return " ".join(f'"{term}"*' for term in terms)
+    def search(self, query, limit=50):
+        """Busca em todos os módulos e retorna (módulo, id, título, trecho) por relevância"""
+        match_query = self.build_match_query(query)
+        if not match_query:
+            return []
+
+        if not getattr(self.db, 'fts_available', False):
+            return self._search_like(query, limit)
+
+        return self.db.execute_query(
+            '''SELECT module, item_id, title,
+                      snippet(search_index, 3, '[', ']', '...', 12)
+               FROM search_index
+               WHERE search_index MATCH ?
+               ORDER BY bm25(search_index, 0.0, 0.0, 10.0, 1.0)
+               LIMIT ?''',
+            (match_query, limit),
+            fetchall=True
         )
+    def _search_like(self, query, limit):
+        """Busca alternativa com LIKE para SQLite sem suporte a FTS5"""
+        results = []
+        pattern = f"%{query}%"
+        for table, (_, module, title_expr, body_expr) in DatabaseManager.SEARCH_SOURCES.items():
+            title_sql = title_expr.format(t=table)
+            body_sql = body_expr.format(t=table)
+            try:
+                results.extend(self.db.execute_query(
+                    f"SELECT '{module}', id, {title_sql}, substr({body_sql}, 1, 120) FROM {table} "
+                    f"WHERE {title_sql} LIKE ? OR {body_sql} LIKE ? LIMIT ?",
+                    (pattern, pattern, limit),
+                    fetchall=True
+                ))
+            except sqlite3.OperationalError:
+                continue
+        return results[:limit]
 class MainWindow(QMainWindow):
     """Classe principal da janela do aplicativo"""
+    # Eventos do ChangeBus, repassados à thread da interface
+    data_changed = pyqtSignal(object)
 
     def __init__(self):
         super().__init__()
@@ -930,7 +3582,20 @@ class MainWindow(QMainWindow):
         self.commands_manager = CommandsManager(self.db)
         self.reminders_manager = RemindersManager(self.db)
         self.backup_manager = BackupManager(self.db)
-        self.download_manager = DownloadManager(self.db)
+        self.download_manager = DownloadManager(
+            self.db,
+            int(self.settings.get('max_parallel_downloads', '3')),
+            HttpTransport(
+                pool_size=int(self.settings.get('download_pool_size', '12')),
+                retries=int(self.settings.get('download_retries', '3')),
+                timeout=(10, int(self.settings.get('download_timeout', '60')))
+            )
+        )
+        self.search_manager = SearchManager(self.db)
+        self.dashboard_stats = DashboardStats(self.db)
+        self.dashboard_worker = None
+        self.dashboard_refresh_pending = False
+        self.history_retention_manager = HistoryRetentionManager(self.db)
 
         # Configurar janela principal
         self.setWindowTitle("Automate Pro")
@@ -958,9 +3623,19 @@ class MainWindow(QMainWindow):
             interval = int(self.settings.get('backup_interval', '7')) * 24 * 3600 * 1000
             self.backup_timer.start(interval)
 
+        # Configurar timer para retenção do histórico (uma vez ao iniciar e depois diariamente)
+        self.history_retention_timer = QTimer(self)
+        self.history_retention_timer.timeout.connect(self.run_history_retention)
+        self.history_retention_timer.start(24 * 3600 * 1000)
+        QTimer.singleShot(60000, self.run_history_retention)
+
         # Aplicar tema
         self.theme_manager.apply_theme(QApplication.instance())
 
+        # Manter listas e dashboard em dia a cada alteração nos dados (inclusive as feitas em segundo plano)
+        self.data_changed.connect(self.on_data_changed)
+        self.db.changes.subscribe(self.data_changed.emit)
+
         # Carregar dados iniciais
         self.load_initial_data()
 
@@ -999,6 +3674,10 @@ class MainWindow(QMainWindow):
         self.backup_action.setShortcut("Ctrl+B")
         self.backup_action.triggered.connect(self.create_manual_backup)
 
+        self.migrate_json_action = QAction(QIcon.fromTheme("document-import"), "&Migrar dados do PAS (JSON)...", self)
+        self.migrate_json_action.setStatusTip("Importa projetos, utilitários, anotações e comandos do app.py")
+        self.migrate_json_action.triggered.connect(self.migrate_json_data)
+
         # Atalhos globais
         self.search_shortcut = QShortcut(QKeySequence("Ctrl+F"), self)
         self.search_shortcut.activated.connect(self.focus_search)
@@ -1017,6 +3696,7 @@ class MainWindow(QMainWindow):
         file_menu = menubar.addMenu("&Arquivo")
         file_menu.addAction(self.new_project_action)
         file_menu.addAction(self.backup_action)
+        file_menu.addAction(self.migrate_json_action)
         file_menu.addSeparator()
         file_menu.addAction(self.clean_system_action)  # Adicione esta linha
         file_menu.addSeparator()
@@ -1265,7 +3945,7 @@ class MainWindow(QMainWindow):
         search_layout = QHBoxLayout()
         self.projects_search_input = QLineEdit()
         self.projects_search_input.setPlaceholderText("Pesquisar projetos...")
-        self.projects_search_input.textChanged.connect(self.filter_projects)
+        self.projects_search_input.textChanged.connect(self.debounced(self.filter_projects))
 
         self.projects_filter_combo = QComboBox()
         self.projects_filter_combo.addItems(["Todos", "Favoritos", "Web", "Desktop", "Mobile", "Script", "Outro"])
@@ -1276,9 +3956,8 @@ class MainWindow(QMainWindow):
         existing_projects_layout.addLayout(search_layout)
 
         # Lista de projetos
-        self.projects_list = QListWidget()
-        self.projects_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.projects_list.itemDoubleClicked.connect(self.open_project)
+        self.projects_list = self.create_record_list('projects')
+        self.projects_list.doubleClicked.connect(self.open_project)
         existing_projects_layout.addWidget(self.projects_list)
 
         # Botões de ação
@@ -1358,12 +4037,31 @@ class MainWindow(QMainWindow):
         self.spreadsheets_list.itemDoubleClicked.connect(self.open_spreadsheet)
         existing_spreadsheets_layout.addWidget(self.spreadsheets_list)
 
-        # Visualização da tabela
-        self.spreadsheet_table = QTableWidget()
-        self.spreadsheet_table.setColumnCount(0)
-        self.spreadsheet_table.setRowCount(0)
+        # Visualização da tabela (modelo virtualizado, preenchido ao abrir uma planilha)
+        self.spreadsheet_filter_input = QLineEdit()
+        self.spreadsheet_filter_input.setPlaceholderText("Filtrar linhas da planilha aberta...")
+        self.spreadsheet_filter_input.returnPressed.connect(self.filter_spreadsheet_rows)
+        existing_spreadsheets_layout.addWidget(self.spreadsheet_filter_input)
+
+        self.spreadsheet_table = QTableView()
+        self.spreadsheet_table.setSortingEnabled(True)
+        self.spreadsheet_table.horizontalHeader().setSortIndicatorShown(True)
+        self.spreadsheet_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.spreadsheet_model = None
         existing_spreadsheets_layout.addWidget(self.spreadsheet_table)
 
+        # Edições de células são gravadas em lote alguns segundos após a última alteração
+        self.spreadsheet_autosave_timer = QTimer(self)
+        self.spreadsheet_autosave_timer.setSingleShot(True)
+        self.spreadsheet_autosave_timer.setInterval(2000)
+        self.spreadsheet_autosave_timer.timeout.connect(self.save_spreadsheet_edits)
+
+        for sequence, handler in ((QKeySequence.StandardKey.Undo, self.undo_spreadsheet_edit),
+                                  (QKeySequence.StandardKey.Redo, self.redo_spreadsheet_edit)):
+            shortcut = QShortcut(QKeySequence(sequence), self.spreadsheet_table)
+            shortcut.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(handler)
+
         # Botões de ação
         spreadsheets_buttons_layout = QHBoxLayout()
         open_spreadsheet_button = QPushButton("Abrir")
@@ -1374,11 +4072,23 @@ class MainWindow(QMainWindow):
         delete_spreadsheet_button.clicked.connect(self.delete_spreadsheet)
         export_spreadsheet_button = QPushButton("Exportar")
         export_spreadsheet_button.clicked.connect(self.export_spreadsheet)
+        import_spreadsheet_button = QPushButton("Importar")
+        import_spreadsheet_button.clicked.connect(self.import_spreadsheet)
+        query_spreadsheet_button = QPushButton("Consultar")
+        query_spreadsheet_button.clicked.connect(self.query_spreadsheet)
+        undo_spreadsheet_button = QPushButton("Desfazer")
+        undo_spreadsheet_button.clicked.connect(self.undo_spreadsheet_edit)
+        redo_spreadsheet_button = QPushButton("Refazer")
+        redo_spreadsheet_button.clicked.connect(self.redo_spreadsheet_edit)
 
         spreadsheets_buttons_layout.addWidget(open_spreadsheet_button)
         spreadsheets_buttons_layout.addWidget(edit_spreadsheet_button)
         spreadsheets_buttons_layout.addWidget(delete_spreadsheet_button)
         spreadsheets_buttons_layout.addWidget(export_spreadsheet_button)
+        spreadsheets_buttons_layout.addWidget(import_spreadsheet_button)
+        spreadsheets_buttons_layout.addWidget(query_spreadsheet_button)
+        spreadsheets_buttons_layout.addWidget(undo_spreadsheet_button)
+        spreadsheets_buttons_layout.addWidget(redo_spreadsheet_button)
         existing_spreadsheets_layout.addLayout(spreadsheets_buttons_layout)
 
         layout.addWidget(self.spreadsheets_tab)
@@ -1492,7 +4202,7 @@ class MainWindow(QMainWindow):
         apps_top_layout = QHBoxLayout()
         self.apps_search_input = QLineEdit()
         self.apps_search_input.setPlaceholderText("Pesquisar aplicativos...")
-        self.apps_search_input.textChanged.connect(self.filter_apps)
+        self.apps_search_input.textChanged.connect(self.debounced(self.filter_apps))
 
         add_app_button = QPushButton("Adicionar Aplicativo")
         add_app_button.clicked.connect(self.show_add_app_dialog)
@@ -1502,9 +4212,8 @@ class MainWindow(QMainWindow):
         apps_layout.addLayout(apps_top_layout)
 
         # Lista de aplicativos
-        self.apps_list = QListWidget()
-        self.apps_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.apps_list.itemDoubleClicked.connect(self.run_app)
+        self.apps_list = self.create_record_list('utilities')
+        self.apps_list.doubleClicked.connect(self.run_app)
         apps_layout.addWidget(self.apps_list)
 
         # Botões de ação
@@ -1528,7 +4237,7 @@ class MainWindow(QMainWindow):
         sites_top_layout = QHBoxLayout()
         self.sites_search_input = QLineEdit()
         self.sites_search_input.setPlaceholderText("Pesquisar sites...")
-        self.sites_search_input.textChanged.connect(self.filter_sites)
+        self.sites_search_input.textChanged.connect(self.debounced(self.filter_sites))
 
         add_site_button = QPushButton("Adicionar Site")
         add_site_button.clicked.connect(self.show_add_site_dialog)
@@ -1538,9 +4247,8 @@ class MainWindow(QMainWindow):
         sites_layout.addLayout(sites_top_layout)
 
         # Lista de sites
-        self.sites_list = QListWidget()
-        self.sites_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.sites_list.itemDoubleClicked.connect(self.open_site)
+        self.sites_list = self.create_record_list('utilities')
+        self.sites_list.doubleClicked.connect(self.open_site)
         sites_layout.addWidget(self.sites_list)
 
         # Botões de ação
@@ -1564,7 +4272,7 @@ class MainWindow(QMainWindow):
         commands_top_layout = QHBoxLayout()
         self.commands_search_input = QLineEdit()
         self.commands_search_input.setPlaceholderText("Pesquisar comandos...")
-        self.commands_search_input.textChanged.connect(self.filter_commands)
+        self.commands_search_input.textChanged.connect(self.debounced(self.filter_commands))
 
         add_command_button = QPushButton("Adicionar Comando")
         add_command_button.clicked.connect(self.show_add_command_dialog)
@@ -1574,19 +4282,18 @@ class MainWindow(QMainWindow):
         commands_layout.addLayout(commands_top_layout)
 
         # Lista de comandos
-        self.commands_list = QListWidget()
-        self.commands_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.commands_list.itemDoubleClicked.connect(self.run_command)
-        commands_layout.addWidget(self.commands_list)
+        self.utility_commands_list = self.create_record_list('utilities')
+        self.utility_commands_list.doubleClicked.connect(self.run_command)
+        commands_layout.addWidget(self.utility_commands_list)
 
         # Botões de ação
         commands_buttons_layout = QHBoxLayout()
         run_command_button = QPushButton("Executar")
-        run_command_button.clicked.connect(self.run_selected_command)
+        run_command_button.clicked.connect(self.run_selected_utility_command)
         edit_command_button = QPushButton("Editar")
         edit_command_button.clicked.connect(self.edit_command)
         delete_command_button = QPushButton("Excluir")
-        delete_command_button.clicked.connect(self.delete_command)
+        delete_command_button.clicked.connect(self.delete_utility_command)
 
         commands_buttons_layout.addWidget(run_command_button)
         commands_buttons_layout.addWidget(edit_command_button)
@@ -1881,15 +4588,14 @@ class MainWindow(QMainWindow):
         search_layout = QHBoxLayout()
         self.notes_search_input = QLineEdit()
         self.notes_search_input.setPlaceholderText("Pesquisar anotações...")
-        self.notes_search_input.textChanged.connect(self.filter_notes)
+        self.notes_search_input.textChanged.connect(self.debounced(self.filter_notes))
 
         search_layout.addWidget(self.notes_search_input)
         existing_notes_layout.addLayout(search_layout)
 
         # Lista de anotações
-        self.notes_list = QListWidget()
-        self.notes_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.notes_list.itemSelectionChanged.connect(self.show_note_details)
+        self.notes_list = self.create_record_list('notes')
+        self.notes_list.selectionModel().selectionChanged.connect(self.show_note_details)
         existing_notes_layout.addWidget(self.notes_list)
 
         # Visualização da anotação selecionada
@@ -1949,9 +4655,8 @@ class MainWindow(QMainWindow):
         form_layout.addRow(buttons_layout)
 
         # Lista de comandos
-        self.commands_list = QListWidget()
-        self.commands_list.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
-        self.commands_list.itemSelectionChanged.connect(self.show_command_details)
+        self.commands_list = self.create_record_list('custom_commands')
+        self.commands_list.selectionModel().selectionChanged.connect(self.show_command_details)
         layout.addWidget(self.commands_list)
 
         # Botões para comandos
@@ -2103,11 +4808,20 @@ class MainWindow(QMainWindow):
         self.enable_drag_drop_check = QCheckBox("Ativar arrastar e soltar")
         self.enable_drag_drop_check.setChecked(self.settings.get_bool('enable_drag_drop', True))
 
+        self.history_retention_check = QCheckBox("Compactar histórico antigo automaticamente")
+        self.history_retention_check.setChecked(self.settings.get_bool('history_retention', True))
+
+        self.history_retention_days_spin = QSpinBox()
+        self.history_retention_days_spin.setRange(7, 3650)
+        self.history_retention_days_spin.setValue(int(self.settings.get('history_retention_days', '90')))
+
         advanced_layout.addRow(self.portable_mode_check)
         advanced_layout.addRow(self.auto_update_check)
         advanced_layout.addRow(self.enable_shortcuts_check)
         advanced_layout.addRow(self.enable_notifications_check)
         advanced_layout.addRow(self.enable_drag_drop_check)
+        advanced_layout.addRow(self.history_retention_check)
+        advanced_layout.addRow("Manter histórico detalhado (dias):", self.history_retention_days_spin)
 
         # Botões de ação
         buttons_layout = QHBoxLayout()
@@ -2124,74 +4838,92 @@ class MainWindow(QMainWindow):
         self.content_area.addWidget(page)
 
     def load_initial_data(self):
-        """Carrega dados reais para o dashboard"""
-        try:
-            # Get real counts from database
-            projects_count = len(self.project_manager.get_projects())
-            spreadsheets_count = len(self.spreadsheet_manager.get_spreadsheets())
-            notes_count = len(self.notes_manager.get_notes())
-            utilities_count = len(self.utilities_manager.get_utilities())
-
-            self.projects_count_label.setText(str(projects_count))
-            self.spreadsheets_count_label.setText(str(spreadsheets_count))
-            self.notes_count_label.setText(str(notes_count))
-            self.utilities_count_label.setText(str(utilities_count))
-
-            # Get recent projects (5 most recent)
-            recent_projects = self.db.execute_query(
-                "SELECT id, name FROM projects ORDER BY created_at DESC LIMIT 5",
-                fetchall=True
-            )
-            self.recent_projects_list.clear()
-            for project in recent_projects:
-                item = QListWidgetItem(project[1])  # project name
-                item.setData(Qt.ItemDataRole.UserRole, project[0])  # project id
-                self.recent_projects_list.addItem(item)
-
-            # Get upcoming reminders
-            reminders = self.db.execute_query(
-                "SELECT id, title, due_date FROM reminders "
-                "WHERE is_completed = 0 AND due_date >= datetime('now') "
-                "ORDER BY due_date LIMIT 5",
-                fetchall=True
-            )
-            self.reminders_list.clear()
-            for reminder in reminders:
-                item = QListWidgetItem(f"{reminder[1]} - {reminder[2]}")
-                item.setData(Qt.ItemDataRole.UserRole, reminder[0])
-                self.reminders_list.addItem(item)
-
-            # Load other data as needed
-            self.filter_projects()
-            self.filter_spreadsheets()
-            self.filter_notes()
-            self.filter_apps()
-            self.filter_sites()
-            self.filter_commands()
-            self.filter_custom_commands()
+        """Carrega o dashboard e as listas de todas as páginas"""
+        self.refresh_dashboard()
+        self.filter_projects()
+        self.filter_spreadsheets()
+        self.filter_notes()
+        self.filter_apps()
+        self.filter_sites()
+        self.filter_commands()
+        self.filter_custom_commands()
+
+    def refresh_dashboard(self):
+        """Atualiza os totais e as listas do dashboard em segundo plano.
+
+        Pedidos feitos enquanto uma leitura está em andamento são agrupados em
+        uma única nova leitura ao final dela.
+        """
+        if self.dashboard_worker is not None:
+            self.dashboard_refresh_pending = True
+            return
 
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Falha ao carregar dados iniciais: {str(e)}")
+        worker = BackgroundTask(lambda progress, is_cancelled: self.dashboard_stats.snapshot(), self)
+        worker.succeeded.connect(self.apply_dashboard_snapshot)
+        worker.failed.connect(
+            lambda message: self.statusbar.showMessage(f"Falha ao atualizar o dashboard: {message}", 5000)
+        )
+        worker.finished.connect(self.dashboard_refresh_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.dashboard_worker = worker
+        worker.start()
+
+    def on_data_changed(self, event):
+        """Atualiza só as listas afetadas por um ChangeEvent e o dashboard"""
+        for view in (self.projects_list, self.apps_list, self.sites_list, self.utility_commands_list,
+                     self.notes_list, self.commands_list):
+            view.model().apply_change(event)
+
+        if event.entity == 'spreadsheets':
+            if event.op == 'delete':
+                for row in range(self.spreadsheets_list.count()):
+                    if self.spreadsheets_list.item(row).data(Qt.ItemDataRole.UserRole) == event.item_id:
+                        self.spreadsheets_list.takeItem(row)
+                        break
+            else:
+                self.filter_spreadsheets()
+
+        if event.entity in DatabaseManager.COUNTED_TABLES or event.entity == 'reminders':
+            self.refresh_dashboard()
+
+        if event.entity == 'downloads':
+            self.downloads_page.schedule_reload()
+
+    def dashboard_refresh_finished(self):
+        """Libera a leitura do dashboard e executa a atualização pendente, se houver"""
+        self.dashboard_worker = None
+        if self.dashboard_refresh_pending:
+            self.dashboard_refresh_pending = False
+            self.refresh_dashboard()
+
+    def apply_dashboard_snapshot(self, snapshot):
+        """Exibe no dashboard os dados lidos por DashboardStats.snapshot"""
+        counts = snapshot['counts']
+        self.projects_count_label.setText(str(counts['projects']))
+        self.spreadsheets_count_label.setText(str(counts['spreadsheets']))
+        self.notes_count_label.setText(str(counts['notes']))
+        self.utilities_count_label.setText(str(counts['utilities']))
+
+        self.recent_projects_list.clear()
+        for project in snapshot['recent_projects']:
+            item = QListWidgetItem(project[1])  # project name
+            item.setData(Qt.ItemDataRole.UserRole, project[0])  # project id
+            self.recent_projects_list.addItem(item)
+
+        self.reminders_list.clear()
+        for reminder in snapshot['reminders']:
+            item = QListWidgetItem(f"{reminder[1]} - {reminder[2]}")
+            item.setData(Qt.ItemDataRole.UserRole, reminder[0])
+            self.reminders_list.addItem(item)
 
     def change_page(self, index):
         """Muda a página exibida com base no índice selecionado"""
         self.content_area.setCurrentIndex(index)
 
-        # Atualizar dados da página quando selecionada
+        # As listas já são mantidas em dia pelos eventos de alteração (on_data_changed);
+        # o dashboard é relido porque os próximos lembretes dependem da hora atual
         if index == 0:  # Dashboard
-            self.load_initial_data()
-        elif index == 1:  # Projetos
-            self.filter_projects()
-        elif index == 2:  # Planilhas
-            self.filter_spreadsheets()
-        elif index == 4:  # Utilitários
-            self.filter_apps()
-            self.filter_sites()
-            self.filter_commands()
-        elif index == 7:  # Anotações
-            self.filter_notes()
-        elif index == 8:  # Comandos
-            self.filter_custom_commands()
+            self.refresh_dashboard()
 
     def browse_project_dir(self):
         """Abre o diálogo para selecionar diretório do projeto"""
@@ -2265,8 +4997,6 @@ class MainWindow(QMainWindow):
                 f"Projeto '{name}' criado com sucesso em:\n{project_dir}"
             )
             self.clear_project_form()
-            self.filter_projects()
-            self.load_initial_data()
 
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao criar projeto: {str(e)}")
@@ -2290,17 +5020,13 @@ class MainWindow(QMainWindow):
         elif filter_type == "favoritos":
             filter_type = "favorites"
 
-        projects = self.project_manager.get_projects(filter_type, search_query)
-
-        self.projects_list.clear()
-        for project in projects:
-            item = QListWidgetItem(project[1])  # project name
-            item.setData(Qt.ItemDataRole.UserRole, project[0])  # project id
-            self.projects_list.addItem(item)
+        self.projects_list.model().set_query(
+            lambda after, limit: self.project_manager.get_projects(filter_type, search_query, after, limit)
+        )
 
     def open_selected_project(self):
         """Abre o projeto selecionado na lista"""
-        selected_items = self.projects_list.selectedItems()
+        selected_items = self.projects_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um projeto.")
             return
@@ -2335,7 +5061,7 @@ class MainWindow(QMainWindow):
 
     def edit_project(self):
         """Edita o projeto selecionado"""
-        selected_items = self.projects_list.selectedItems()
+        selected_items = self.projects_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um projeto.")
             return
@@ -2396,7 +5122,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", "Projeto atualizado com sucesso!")
             self.clear_project_form()
-            self.filter_projects()
 
             # Remover o botão de atualização
             if hasattr(self, 'update_project_button'):
@@ -2408,13 +5133,13 @@ class MainWindow(QMainWindow):
 
     def delete_project(self):
         """Exclui o projeto selecionado"""
-        selected_items = self.projects_list.selectedItems()
+        selected_items = self.projects_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um projeto.")
             return
 
         project_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        project_name = selected_items[0].text()
+        project_name = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -2426,14 +5151,12 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 self.project_manager.delete_project(project_id)
-                self.filter_projects()
-                self.load_initial_data()  # Atualizar dashboard
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir projeto: {str(e)}")
 
     def export_project(self):
         """Exporta o projeto selecionado"""
-        selected_items = self.projects_list.selectedItems()
+        selected_items = self.projects_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um projeto.")
             return
@@ -2499,10 +5222,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", f"Planilha '{name}' criada com sucesso!")
             self.clear_spreadsheet_form()
-            self.filter_spreadsheets()
-
-            # Atualizar dashboard
-            self.load_initial_data()
 
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao criar planilha: {str(e)}")
@@ -2512,48 +5231,227 @@ class MainWindow(QMainWindow):
         self.spreadsheet_name_input.clear()
         self.spreadsheet_headers_input.clear()
 
-    def filter_spreadsheets(self):
-        """Filtra a lista de planilhas com base na pesquisa"""
-        search_query = self.spreadsheets_search_input.text().strip()
-        spreadsheets = self.spreadsheet_manager.get_spreadsheets(search_query)
+    def filter_spreadsheets(self):
+        """Filtra a lista de planilhas com base na pesquisa"""
+        search_query = self.spreadsheets_search_input.text().strip()
+        spreadsheets = self.spreadsheet_manager.get_spreadsheets(search_query)
+
+        self.spreadsheets_list.clear()
+        for spreadsheet in spreadsheets:
+            item = QListWidgetItem(spreadsheet[1])  # spreadsheet name
+            item.setData(Qt.ItemDataRole.UserRole, spreadsheet[0])  # spreadsheet id
+            self.spreadsheets_list.addItem(item)
+
+    def open_selected_spreadsheet(self):
+        """Abre a planilha selecionada na lista"""
+        selected_items = self.spreadsheets_list.selectedItems()
+        if not selected_items:
+            QMessageBox.warning(self, "Aviso", "Por favor, selecione uma planilha.")
+            return
+
+        self.open_spreadsheet(selected_items[0])
+
+    def open_spreadsheet(self, item):
+        """Abre uma planilha específica"""
+        spreadsheet_id = item.data(Qt.ItemDataRole.UserRole)
+        try:
+            model = SpreadsheetTableModel(self.spreadsheet_manager, spreadsheet_id, parent=self)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao abrir planilha: {str(e)}")
+            return
+
+        self.set_spreadsheet_model(model)
+
+    def set_spreadsheet_model(self, model):
+        """Exibe um modelo (planilha ou resultado de consulta) na tabela de planilhas.
+
+        O modelo anterior é descartado: a varredura em andamento é cancelada
+        (restaurando o cursor) e os sinais são desconectados antes do
+        deleteLater, para que ele não afete a planilha nova.
+        """
+        self.save_spreadsheet_edits()
+        previous = self.spreadsheet_model
+        if isinstance(model, SpreadsheetTableModel):
+            model.edited.connect(self.spreadsheet_autosave_timer.start)
+            model.busy.connect(self.set_spreadsheet_busy)
+
+        # Desligar a ordenação ao trocar de modelo evita ordenar a planilha inteira ao abrir
+        self.spreadsheet_table.setSortingEnabled(False)
+        self.spreadsheet_table.setModel(model)
+        self.spreadsheet_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.spreadsheet_table.setSortingEnabled(True)
+        self.spreadsheet_model = model
+        self.spreadsheet_filter_input.clear()
+
+        if previous is not None and previous is not model:
+            if isinstance(previous, SpreadsheetTableModel):
+                previous.close()
+                previous.edited.disconnect(self.spreadsheet_autosave_timer.start)
+                previous.busy.disconnect(self.set_spreadsheet_busy)
+            previous.deleteLater()
+
+    def save_spreadsheet_edits(self):
+        """Grava as edições pendentes da planilha aberta"""
+        self.spreadsheet_autosave_timer.stop()
+        if not isinstance(self.spreadsheet_model, SpreadsheetTableModel):
+            return
+        try:
+            self.spreadsheet_model.save()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao salvar planilha: {str(e)}")
+
+    def undo_spreadsheet_edit(self):
+        """Desfaz a última edição de células da planilha aberta"""
+        if not isinstance(self.spreadsheet_model, SpreadsheetTableModel):
+            return
+        self.spreadsheet_autosave_timer.stop()
+        try:
+            self.spreadsheet_model.undo()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao desfazer: {str(e)}")
+
+    def redo_spreadsheet_edit(self):
+        """Refaz a última edição desfeita da planilha aberta"""
+        if not isinstance(self.spreadsheet_model, SpreadsheetTableModel):
+            return
+        self.spreadsheet_autosave_timer.stop()
+        try:
+            self.spreadsheet_model.redo()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao refazer: {str(e)}")
+
+    def query_spreadsheet(self):
+        """Consulta a planilha selecionada com filtros, colunas calculadas, agrupamento e ordenação"""
+        selected_items = self.spreadsheets_list.selectedItems()
+        if not selected_items:
+            QMessageBox.warning(self, "Aviso", "Por favor, selecione uma planilha.")
+            return
+
+        spreadsheet_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
+        spreadsheet_name = selected_items[0].text()
+        self.save_spreadsheet_edits()
+        try:
+            headers = self.spreadsheet_manager.get_headers(spreadsheet_id)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao abrir planilha: {str(e)}")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Consultar Planilha - {spreadsheet_name}")
+        dialog.setModal(True)
+        dialog.resize(560, 0)
+
+        layout = QFormLayout(dialog)
+
+        columns_label = QLabel("Colunas: " + ", ".join(headers))
+        columns_label.setWordWrap(True)
+        computed_input = QTextEdit()
+        computed_input.setPlaceholderText("Uma por linha, ex.: total = preco * quantidade")
+        computed_input.setMaximumHeight(80)
+        filter_input = QLineEdit()
+        filter_input.setPlaceholderText('ex.: total > 100 and contains(cidade, "paulo")')
+        group_input = QLineEdit()
+        group_input.setPlaceholderText("ex.: categoria, cidade")
+        aggregates_input = QLineEdit()
+        aggregates_input.setPlaceholderText("ex.: sum(total), avg(preco), count()")
+        order_input = QLineEdit()
+        order_input.setPlaceholderText("ex.: total desc, nome")
+        save_input = QLineEdit()
+        save_input.setPlaceholderText("Opcional: nome da nova planilha com o resultado")
+
+        layout.addRow(columns_label)
+        layout.addRow("Colunas calculadas:", computed_input)
+        layout.addRow("Filtro:", filter_input)
+        layout.addRow("Agrupar por:", group_input)
+        layout.addRow("Agregações:", aggregates_input)
+        layout.addRow("Ordenar por:", order_input)
+        layout.addRow("Salvar como:", save_input)
+
+        buttons_layout = QHBoxLayout()
+        run_button = QPushButton("Executar")
+        cancel_button = QPushButton("Cancelar")
+
+        def split_names(text):
+            return [name.strip().strip('`').strip() for name in text.split(',') if name.strip()]
+
+        def run_query():
+            try:
+                query = SpreadsheetQuery(self.spreadsheet_manager, spreadsheet_id)
+                for line in computed_input.toPlainText().splitlines():
+                    if line.strip():
+                        name, separator, expression = line.partition('=')
+                        if not separator:
+                            raise Exception(f"Coluna calculada sem '=': {line}")
+                        query.compute(name.strip().strip('`'), expression)
+                if filter_input.text().strip():
+                    query.where(filter_input.text())
+                if group_input.text().strip():
+                    query.group_by(*split_names(group_input.text()))
+                for match in re.finditer(r'(?:([^=,]+?)\s*=\s*)?(\w+)\(\s*`?([^)`]*?)`?\s*\)',
+                                         aggregates_input.text()):
+                    query.aggregate(match.group(2), match.group(3) or None,
+                                    match.group(1).strip() if match.group(1) else None)
+                for key in split_names(order_input.text()):
+                    column, _, direction = key.rpartition(' ')
+                    if direction.lower() in ('asc', 'desc'):
+                        query.order_by(column.strip().strip('`'), direction.lower() == 'desc')
+                    else:
+                        query.order_by(key)
+            except Exception as e:
+                QMessageBox.warning(dialog, "Aviso", f"Consulta inválida: {str(e)}")
+                return
+
+            save_name = save_input.text().strip()
+            dialog.accept()
 
-        self.spreadsheets_list.clear()
-        for spreadsheet in spreadsheets:
-            item = QListWidgetItem(spreadsheet[1])  # spreadsheet name
-            item.setData(Qt.ItemDataRole.UserRole, spreadsheet[0])  # spreadsheet id
-            self.spreadsheets_list.addItem(item)
+            def task(progress, is_cancelled):
+                result = query.execute(progress, is_cancelled)
+                if result is not None and save_name:
+                    result.to_spreadsheet(self.spreadsheet_manager, save_name)
+                return result
 
-    def open_selected_spreadsheet(self):
-        """Abre a planilha selecionada na lista"""
-        selected_items = self.spreadsheets_list.selectedItems()
-        if not selected_items:
-            QMessageBox.warning(self, "Aviso", "Por favor, selecione uma planilha.")
-            return
+            def on_success(result):
+                if result is None:
+                    return
+                self.set_spreadsheet_model(QueryResultTableModel(result, parent=self))
+                self.spreadsheets_tab.setCurrentIndex(1)
+                self.statusbar.showMessage(f"Consulta concluída: {result.row_count} linhas", 5000)
 
-        self.open_spreadsheet(selected_items[0])
+            self.run_background_task(
+                "Consultando planilha...", task, on_success, "Falha ao consultar planilha", unit="linhas"
+            )
 
-    def open_spreadsheet(self, item):
-        """Abre uma planilha específica"""
-        spreadsheet_id = item.data(Qt.ItemDataRole.UserRole)
-        spreadsheet = self.db.execute_query(
-            "SELECT headers, data FROM spreadsheets WHERE id = ?",
-            (spreadsheet_id,),
-            fetchone=True
-        )
+        run_button.clicked.connect(run_query)
+        cancel_button.clicked.connect(dialog.reject)
 
-        if spreadsheet:
-            headers = spreadsheet[0].split('\n') if spreadsheet[0] else []
-            data = json.loads(spreadsheet[1]) if spreadsheet[1] else []
+        buttons_layout.addWidget(run_button)
+        buttons_layout.addWidget(cancel_button)
+        layout.addRow(buttons_layout)
+
+        dialog.exec()
+
+    def filter_spreadsheet_rows(self):
+        """Filtra as linhas da planilha aberta sem carregá-la inteira na tabela"""
+        if self.spreadsheet_model is None:
+            return
 
-            self.spreadsheet_table.clear()
-            self.spreadsheet_table.setColumnCount(len(headers))
-            self.spreadsheet_table.setHorizontalHeaderLabels(headers)
-            self.spreadsheet_table.setRowCount(len(data))
+        if isinstance(self.spreadsheet_model, SpreadsheetTableModel):
+            # A varredura roda em segundo plano; o sinal busy controla o cursor
+            self.spreadsheet_model.set_filter(self.spreadsheet_filter_input.text())
+            return
 
-            for row_idx, row_data in enumerate(data):
-                for col_idx, cell_data in enumerate(row_data):
-                    item = QTableWidgetItem(str(cell_data))
-                    self.spreadsheet_table.setItem(row_idx, col_idx, item)
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self.spreadsheet_model.set_filter(self.spreadsheet_filter_input.text())
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def set_spreadsheet_busy(self, busy):
+        """Mostra o cursor de espera enquanto a planilha aberta é ordenada ou filtrada"""
+        if busy:
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        else:
+            QApplication.restoreOverrideCursor()
 
     def edit_spreadsheet(self):
         """Edita a planilha selecionada"""
@@ -2610,7 +5508,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", "Planilha atualizada com sucesso!")
             self.clear_spreadsheet_form()
-            self.filter_spreadsheets()
 
             # Remover o botão de atualização
             if hasattr(self, 'update_spreadsheet_button'):
@@ -2638,10 +5535,9 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            self.save_spreadsheet_edits()
             try:
                 self.spreadsheet_manager.delete_spreadsheet(spreadsheet_id)
-                self.filter_spreadsheets()
-                self.load_initial_data()  # Atualizar dashboard
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir planilha: {str(e)}")
 
@@ -2654,6 +5550,7 @@ class MainWindow(QMainWindow):
 
         spreadsheet_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
         spreadsheet_name = selected_items[0].text()
+        self.save_spreadsheet_edits()
 
         default_dir = self.settings.get('default_export_dir', os.path.expanduser('~'))
         file_path, selected_filter = QFileDialog.getSaveFileName(
@@ -2663,42 +5560,101 @@ class MainWindow(QMainWindow):
             "CSV Files (*.csv);;Excel Files (*.xlsx)"
         )
 
-        if file_path:
-            try:
-                spreadsheet = self.db.execute_query(
-                    "SELECT headers, data FROM spreadsheets WHERE id = ?",
-                    (spreadsheet_id,),
-                    fetchone=True
-                )
+        if not file_path:
+            return
 
-                if not spreadsheet:
-                    raise Exception("Planilha não encontrada")
+        # O diálogo nem sempre acrescenta a extensão do filtro escolhido
+        if not os.path.splitext(file_path)[1]:
+            file_path += '.xlsx' if 'xlsx' in selected_filter else '.csv'
+
+        self.run_background_task(
+            "Exportando planilha...",
+            lambda progress, is_cancelled: self.spreadsheet_manager.export(
+                spreadsheet_id, file_path, progress, is_cancelled),
+            lambda completed: completed and QMessageBox.information(
+                self, "Sucesso", "Planilha exportada com sucesso!"),
+            "Falha ao exportar planilha",
+            unit="linhas"
+        )
 
-                headers = spreadsheet[0].split('\n') if spreadsheet[0] else []
-                data = json.loads(spreadsheet[1]) if spreadsheet[1] else []
+    def import_spreadsheet(self):
+        """Importa um arquivo CSV, TSV ou XLSX como nova planilha"""
+        default_dir = self.settings.get('default_export_dir', os.path.expanduser('~'))
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Importar Planilha",
+            default_dir,
+            "Planilhas (*.csv *.tsv *.txt *.xlsx);;CSV Files (*.csv);;Excel Files (*.xlsx)"
+        )
 
-                if file_path.endswith('.xlsx'):
-                    from openpyxl import Workbook
-                    wb = Workbook()
-                    ws = wb.active
+        if not file_path:
+            return
 
-                    # Add headers
-                    ws.append(headers)
+        def on_success(spreadsheet_id):
+            if spreadsheet_id is None:
+                return
+            QMessageBox.information(
+                self, "Sucesso",
+                f"Planilha importada com {self.spreadsheet_manager.get_row_count(spreadsheet_id)} linhas!"
+            )
 
-                    # Add data
-                    for row in data:
-                        ws.append(row)
+        self.run_background_task(
+            "Importando planilha...",
+            lambda progress, is_cancelled: self.spreadsheet_manager.import_file(
+                file_path, progress_callback=progress, is_cancelled=is_cancelled),
+            on_success,
+            "Falha ao importar planilha",
+            unit="linhas"
+        )
 
-                    wb.save(file_path)
-                else:
-                    with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerow(headers)
-                        writer.writerows(data)
+    def run_background_task(self, label, task, on_success, error_title, unit=None):
+        """Executa uma tarefa longa em uma BackgroundTask com diálogo de progresso e cancelamento.
 
-                QMessageBox.information(self, "Sucesso", "Planilha exportada com sucesso!")
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", f"Falha ao exportar planilha: {str(e)}")
+        Com `unit`, o rótulo mostra também a quantidade processada e a taxa por segundo.
+        """
+        progress_dialog = QProgressDialog(label, "Cancelar", 0, 100, self)
+        progress_dialog.setWindowTitle("Aguarde")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+        progress_dialog.setValue(0)
+        started = time.monotonic()
+
+        def update_progress(done, total):
+            progress_dialog.setValue(min(int(done * 100 / total), 99) if total else 0)
+            if unit:
+                rate = done / max(time.monotonic() - started, 0.001)
+                progress_dialog.setLabelText(f"{label}\n{done:,} {unit} ({rate:,.0f} {unit}/s)".replace(',', '.'))
+
+        worker = BackgroundTask(task, self)
+        worker.progress.connect(update_progress)
+        worker.succeeded.connect(lambda result: (progress_dialog.close(), on_success(result)))
+        worker.failed.connect(
+            lambda message: (progress_dialog.close(), QMessageBox.critical(self, "Erro", f"{error_title}: {message}"))
+        )
+        worker.finished.connect(worker.deleteLater)
+        progress_dialog.canceled.connect(worker.cancel)
+
+        # Manter referência até o término para o worker não ser coletado
+        self.background_tasks = getattr(self, 'background_tasks', set())
+        self.background_tasks.add(worker)
+        worker.finished.connect(lambda: self.background_tasks.discard(worker))
+        worker.start()
+
+    def create_record_list(self, entity, title_column=1):
+        """Cria uma QListView ligada a um RecordListModel (lista paginada dos registros de `entity`)"""
+        view = QListView()
+        view.setSelectionMode(QListView.SelectionMode.SingleSelection)
+        view.setUniformItemSizes(True)
+        view.setModel(RecordListModel(self.db, title_column, view, entity))
+        return view
+
+    def debounced(self, slot, delay=250):
+        """Retorna uma função que chama `slot` só depois de `delay` ms sem novas chamadas (pesquisa ao digitar)"""
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(delay)
+        timer.timeout.connect(slot)
+        return lambda *args: timer.start()
 
     def create_dev_project(self):
         """Cria um novo projeto de desenvolvimento"""
@@ -2813,13 +5769,9 @@ class MainWindow(QMainWindow):
     def filter_apps(self):
         """Filtra a lista de aplicativos com base na pesquisa"""
         search_query = self.apps_search_input.text().strip()
-        apps = self.utilities_manager.get_utilities("app", search_query)
-
-        self.apps_list.clear()
-        for app in apps:
-            item = QListWidgetItem(app[1])  # app name
-            item.setData(Qt.ItemDataRole.UserRole, app[0])  # app id
-            self.apps_list.addItem(item)
+        self.apps_list.model().set_query(
+            lambda after, limit: self.utilities_manager.get_utilities("app", search_query, after, limit)
+        )
 
     def show_add_app_dialog(self):
         """Mostra o diálogo para adicionar um novo aplicativo"""
@@ -2869,8 +5821,6 @@ class MainWindow(QMainWindow):
                 )
 
                 dialog.accept()
-                self.filter_apps()
-                self.load_initial_data()  # Atualizar dashboard
             except Exception as e:
                 QMessageBox.critical(dialog, "Erro", f"Falha ao adicionar aplicativo: {str(e)}")
 
@@ -2888,7 +5838,7 @@ class MainWindow(QMainWindow):
 
     def run_selected_app(self):
         """Executa o aplicativo selecionado"""
-        selected_items = self.apps_list.selectedItems()
+        selected_items = self.apps_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um aplicativo.")
             return
@@ -2901,13 +5851,13 @@ class MainWindow(QMainWindow):
 
         try:
             if self.utilities_manager.execute_utility(app_id):
-                self.statusbar.showMessage(f"Aplicativo executado: {item.text()}", 3000)
+                self.statusbar.showMessage(f"Aplicativo executado: {item.data()}", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao executar aplicativo: {str(e)}")
 
     def edit_app(self):
         """Edita o aplicativo selecionado"""
-        selected_items = self.apps_list.selectedItems()
+        selected_items = self.apps_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um aplicativo.")
             return
@@ -2960,12 +5910,8 @@ class MainWindow(QMainWindow):
                     return
 
                 try:
-                    self.db.execute_query(
-                        "UPDATE utilities SET name = ?, path = ? WHERE id = ?",
-                        (name, path, app_id)
-                    )
+                    self.utilities_manager.update_utility(app_id, name=name, path=path)
                     dialog.accept()
-                    self.filter_apps()
                 except Exception as e:
                     QMessageBox.critical(dialog, "Erro", f"Falha ao atualizar aplicativo: {str(e)}")
 
@@ -2983,13 +5929,13 @@ class MainWindow(QMainWindow):
 
     def delete_app(self):
         """Exclui o aplicativo selecionado"""
-        selected_items = self.apps_list.selectedItems()
+        selected_items = self.apps_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um aplicativo.")
             return
 
         app_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        app_name = selected_items[0].text()
+        app_name = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -3000,22 +5946,16 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                self.db.execute_query("DELETE FROM utilities WHERE id = ?", (app_id,))
-                self.filter_apps()
-                self.load_initial_data()  # Atualizar dashboard
+                self.utilities_manager.delete_utility(app_id)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir aplicativo: {str(e)}")
 
     def filter_sites(self):
         """Filtra a lista de sites com base na pesquisa"""
         search_query = self.sites_search_input.text().strip()
-        sites = self.utilities_manager.get_utilities("site", search_query)
-
-        self.sites_list.clear()
-        for site in sites:
-            item = QListWidgetItem(site[1])  # site name
-            item.setData(Qt.ItemDataRole.UserRole, site[0])  # site id
-            self.sites_list.addItem(item)
+        self.sites_list.model().set_query(
+            lambda after, limit: self.utilities_manager.get_utilities("site", search_query, after, limit)
+        )
 
     def show_add_site_dialog(self):
         """Mostra o diálogo para adicionar um novo site"""
@@ -3051,8 +5991,6 @@ class MainWindow(QMainWindow):
                 )
 
                 dialog.accept()
-                self.filter_sites()
-                self.load_initial_data()  # Atualizar dashboard
             except Exception as e:
                 QMessageBox.critical(dialog, "Erro", f"Falha ao adicionar site: {str(e)}")
 
@@ -3070,7 +6008,7 @@ class MainWindow(QMainWindow):
 
     def open_selected_site(self):
         """Abre o site selecionado na lista"""
-        selected_items = self.sites_list.selectedItems()
+        selected_items = self.sites_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um site.")
             return
@@ -3083,13 +6021,13 @@ class MainWindow(QMainWindow):
 
         try:
             if self.utilities_manager.execute_utility(site_id):
-                self.statusbar.showMessage(f"Site aberto: {item.text()}", 3000)
+                self.statusbar.showMessage(f"Site aberto: {item.data()}", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao abrir site: {str(e)}")
 
     def edit_site(self):
         """Edita o site selecionado"""
-        selected_items = self.sites_list.selectedItems()
+        selected_items = self.sites_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um site.")
             return
@@ -3128,12 +6066,8 @@ class MainWindow(QMainWindow):
                     url = 'https://' + url
 
                 try:
-                    self.db.execute_query(
-                        "UPDATE utilities SET name = ?, path = ? WHERE id = ?",
-                        (name, url, site_id)
-                    )
+                    self.utilities_manager.update_utility(site_id, name=name, path=url)
                     dialog.accept()
-                    self.filter_sites()
                 except Exception as e:
                     QMessageBox.critical(dialog, "Erro", f"Falha ao atualizar site: {str(e)}")
 
@@ -3151,13 +6085,13 @@ class MainWindow(QMainWindow):
 
     def delete_site(self):
         """Exclui o site selecionado"""
-        selected_items = self.sites_list.selectedItems()
+        selected_items = self.sites_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um site.")
             return
 
         site_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        site_name = selected_items[0].text()
+        site_name = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -3168,22 +6102,16 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                self.db.execute_query("DELETE FROM utilities WHERE id = ?", (site_id,))
-                self.filter_sites()
-                self.load_initial_data()  # Atualizar dashboard
+                self.utilities_manager.delete_utility(site_id)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir site: {str(e)}")
 
     def filter_commands(self):
         """Filtra a lista de comandos com base na pesquisa"""
         search_query = self.commands_search_input.text().strip()
-        commands = self.utilities_manager.get_utilities("command", search_query)
-
-        self.commands_list.clear()
-        for command in commands:
-            item = QListWidgetItem(command[1])  # command name
-            item.setData(Qt.ItemDataRole.UserRole, command[0])  # command id
-            self.commands_list.addItem(item)
+        self.utility_commands_list.model().set_query(
+            lambda after, limit: self.utilities_manager.get_utilities("command", search_query, after, limit)
+        )
 
     def show_add_command_dialog(self):
         """Mostra o diálogo para adicionar um novo comando"""
@@ -3216,8 +6144,6 @@ class MainWindow(QMainWindow):
                 )
 
                 dialog.accept()
-                self.filter_commands()
-                self.load_initial_data()  # Atualizar dashboard
             except Exception as e:
                 QMessageBox.critical(dialog, "Erro", f"Falha ao adicionar comando: {str(e)}")
 
@@ -3233,9 +6159,9 @@ class MainWindow(QMainWindow):
 
         dialog.exec()
 
-    def run_selected_command(self):
+    def run_selected_utility_command(self):
         """Executa o comando selecionado na lista"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.utility_commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
@@ -3248,13 +6174,13 @@ class MainWindow(QMainWindow):
 
         try:
             if self.utilities_manager.execute_utility(command_id):
-                self.statusbar.showMessage(f"Comando executado: {item.text()}", 3000)
+                self.statusbar.showMessage(f"Comando executado: {item.data()}", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao executar comando: {str(e)}")
 
     def edit_command(self):
         """Edita o comando selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.utility_commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
@@ -3291,12 +6217,8 @@ class MainWindow(QMainWindow):
                     return
 
                 try:
-                    self.db.execute_query(
-                        "UPDATE utilities SET name = ?, command = ? WHERE id = ?",
-                        (name, command_text, command_id)
-                    )
+                    self.utilities_manager.update_utility(command_id, name=name, command=command_text)
                     dialog.accept()
-                    self.filter_commands()
                 except Exception as e:
                     QMessageBox.critical(dialog, "Erro", f"Falha ao atualizar comando: {str(e)}")
 
@@ -3315,15 +6237,15 @@ class MainWindow(QMainWindow):
 
             dialog.exec()
 
-    def delete_command(self):
+    def delete_utility_command(self):
         """Exclui o comando selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.utility_commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
 
         command_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        command_name = selected_items[0].text()
+        command_name = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -3334,9 +6256,7 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                self.db.execute_query("DELETE FROM utilities WHERE id = ?", (command_id,))
-                self.filter_commands()
-                self.load_initial_data()  # Atualizar dashboard
+                self.utilities_manager.delete_utility(command_id)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir comando: {str(e)}")
 
@@ -3876,10 +6796,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", "Anotação salva com sucesso!")
             self.clear_note_form()
-            self.filter_notes()
-
-            # Atualizar dashboard
-            self.load_initial_data()
 
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao salvar anotação: {str(e)}")
@@ -3929,11 +6845,7 @@ class MainWindow(QMainWindow):
                 message += "\n".join(f"• {d}" for d in cleaned_dirs)
 
                 # Registrar no histórico
-                self.db.execute_query(
-                    '''INSERT INTO history (action, module, details) 
-                       VALUES (?, ?, ?)''',
-                    ('cleanup', 'system', 'Limpeza de diretórios temporários realizada')
-                )
+                self.db.log_history('cleanup', 'system', 'Limpeza de diretórios temporários realizada')
             else:
                 message = "Nenhum diretório temporário encontrado para limpeza."
 
@@ -3960,17 +6872,13 @@ class MainWindow(QMainWindow):
     def filter_notes(self):
         """Filtra a lista de anotações com base na pesquisa"""
         search_query = self.notes_search_input.text().strip()
-        notes = self.notes_manager.get_notes(search_query)
-
-        self.notes_list.clear()
-        for note in notes:
-            item = QListWidgetItem(note[1])  # note title
-            item.setData(Qt.ItemDataRole.UserRole, note[0])  # note id
-            self.notes_list.addItem(item)
+        self.notes_list.model().set_query(
+            lambda after, limit: self.notes_manager.get_notes(search_query, after=after, limit=limit)
+        )
 
     def show_note_details(self):
         """Mostra os detalhes da anotação selecionada"""
-        selected_items = self.notes_list.selectedItems()
+        selected_items = self.notes_list.selectedIndexes()
         if not selected_items:
             self.note_details.clear()
             return
@@ -3998,7 +6906,7 @@ class MainWindow(QMainWindow):
 
     def edit_selected_note(self):
         """Edita a anotação selecionada"""
-        selected_items = self.notes_list.selectedItems()
+        selected_items = self.notes_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione uma anotação.")
             return
@@ -4053,7 +6961,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", "Anotação atualizada com sucesso!")
             self.clear_note_form()
-            self.filter_notes()
 
             # Remover o botão de atualização
             if hasattr(self, 'update_note_button'):
@@ -4065,13 +6972,13 @@ class MainWindow(QMainWindow):
 
     def delete_note(self):
         """Exclui a anotação selecionada"""
-        selected_items = self.notes_list.selectedItems()
+        selected_items = self.notes_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione uma anotação.")
             return
 
         note_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        note_title = selected_items[0].text()
+        note_title = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -4082,15 +6989,13 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                self.db.execute_query("DELETE FROM notes WHERE id = ?", (note_id,))
-                self.filter_notes()
-                self.load_initial_data()  # Atualizar dashboard
+                self.notes_manager.delete_note(note_id)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir anotação: {str(e)}")
 
     def export_note(self):
             """Exporta a anotação selecionada"""
-            selected_items = self.notes_list.selectedItems()
+            selected_items = self.notes_list.selectedIndexes()
             if not selected_items:
                 QMessageBox.warning(self, "Aviso", "Por favor, selecione uma anotação.")
                 return
@@ -4162,7 +7067,6 @@ class MainWindow(QMainWindow):
 
             QMessageBox.information(self, "Sucesso", "Comando salvo com sucesso!")
             self.clear_command_form()
-            self.filter_custom_commands()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao salvar comando: {str(e)}")
 
@@ -4176,17 +7080,13 @@ class MainWindow(QMainWindow):
     def filter_custom_commands(self):
         """Filtra a lista de comandos personalizados com base na pesquisa"""
         search_query = ""  # Você pode adicionar um campo de pesquisa se necessário
-        commands = self.commands_manager.get_commands(search_query)
-
-        self.commands_list.clear()
-        for command in commands:
-            item = QListWidgetItem(command[1])  # command name
-            item.setData(Qt.ItemDataRole.UserRole, command[0])  # command id
-            self.commands_list.addItem(item)
+        self.commands_list.model().set_query(
+            lambda after, limit: self.commands_manager.get_commands(search_query, after, limit)
+        )
 
     def show_command_details(self):
         """Mostra os detalhes do comando selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.commands_list.selectedIndexes()
         if not selected_items:
             return
 
@@ -4210,7 +7110,7 @@ class MainWindow(QMainWindow):
 
     def run_selected_command(self):
         """Executa o comando personalizado selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
@@ -4228,7 +7128,7 @@ class MainWindow(QMainWindow):
 
     def edit_selected_command(self):
         """Edita o comando personalizado selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
@@ -4272,14 +7172,16 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            self.db.execute_query(
-                "UPDATE custom_commands SET name = ?, command = ?, category = ?, tags = ? WHERE id = ?",
-                (name, command, self.command_category_input.text(), self.command_tags_input.text(), command_id)
+            self.commands_manager.update_command(
+                command_id,
+                name=name,
+                command=command,
+                category=self.command_category_input.text(),
+                tags=self.command_tags_input.text()
             )
 
             QMessageBox.information(self, "Sucesso", "Comando atualizado com sucesso!")
             self.clear_command_form()
-            self.filter_custom_commands()
 
             # Remover o botão de atualização
             if hasattr(self, 'update_command_button'):
@@ -4291,13 +7193,13 @@ class MainWindow(QMainWindow):
 
     def delete_command(self):
         """Exclui o comando personalizado selecionado"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
 
         command_id = selected_items[0].data(Qt.ItemDataRole.UserRole)
-        command_name = selected_items[0].text()
+        command_name = selected_items[0].data()
 
         reply = QMessageBox.question(
             self, "Confirmar Exclusão",
@@ -4308,14 +7210,13 @@ class MainWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
-                self.db.execute_query("DELETE FROM custom_commands WHERE id = ?", (command_id,))
-                self.filter_custom_commands()
+                self.commands_manager.delete_command(command_id)
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Falha ao excluir comando: {str(e)}")
 
     def copy_command(self):
         """Copia o comando selecionado para a área de transferência"""
-        selected_items = self.commands_list.selectedItems()
+        selected_items = self.commands_list.selectedIndexes()
         if not selected_items:
             QMessageBox.warning(self, "Aviso", "Por favor, selecione um comando.")
             return
@@ -4372,6 +7273,8 @@ class MainWindow(QMainWindow):
             self.settings.save_setting('enable_notifications',
                                        '1' if self.enable_notifications_check.isChecked() else '0')
             self.settings.save_setting('enable_drag_drop', '1' if self.enable_drag_drop_check.isChecked() else '0')
+            self.settings.save_setting('history_retention', '1' if self.history_retention_check.isChecked() else '0')
+            self.settings.save_setting('history_retention_days', str(self.history_retention_days_spin.value()))
 
             # Aplicar tema imediatamente
             self.theme_manager.apply_theme(QApplication.instance(), theme)
@@ -4399,7 +7302,6 @@ class MainWindow(QMainWindow):
 
                 # Recarregar a página de configurações para refletir as mudanças
                 self.settings_tab.setCurrentIndex(0)
-                self.load_initial_data()
 
                 QMessageBox.information(self, "Sucesso", "Configurações restauradas com sucesso!")
             except Exception as e:
@@ -4422,6 +7324,35 @@ class MainWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao criar backup: {str(e)}")
 
+    def migrate_json_data(self):
+        """Migra os dados do app.py (pasta data com os arquivos JSON) para o banco"""
+        data_dir = QFileDialog.getExistingDirectory(
+            self, "Selecionar pasta de dados do PAS", os.path.join(os.getcwd(), "data")
+        )
+        if not data_dir:
+            return
+
+        migrator = JsonMigrator(self.db, data_dir)
+
+        def on_success(stats):
+            if stats is None:
+                self.statusbar.showMessage("Migração interrompida; execute novamente para continuar", 5000)
+            else:
+                migrated = sum(stats['migrated'].values())
+                QMessageBox.information(
+                    self, "Migração Concluída",
+                    f"{migrated} registros migrados em {stats['seconds']:.1f}s "
+                    f"({stats['skipped']} já migrados antes)."
+                )
+
+        self.run_background_task(
+            "Migrando dados do PAS...",
+            lambda progress, is_cancelled: migrator.migrate(progress_callback=progress, is_cancelled=is_cancelled),
+            on_success,
+            "Falha ao migrar dados",
+            unit="registros"
+        )
+
     def run_auto_backup(self):
         """Executa o backup automático baseado nas configurações"""
         if self.settings.get_bool('auto_backup'):
@@ -4439,6 +7370,22 @@ class MainWindow(QMainWindow):
                         f"Falha ao realizar backup automático: {str(e)}"
                     )
 
+    def run_history_retention(self):
+        """Executa em segundo plano a retenção do histórico baseada nas configurações"""
+        if not self.settings.get_bool('history_retention'):
+            return
+
+        def worker():
+            try:
+                self.history_retention_manager.run(
+                    int(self.settings.get('history_retention_days', '90')),
+                    int(self.settings.get('history_vacuum_pages', '2000'))
+                )
+            except Exception as e:
+                print(f"Erro na retenção do histórico: {str(e)}")
+
+        threading.Thread(target=worker, daemon=True).start()
+
     def check_reminders(self):
         """Verifica lembretes pendentes e mostra notificações"""
         if not self.settings.get_bool('enable_notifications'):
@@ -4467,13 +7414,60 @@ class MainWindow(QMainWindow):
         if not query:
             return
 
-        # Aqui você pode implementar a busca em todos os módulos
-        # e mostrar os resultados em uma nova janela ou aba
-        QMessageBox.information(
-            self,
-            "Busca Global",
-            f"Resultados da busca por: {query}\n\nEsta funcionalidade será implementada."
+        try:
+            results = self.search_manager.search(query)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", f"Falha na busca global: {str(e)}")
+            return
+
+        if not results:
+            QMessageBox.information(self, "Busca Global", f"Nenhum resultado encontrado para: {query}")
+            return
+
+        module_labels = {
+            'projects': "Projetos",
+            'notes': "Anotações",
+            'commands': "Comandos",
+            'utilities': "Utilitários",
+            'spreadsheets': "Planilhas"
+        }
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Busca Global - {query}")
+        dialog.resize(600, 400)
+        layout = QVBoxLayout(dialog)
+        layout.addWidget(QLabel(f"{len(results)} resultado(s) para: {query}"))
+
+        results_list = QListWidget()
+        for module, item_id, title, snippet in results:
+            item = QListWidgetItem(f"[{module_labels.get(module, module)}] {title}\n    {snippet}")
+            item.setData(Qt.ItemDataRole.UserRole, (module, item_id, title))
+            results_list.addItem(item)
+        results_list.itemDoubleClicked.connect(
+            lambda item: (dialog.accept(), self.open_search_result(*item.data(Qt.ItemDataRole.UserRole)))
         )
+        layout.addWidget(results_list)
+
+        close_button = QPushButton("Fechar")
+        close_button.clicked.connect(dialog.reject)
+        layout.addWidget(close_button)
+
+        dialog.exec()
+
+    def open_search_result(self, module, item_id, title):
+        """Navega até o módulo de um resultado da busca global"""
+        # Página da barra lateral e campo de pesquisa de cada módulo
+        targets = {
+            'projects': (1, 'projects_search_input'),
+            'spreadsheets': (2, 'spreadsheets_search_input'),
+            'utilities': (4, None),
+            'notes': (7, 'notes_search_input'),
+            'commands': (8, None)
+        }
+        row, search_input = targets.get(module, (0, None))
+        self.sidebar.setCurrentRow(row)
+        if search_input:
+            getattr(self, search_input).setText(title)
 
     def show_new_project(self):
         """Mostra a página de novo projeto"""
@@ -4506,13 +7500,603 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            self.save_spreadsheet_edits()
+            # Interrompe os downloads em andamento (de volta à fila, com o progresso gravado) antes de fechar o banco
+            self.download_manager.shutdown()
+            self.download_manager.progress.unsubscribe(self.downloads_page.progress_changed.emit)
+            self.db.changes.unsubscribe(self.data_changed.emit)
+            self.db.close()
+            self.settings.db.close()
             event.accept()
         else:
             event.ignore()
+class DownloadProgress:
+    """Progresso dos downloads em andamento, mantido em memória.
+
+    update() é chamado a cada bloco recebido e custa só uma atualização em
+    memória. Os assinantes recebem callback(id, baixados, total, bytes/s) no
+    máximo a cada `interval` segundos por download, e o banco (coluna
+    progress) só é gravado a cada `checkpoint_interval` segundos e em finish().
+    Com checkpoint_columns(), outras colunas do download vão junto nesses
+    checkpoints.
+    """
+
+    def __init__(self, db, interval=0.25, checkpoint_interval=5.0):
+        self.db = db
+        self.interval = interval
+        self.checkpoint_interval = checkpoint_interval
+        self._subscribers = []
+        self._active = {}  # id -> [baixados, total, início, última notificação, último checkpoint, colunas extras]
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """Registra callback(id, baixados, total, bytes_por_segundo)"""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [subscriber for subscriber in self._subscribers if subscriber != callback]
+
+    def start(self, download_id, total=0):
+        """Começa a acompanhar um download"""
+        now = time.monotonic()
+        with self._lock:
+            self._active[download_id] = [0, total, now, 0.0, now, None]
+
+    def update(self, download_id, done, total=None):
+        """Registra `done` bytes baixados (e o total, se conhecido)"""
+        state = self._active.get(download_id)
+        if state is None:
+            return
+        state[0] = done
+        if total:
+            state[1] = total
+
+        now = time.monotonic()
+        if now - state[3] >= self.interval:
+            state[3] = now
+            self._notify(download_id, state, now)
+        if now - state[4] >= self.checkpoint_interval:
+            state[4] = now
+            self._persist(download_id, state)
+
+    def checkpoint_columns(self, download_id, columns):
+        """Grava também as colunas de columns() ({coluna: valor}) nos checkpoints do download (None desliga)"""
+        state = self._active.get(download_id)
+        if state is not None:
+            state[5] = columns
+
+    def finish(self, download_id):
+        """Para de acompanhar um download e grava o progresso final"""
+        with self._lock:
+            state = self._active.pop(download_id, None)
+        if state is not None:
+            self._notify(download_id, state, time.monotonic())
+            self._persist(download_id, state)
+
+    def get(self, download_id):
+        """Obtém (baixados, total, bytes/s) de um download em andamento, ou None"""
+        state = self._active.get(download_id)
+        if state is None:
+            return None
+        return state[0], state[1], self._rate(state, time.monotonic())
+
+    def _rate(self, state, now):
+        return state[0] / max(now - state[2], 0.001)
+
+    def _notify(self, download_id, state, now):
+        rate = self._rate(state, now)
+        for callback in self._subscribers:
+            try:
+                callback(download_id, state[0], state[1], rate)
+            except Exception as e:
+                print(f"Erro ao notificar progresso do download ID {download_id}: {str(e)}")
+
+    def _persist(self, download_id, state):
+        done, total = state[0], state[1]
+        try:
+            columns = {'progress': (done / total) * 100 if total else 0, 'total_size': total or None,
+                       'downloaded_bytes': done}
+            if state[5] is not None:
+                columns.update(state[5]())
+            self.db.execute_query(
+                f"UPDATE downloads SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                (*columns.values(), download_id)
+            )
+        except Exception as e:
+            print(f"Erro ao gravar progresso do download ID {download_id}: {str(e)}")
+class HttpTransport:
+    """Conexões HTTP dos downloads: uma requests.Session com pool por servidor.
+
+    Downloads seguidos do mesmo servidor reaproveitam as conexões abertas
+    (keep-alive) em vez de refazer a conexão TCP e o handshake TLS a cada
+    arquivo. Falhas de conexão e respostas 429/5xx são repetidas até
+    `retries` vezes com espera exponencial (backoff, respeitando
+    Retry-After) antes de a resposta chegar ao chamador.
+    """
+    # Respostas que indicam falha temporária do servidor
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_size=10, retries=3, backoff=0.5, timeout=(10, 60)):
+        self.pool_size = max(1, pool_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, url):
+        """Session do servidor (esquema e host) de `url`, criada no primeiro uso"""
+        from urllib.parse import urlparse
+
+        parsed = urlparse(url)
+        key = (parsed.scheme.lower(), parsed.netloc.lower())
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = self._create_session()
+            return session
+
+    def get(self, url, **kwargs):
+        """requests.get pela Session do servidor, com o tempo limite padrão"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session(url).get(url, **kwargs)
+
+    def close(self):
+        """Fecha todas as conexões abertas"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _create_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff,
+            status_forcelist=self.RETRY_STATUS,
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            # Esgotadas as tentativas, devolver a última resposta (raise_for_status trata)
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+class PrefixHasher:
+    """Hash de um arquivo calculado enquanto ele é gravado.
+
+    Uma thread lê de volta o trecho contínuo já gravado a partir do início
+    do arquivo, [0, limite), à medida que advance() aumenta o limite. Os
+    bytes lidos normalmente ainda estão no cache do sistema, e a leitura
+    acontece junto com a transferência em vez de numa segunda passada no
+    final.
+    """
+
+    def __init__(self, path, hasher, block_size=1024 * 1024):
+        self.path = path
+        self.hasher = hasher
+        self.block_size = block_size
+        self._limit = 0
+        self._hashed = 0
+        self._closed = False
+        self._cancelled = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def advance(self, limit):
+        """Informa que os bytes [0, limit) do arquivo já estão gravados"""
+        with self._condition:
+            if limit > self._limit:
+                self._limit = limit
+                self._condition.notify()
+
+    def finish(self, size):
+        """Espera o hash chegar a `size` bytes; levanta exceção se a leitura falhou"""
+        self.advance(size)
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        if self._hashed != size:
+            raise Exception(f"Hash incompleto: {self._hashed} de {size} bytes")
+
+    def cancel(self):
+        """Para a thread sem terminar o hash (download interrompido ou com falha)"""
+        with self._condition:
+            self._cancelled = self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            with open(self.path, 'rb') as f:
+                while True:
+                    with self._condition:
+                        while self._hashed >= self._limit and not self._closed:
+                            self._condition.wait()
+                        if self._cancelled or self._hashed >= self._limit:
+                            return
+                        limit = self._limit
+                    f.seek(self._hashed)
+                    while self._hashed < limit and not self._cancelled:
+                        block = f.read(min(self.block_size, limit - self._hashed))
+                        if not block:
+                            raise Exception(f"{self.path} terminou antes do trecho gravado")
+                        self.hasher.update(block)
+                        self._hashed += len(block)
+        except Exception as e:
+            self._error = e
+
+
+class SegmentedDownload:
+    """Download de um arquivo em vários trechos simultâneos (Range).
+
+    O arquivo é pré-alocado com o tamanho final e cada bloco é gravado na
+    sua posição (os.pwrite). Quando uma conexão termina o seu trecho, ela
+    divide ao meio o trecho com mais bytes restantes e assume a segunda
+    metade, então uma conexão lenta não atrasa o final do download.
+
+    `ranges` são os trechos [início, fim) ainda por baixar (o arquivo todo ou
+    o que restou de uma pausa) e remaining() devolve os que faltam. Com
+    `first_response` (uma resposta 200 já aberta), o trecho que começa em 0
+    aproveita essa conexão em vez de abrir outra. As requisições saem de
+    `transport` (um HttpTransport ou uma requests.Session).
+
+    Com `hasher` (hashlib), um PrefixHasher acompanha o trecho contínuo já
+    gravado desde o início do arquivo (inclusive o que veio antes de uma
+    pausa), então o hash fica pronto logo depois do último byte.
+    """
+    # Trechos menores que isso não são divididos
+    MIN_SPLIT = 1024 * 1024
+
+    def __init__(self, transport, url, path, total_size, ranges, connections=4, validator=None,
+                 chunk_size=64 * 1024, timeout=None, first_response=None, on_progress=None, is_interrupted=None,
+                 hasher=None):
+        self.transport = transport
+        self.url = url
+        self.path = path
+        self.total_size = total_size
+        self.connections = max(1, connections)
+        self.validator = validator
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.first_response = first_response
+        self.on_progress = on_progress
+        self.is_interrupted = is_interrupted
+        self.hasher = hasher
+        self.range_ignored = False
+        # [posição reservada, fim, em uso por uma conexão, posição já gravada]
+        self._segments = [[start, end, False, start] for start, end in ranges if end > start]
+        self._done = total_size - sum(end - start for start, end, *_ in self._segments)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._responses = set()
+        self._error = None
+        self._write_failed = False
+        self._fd = None
+        self._prefix = None
+
+    def run(self):
+        """Baixa os trechos e confere o tamanho final; levanta exceção se falhar ou for interrompido"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) != self.total_size:
+            with open(self.path, 'ab') as f:
+                f.truncate(self.total_size)
+
+        # Dividir até haver um trecho por conexão
+        while len(self._segments) < self.connections and self._split(active=False):
+            pass
+
+        if self.hasher is not None:
+            self._prefix = PrefixHasher(self.path, self.hasher)
+            with self._lock:
+                self._prefix.advance(self._written_prefix())
+        try:
+            self._transfer()
+        except BaseException:
+            if self._prefix is not None:
+                self._prefix.cancel()
+            raise
+        if self._prefix is not None:
+            self._prefix.finish(self.total_size)
+
+    def _transfer(self):
+        self._fd = os.open(self.path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            workers = []
+            for index in range(min(self.connections, len(self._segments))):
+                response = self.first_response if index == 0 else None
+                segment = self._segment_at(0) if response is not None else None
+                if segment is None:
+                    if response is not None:
+                        response.close()
+                    response = None
+                workers.append(threading.Thread(target=self._worker, args=(segment, response), daemon=True))
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+        finally:
+            os.close(self._fd)
+
+        if self._error is not None:
+            raise self._error
+        if self._interrupted():
+            raise Exception("Download interrompido")
+        if self.remaining():
+            raise Exception("Download incompleto: restam trechos sem baixar")
+        if os.path.getsize(self.path) != self.total_size:
+            raise Exception(f"Tamanho final incorreto: {os.path.getsize(self.path)} de {self.total_size} bytes")
+
+    def close(self):
+        """Interrompe o download fechando todas as conexões abertas"""
+        self._stop.set()
+        with self._lock:
+            responses = list(self._responses)
+        for response in responses:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+    def remaining(self):
+        """Trechos [início, fim) ainda não gravados, ou None se uma gravação falhou (o arquivo não é confiável).
+
+        Pode ser chamado durante o download, para gravar checkpoints da retomada.
+        """
+        if self._write_failed:
+            return None
+        with self._lock:
+            return [[written, end] for _, end, _, written in self._segments if written < end]
+
+    def _written_prefix(self):
+        # Fim do trecho contínuo já gravado desde o início do arquivo (chamar com _lock)
+        return min((written for _, end, _, written in self._segments if written < end), default=self.total_size)
+
+    def _interrupted(self):
+        return self._stop.is_set() or (self.is_interrupted is not None and self.is_interrupted())
+
+    def _segment_at(self, start):
+        with self._lock:
+            for segment in self._segments:
+                if segment[0] == start and not segment[2]:
+                    segment[2] = True
+                    return segment
+        return None
+
+    def _next_segment(self):
+        """Próximo trecho sem conexão ou, se não houver, metade do maior trecho em andamento"""
+        with self._lock:
+            if self._interrupted():
+                return None
+            for segment in self._segments:
+                if not segment[2] and segment[0] < segment[1]:
+                    segment[2] = True
+                    return segment
+        return self._split(active=True)
+
+    def _split(self, active):
+        with self._lock:
+            largest = max(self._segments, key=lambda segment: segment[1] - segment[0], default=None)
+            if largest is None or largest[1] - largest[0] < 2 * self.MIN_SPLIT:
+                return None
+            middle = largest[0] + (largest[1] - largest[0]) // 2
+            segment = [middle, largest[1], active, middle]
+            largest[1] = middle
+            self._segments.append(segment)
+            return segment
+
+    def _worker(self, segment, response):
+        try:
+            if segment is None:
+                segment = self._next_segment()
+            while segment is not None:
+                self._fetch(segment, response)
+                response = None
+                segment = self._next_segment()
+        except Exception as e:
+            with self._lock:
+                if self._error is None and not self._interrupted():
+                    self._error = e
+            self.close()
+
+    def _fetch(self, segment, response):
+        with self._lock:
+            start, end = segment[0], segment[1]
+        if start >= end:
+            return
+
+        if response is None:
+            headers = {'Range': f"bytes={start}-{end - 1}", 'Accept-Encoding': 'identity'}
+            if self.validator:
+                headers['If-Range'] = self.validator
+            response = self.transport.get(self.url, headers=headers, stream=True, timeout=self.timeout)
+            if response.status_code != 206:
+                response.close()
+                if response.status_code == 200:
+                    # Servidor sem suporte a Range ou arquivo alterado desde o início do download
+                    self.range_ignored = True
+                    raise Exception("O servidor ignorou o pedido de trecho (Range)")
+                response.raise_for_status()
+                raise Exception(f"Resposta inesperada do servidor: {response.status_code}")
+            if DownloadManager._content_range(response.headers.get('content-range'))[0] != start:
+                # Trecho diferente do pedido: gravá-lo em `start` corromperia o arquivo
+                response.close()
+                self.range_ignored = True
+                raise Exception(f"O servidor enviou outro trecho: {response.headers.get('content-range')}")
+
+        with self._lock:
+            self._responses.add(response)
+        try:
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                if self._interrupted():
+                    return
+                # Reservar a posição antes de gravar: o fim do trecho pode ter sido encurtado
+                with self._lock:
+                    position, end = segment[0], segment[1]
+                    if position >= end:
+                        return
+                    data = chunk[:end - position]
+                    segment[0] = position + len(data)
+                    self._done += len(data)
+                    done = self._done
+                self._write(data, position)
+                with self._lock:
+                    segment[3] = position + len(data)
+                    prefix = self._written_prefix()
+                if self._prefix is not None:
+                    self._prefix.advance(prefix)
+                if self.on_progress is not None:
+                    self.on_progress(done)
+        finally:
+            with self._lock:
+                self._responses.discard(response)
+            response.close()
+
+    def _write(self, data, position):
+        try:
+            if hasattr(os, 'pwrite'):
+                view = memoryview(data)
+                while view:
+                    written = os.pwrite(self._fd, view, position)
+                    view = view[written:]
+                    position += written
+            else:
+                with self._lock:
+                    os.lseek(self._fd, position, os.SEEK_SET)
+                    os.write(self._fd, data)
+        except Exception:
+            self._write_failed = True
+            raise
+class DownloadScheduler:
+    """Fila de downloads com um número limitado de transferências simultâneas.
+
+    A fila é a própria tabela downloads: cada worker reserva o próximo
+    registro 'pending' (maior prioridade primeiro e, entre iguais, o mais
+    antigo), passando-o a 'downloading' na mesma transação, e o executa com
+    DownloadManager.run_download. Como o estado fica no banco, a fila
+    sobrevive a reinícios: start() devolve à fila as transferências que
+    estavam em andamento quando o programa foi fechado.
+    """
+    # Sem avisos, os workers ociosos ainda consultam a fila a cada POLL_INTERVAL segundos
+    POLL_INTERVAL = 30
+
+    def __init__(self, download_manager, max_workers=3):
+        self.download_manager = download_manager
+        self.db = download_manager.db
+        self.max_workers = max(1, int(max_workers))
+        self._condition = threading.Condition()
+        self._workers = set()
+        self._wakeups = 0
+        self._serial = 0
+        self._stopped = True
+
+    def start(self):
+        """Retoma a fila persistida e inicia os workers"""
+        with self.db.transaction():
+            self.db.execute_query("UPDATE downloads SET status = 'pending' WHERE status = 'downloading'")
+        with self._condition:
+            self._stopped = False
+            self._spawn_workers()
+
+    def stop(self):
+        """Para de iniciar downloads; os que estão em andamento continuam até terminar"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def join(self, timeout=None):
+        """Espera os workers saírem (após stop()); retorna False se algum ainda estiver rodando"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(worker.is_alive() for worker in workers)
+
+    def set_max_workers(self, max_workers):
+        """Altera o número de downloads simultâneos (workers excedentes saem ao terminar o download atual)"""
+        with self._condition:
+            self.max_workers = max(1, int(max_workers))
+            if not self._stopped:
+                self._spawn_workers()
+            self._condition.notify_all()
+
+    def wake(self):
+        """Avisa os workers ociosos que há downloads novos na fila"""
+        with self._condition:
+            self._wakeups += 1
+            self._condition.notify_all()
+
+    def claim_next(self):
+        """Reserva o próximo download da fila ('pending' → 'downloading') e retorna o seu id, ou None"""
+        with self.db.transaction():
+            row = self.db.execute_query(
+                "SELECT id FROM downloads WHERE status = 'pending' ORDER BY priority DESC, id LIMIT 1",
+                fetchone=True
+            )
+            if row is None:
+                return None
+            self.db.execute_query("UPDATE downloads SET status = 'downloading' WHERE id = ?", (row[0],))
+            self.db.publish_change('downloads', row[0], 'update')
+        return row[0]
+
+    def _spawn_workers(self):
+        while len(self._workers) < self.max_workers:
+            self._serial += 1
+            worker = threading.Thread(target=self._run, name=f"DownloadWorker-{self._serial}", daemon=True)
+            self._workers.add(worker)
+            worker.start()
+
+    def _should_exit(self):
+        return self._stopped or len(self._workers) > self.max_workers
+
+    def _run(self):
+        worker = threading.current_thread()
+        while True:
+            with self._condition:
+                if self._should_exit():
+                    self._workers.discard(worker)
+                    return
+                wakeups = self._wakeups
+
+            try:
+                download_id = self.claim_next()
+            except Exception as e:
+                print(f"Erro ao consultar a fila de downloads: {str(e)}")
+                download_id = None
+
+            if download_id is None:
+                # Fila vazia: esperar um aviso (wake) posterior à consulta
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._wakeups != wakeups or self._should_exit(), self.POLL_INTERVAL
+                    )
+                continue
+
+            try:
+                self.download_manager.run_download(download_id)
+            except Exception as e:
+                print(f"Erro no download ID {download_id}: {str(e)}")
 class DownloadManager:
     """Classe para gerenciamento completo de downloads"""
+    # Tamanho dos blocos lidos da resposta HTTP
+    CHUNK_SIZE = 64 * 1024
+    # Arquivos a partir deste tamanho são baixados em SEGMENTS conexões simultâneas (SegmentedDownload)
+    SEGMENT_THRESHOLD = 8 * 1024 * 1024
+    SEGMENTS = 4
 
-    def __init__(self, db):
+    def __init__(self, db, max_parallel_downloads=3, transport=None):
         self.db = db
         self.downloads_dir = os.path.join(os.path.expanduser("~"), "AutomatePro", "Downloads")
         os.makedirs(self.downloads_dir, exist_ok=True)
@@ -4520,6 +8104,23 @@ class DownloadManager:
         # Verificar e instalar dependências necessárias
         self.check_dependencies()
 
+        # Progresso em memória (a interface assina self.progress)
+        self.progress = DownloadProgress(db)
+
+        # Conexões HTTP reaproveitadas entre downloads do mesmo servidor
+        self.transport = transport or HttpTransport(pool_size=max_parallel_downloads * self.SEGMENTS)
+
+        # Transferências em andamento: sinal de interrupção e resposta HTTP aberta
+        self._interrupts = {}
+        self._responses = {}
+        self._transfers_lock = threading.Lock()
+        # Serializa a escolha de nomes de arquivo livres (local_path)
+        self._paths_lock = threading.Lock()
+
+        # Executar a fila persistida em segundo plano
+        self.scheduler = DownloadScheduler(self, max_parallel_downloads)
+        self.scheduler.start()
+
     def check_dependencies(self):
         """Verifica e instala dependências necessárias"""
         try:
@@ -4533,30 +8134,46 @@ class DownloadManager:
             except Exception as e:
                 print(f"Erro ao instalar dependências: {str(e)}")
 
-    def add_download(self, url, download_type, format, quality, save_path=None):
-        """Adiciona um novo download à fila"""
+    def add_download(self, url, download_type, format, quality, save_path=None, priority=0, expected_sha256=None):
+        """Adiciona um novo download à fila (downloads de maior prioridade começam antes).
+
+        Com `expected_sha256`, o arquivo baixado é conferido com esse checksum.
+        """
         if save_path is None:
             save_path = self.downloads_dir
+        if expected_sha256:
+            expected_sha256 = expected_sha256.strip().lower()
+            if not re.fullmatch(r'[0-9a-f]{64}', expected_sha256):
+                raise Exception("Checksum SHA-256 inválido: use os 64 dígitos hexadecimais")
+
+        with self.db.transaction():
+            download_id = self.db.execute_query(
+                '''INSERT INTO downloads (url, type, format, quality, save_path, status, priority, expected_sha256) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                (url, download_type, format, quality, save_path, 'pending', priority, expected_sha256 or None)
+            )
 
-        download_id = self.db.execute_query(
-            '''INSERT INTO downloads (url, type, format, quality, save_path, status) 
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (url, download_type, format, quality, save_path, 'pending')
-        )
-
-        # Registrar no histórico
-        self.db.execute_query(
-            '''INSERT INTO history (action, module, details) 
-               VALUES (?, ?, ?)''',
-            ('add', 'downloads', f'Added download {url}')
-        )
+            # Registrar no histórico
+            self.db.log_history('add', 'downloads', f'Added download {url}')
+            self.db.publish_change('downloads', download_id, 'insert')
 
+        self.scheduler.wake()
         return download_id
 
     def start_download(self, download_id):
-        """Inicia um download específico"""
+        """Coloca um download pausado, cancelado ou com falha de volta na fila"""
+        if not self.set_status(download_id, 'pending', ('paused', 'failed', 'cancelled')):
+            if not self.db.execute_query("SELECT 1 FROM downloads WHERE id = ?", (download_id,), fetchone=True):
+                raise Exception("Download não encontrado")
+            return False
+
+        self.scheduler.wake()
+        return True
+
+    def run_download(self, download_id):
+        """Executa um download já reservado pelo DownloadScheduler (status 'downloading')"""
         download = self.db.execute_query(
-            "SELECT * FROM downloads WHERE id = ?",
+            "SELECT url, format, quality, save_path FROM downloads WHERE id = ?",
             (download_id,),
             fetchone=True
         )
@@ -4564,40 +8181,208 @@ class DownloadManager:
         if not download:
             raise Exception("Download não encontrado")
 
-        url = download[1]
-        download_type = download[2]
-        format = download[3]
-        quality = download[4]
-        save_path = download[5]
+        url, format, quality, save_path = download
 
+        interrupt = threading.Event()
+        with self._transfers_lock:
+            self._interrupts[download_id] = interrupt
+        if self.get_status(download_id) != 'downloading':
+            # Pausado ou cancelado entre a reserva na fila e o registro acima
+            interrupt.set()
+        self.progress.start(download_id)
         try:
-            self.db.execute_query(
-                "UPDATE downloads SET status = ? WHERE id = ?",
-                ('downloading', download_id))
+            try:
+                if 'youtube.com' in url or 'youtu.be' in url:
+                    self.download_youtube(url, format, quality, save_path, download_id)
+                elif 'vimeo.com' in url:
+                    self.download_vimeo(url, format, quality, save_path, download_id)
+                else:
+                    self.download_generic(url, save_path, download_id)
+            finally:
+                with self._transfers_lock:
+                    self._interrupts.pop(download_id, None)
+                    self._responses.pop(download_id, None)
+                # Grava o progresso final (e o deslocamento para retomar) antes da mudança de status
+                self.progress.finish(download_id)
+
+            with self.db.transaction():
+                # Um download pausado ou cancelado durante a transferência mantém o novo status
+                if self.set_status(download_id, 'completed', ('downloading',)):
+                    # Registrar no histórico
+                    self.db.log_history('complete', 'downloads', f'Completed download ID {download_id}')
 
-            if 'youtube.com' in url or 'youtu.be' in url:
-                self.download_youtube(url, format, quality, save_path, download_id)
-            elif 'vimeo.com' in url:
-                self.download_vimeo(url, format, quality, save_path, download_id)
-            else:
-                self.download_generic(url, save_path, download_id)
+            return True
+        except Exception as e:
+            if interrupt.is_set():
+                # Pausado ou cancelado: o status já foi gravado por pause_download/cancel_download
+                if self.get_status(download_id) == 'cancelled':
+                    self.remove_partial_file(download_id)
+                return False
+            self.set_status(download_id, 'failed', ('downloading',))
+            raise Exception(f"Falha ao baixar: {str(e)}")
 
-            self.db.execute_query(
-                "UPDATE downloads SET status = ? WHERE id = ?",
-                ('completed', download_id))
+    def get_status(self, download_id):
+        """Obtém o status atual de um download"""
+        row = self.db.execute_query("SELECT status FROM downloads WHERE id = ?", (download_id,), fetchone=True)
+        return row[0] if row else None
 
-            # Registrar no histórico
-            self.db.execute_query(
-                '''INSERT INTO history (action, module, details) 
-                   VALUES (?, ?, ?)''',
-                ('complete', 'downloads', f'Completed download ID {download_id}'))
+    def interrupt(self, download_id):
+        """Interrompe a transferência em andamento de um download, se houver.
 
-            return True
-        except Exception as e:
+        Fecha a conexão HTTP na hora, então o download deixa de consumir banda
+        mesmo que a thread esteja bloqueada esperando dados.
+        """
+        with self._transfers_lock:
+            interrupt = self._interrupts.get(download_id)
+            response = self._responses.get(download_id)
+        if interrupt is None:
+            return False
+
+        interrupt.set()
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+        return True
+
+    def is_interrupted(self, download_id):
+        interrupt = self._interrupts.get(download_id)
+        return interrupt is not None and interrupt.is_set()
+
+    def local_path(self, url, save_path, download_id):
+        """Caminho final do arquivo de um download genérico (os bytes vão antes para <caminho>.part).
+
+        Na primeira chamada, escolhe um nome livre na pasta ("arquivo (1).zip"
+        se "arquivo.zip" já existir ou pertencer a outro download) e o grava em
+        `file_path`, para a retomada usar o mesmo arquivo.
+        """
+        from urllib.parse import urlparse
+
+        with self._paths_lock:
+            row = self.db.execute_query("SELECT file_path FROM downloads WHERE id = ?", (download_id,), fetchone=True)
+            if row and row[0]:
+                return row[0]
+
+            name = os.path.basename(urlparse(url).path) or f"download_{download_id}"
+            root, ext = os.path.splitext(name)
+            candidate = os.path.join(save_path, name)
+            suffix = 1
+            while (os.path.exists(candidate) or os.path.exists(candidate + ".part")
+                   or self.db.execute_query("SELECT 1 FROM downloads WHERE file_path = ? AND id != ?",
+                                            (candidate, download_id), fetchone=True)):
+                candidate = os.path.join(save_path, f"{root} ({suffix}){ext}")
+                suffix += 1
+
+            self.db.execute_query("UPDATE downloads SET file_path = ? WHERE id = ?", (candidate, download_id))
+            return candidate
+
+    def remove_partial_file(self, download_id):
+        """Apaga o .part de um download genérico cancelado"""
+        row = self.db.execute_query("SELECT file_path FROM downloads WHERE id = ?", (download_id,), fetchone=True)
+        if row and row[0] and os.path.exists(row[0] + ".part"):
+            os.remove(row[0] + ".part")
+
+    def find_content(self, url, expected_sha256=None):
+        """Arquivo já baixado com o conteúdo pedido, como (sha256, caminho, tamanho), ou None.
+
+        Com `expected_sha256`, procura esse conteúdo no índice; sem ele, o
+        conteúdo do último download concluído da mesma URL. O arquivo precisa
+        ainda existir com o tamanho registrado; se o mtime mudou desde o
+        registro, é lido de novo para conferir o SHA-256 e um arquivo alterado
+        sai do índice.
+        """
+        if expected_sha256:
+            row = self.db.execute_query(
+                "SELECT sha256, path, size, mtime_ns FROM download_contents WHERE sha256 = ?",
+                (expected_sha256,), fetchone=True
+            )
+        else:
+            row = self.db.execute_query(
+                '''SELECT c.sha256, c.path, c.size, c.mtime_ns FROM downloads d
+                   JOIN download_contents c ON c.sha256 = d.sha256
+                   WHERE d.url = ? AND d.status = 'completed'
+                   ORDER BY d.id DESC LIMIT 1''',
+                (url,), fetchone=True
+            )
+        if not row or not os.path.isfile(row[1]):
+            return None
+        stat = os.stat(row[1])
+        if stat.st_size != row[2]:
+            return None
+        if stat.st_mtime_ns != row[3]:
+            if self.file_sha256(row[1]) != row[0]:
+                self.db.execute_query("DELETE FROM download_contents WHERE sha256 = ?", (row[0],))
+                return None
             self.db.execute_query(
-                "UPDATE downloads SET status = ? WHERE id = ?",
-                ('failed', download_id))
-            raise Exception(f"Falha ao baixar: {str(e)}")
+                "UPDATE download_contents SET mtime_ns = ? WHERE sha256 = ?", (stat.st_mtime_ns, row[0])
+            )
+        return row[:3]
+
+    @staticmethod
+    def file_sha256(path):
+        """SHA-256 (hex) de um arquivo, lido em blocos"""
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def register_content(self, download_id, path, sha256):
+        """Grava o SHA-256 de um download concluído e o acrescenta ao índice de conteúdo.
+
+        Se o mesmo conteúdo já estiver em outro arquivo (conferido por
+        find_content), `path` passa a ser um hardlink para ele (quando o
+        sistema de arquivos permite), sem ocupar espaço duas vezes.
+        """
+        # A conferência do arquivo existente (que pode relê-lo) fica fora da
+        # transação, para não segurar o lock de escrita do banco durante a leitura
+        existing = self.find_content(None, sha256)
+        linked = bool(existing) and os.path.abspath(existing[1]) != os.path.abspath(path)
+        if linked:
+            self._link(existing[1], path)
+        stat = os.stat(path)
+        with self.db.transaction():
+            if not linked:
+                self.db.execute_query(
+                    "INSERT OR REPLACE INTO download_contents (sha256, size, path, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (sha256, stat.st_size, path, stat.st_mtime_ns)
+                )
+            self.db.execute_query(
+                "UPDATE downloads SET sha256 = ?, file_path = ? WHERE id = ?", (sha256, path, download_id)
+            )
+
+    @staticmethod
+    def _link(source, destination):
+        """Substitui `destination` por um hardlink para `source`; retorna False se não for possível"""
+        temporary = destination + ".link"
+        try:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            os.link(source, temporary)
+        except OSError:
+            # Outro sistema de arquivos ou sem suporte a hardlinks
+            return False
+        os.replace(temporary, destination)
+        return True
+
+    def set_status(self, download_id, status, expected=None):
+        """Muda o status de um download; com `expected`, só se o status atual estiver nessa lista.
+
+        Retorna True se o status foi alterado.
+        """
+        query = "UPDATE downloads SET status = ? WHERE id = ?"
+        params = [status, download_id]
+        if expected:
+            query += f" AND status IN ({', '.join('?' * len(expected))})"
+            params.extend(expected)
+
+        with self.db.transaction():
+            self.db.execute_query(query, params)
+            changed = self.db.execute_query("SELECT changes()", fetchone=True)[0] > 0
+            if changed:
+                self.db.publish_change('downloads', download_id, 'update')
+        return changed
 
     def download_youtube(self, url, format, quality, save_path, download_id):
         """Download de vídeos do YouTube"""
@@ -4636,43 +8421,241 @@ class DownloadManager:
         self.download_youtube(url, format, quality, save_path, download_id)
 
     def download_generic(self, url, save_path, download_id):
-        """Download de arquivos genéricos"""
-        import requests
-        from urllib.parse import urlparse
+        """Download de arquivos genéricos, com verificação e deduplicação.
 
-        local_filename = os.path.join(save_path, os.path.basename(urlparse(url).path))
+        Se o conteúdo já foi baixado (mesmo checksum esperado ou mesma URL
+        concluída antes), o arquivo existente é reaproveitado com um hardlink
+        (ou cópia) em vez de ser baixado de novo. Senão, fetch_generic baixa o
+        arquivo calculando o SHA-256 durante a gravação; com checksum esperado
+        divergente, o .part é apagado e o download falha.
+        """
+        expected_sha256 = self.db.execute_query(
+            "SELECT expected_sha256 FROM downloads WHERE id = ?", (download_id,), fetchone=True
+        )[0]
+
+        existing = self.find_content(url, expected_sha256)
+        if existing:
+            sha256, source, size = existing
+            self.remove_partial_file(download_id)
+            if os.path.dirname(os.path.abspath(source)) == os.path.abspath(save_path):
+                # O arquivo já está na pasta de destino
+                local_filename = source
+            else:
+                local_filename = self.local_path(url, save_path, download_id)
+                if not self._link(source, local_filename):
+                    shutil.copyfile(source, local_filename + ".part")
+                    os.replace(local_filename + ".part", local_filename)
+            self.progress.update(download_id, size, size)
+            self.db.execute_query(
+                "UPDATE downloads SET sha256 = ?, file_path = ? WHERE id = ?", (sha256, local_filename, download_id)
+            )
+            return
 
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            total_size = int(r.headers.get('content-length', 0))
+        local_filename = self.local_path(url, save_path, download_id)
+        part_filename = local_filename + ".part"
+        sha256 = self.fetch_generic(url, part_filename, download_id)
+        if expected_sha256 and sha256 != expected_sha256:
+            os.remove(part_filename)
+            raise Exception(f"Checksum SHA-256 não confere: esperado {expected_sha256}, obtido {sha256}")
+        os.replace(part_filename, local_filename)
+        self.register_content(download_id, local_filename, sha256)
+
+    def fetch_generic(self, url, part_filename, download_id, segmented=True):
+        """Baixa um arquivo genérico para `part_filename`, com retomada; retorna o SHA-256 (hex).
+
+        Se já existir o .part (download pausado ou interrompido), só o
+        restante é pedido, com Range: bytes=N- e If-Range com o ETag (ou Last-Modified) da primeira
+        resposta. Se o servidor ignorar o Range ou o arquivo tiver mudado
+        (resposta 200 em vez de 206), o download recomeça do zero; um 206
+        que não começa em N também faz recomeçar, sem Range.
+
+        Arquivos grandes de servidores que aceitam Range são baixados em
+        trechos simultâneos (download_segmented); nesse caso a retomada
+        continua os trechos gravados em `segments`. Se o servidor anunciar
+        Range mas não atender os pedidos de trecho, o arquivo é baixado de
+        novo em uma só conexão (segmented=False). As conexões vêm do
+        HttpTransport compartilhado.
+        """
+        hasher = hashlib.sha256()
+        etag, last_modified, segments, total_size = self.db.execute_query(
+            "SELECT etag, last_modified, segments, total_size FROM downloads WHERE id = ?",
+            (download_id,), fetchone=True
+        )
 
-            self.db.execute_query(
-                "UPDATE downloads SET total_size = ? WHERE id = ?",
-                (total_size, download_id))
+        if segments and (etag or last_modified) and os.path.exists(part_filename):
+            if self.download_segmented(url, part_filename, total_size, json.loads(segments),
+                                       etag or last_modified, download_id, hasher=hasher):
+                return hasher.hexdigest()
+            # O servidor deixou de aceitar os trechos: recomeçar do zero (com um hash novo)
+            os.remove(part_filename)
+            self.db.execute_query("UPDATE downloads SET segments = NULL WHERE id = ?", (download_id,))
+            hasher = hashlib.sha256()
+
+        offset = os.path.getsize(part_filename) if os.path.exists(part_filename) else 0
+        headers = {}
+        if offset and (etag or last_modified):
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = etag or last_modified
+
+        prefix = None
+        try:
+            with self.transport.get(url, stream=True, headers=headers) as r:
+                if r.status_code == 416 and offset:
+                    # O .part não corresponde mais ao arquivo do servidor
+                    r.close()
+                    os.remove(part_filename)
+                    return self.fetch_generic(url, part_filename, download_id)
+                r.raise_for_status()
+
+                with self._transfers_lock:
+                    self._responses[download_id] = r
+
+                range_start, range_total = self._content_range(r.headers.get('content-range'))
+                if r.status_code == 206 and range_start != offset:
+                    # Um trecho diferente do pedido nunca é o arquivo inteiro
+                    r.close()
+                    if not offset:
+                        raise Exception(f"Resposta 206 sem o trecho pedido: {r.headers.get('content-range')}")
+                    os.remove(part_filename)
+                    return self.fetch_generic(url, part_filename, download_id)
+                if r.status_code == 206:
+                    mode = 'ab'
+                    # Os bytes já gravados entram no hash numa thread, enquanto os novos chegam
+                    prefix = PrefixHasher(part_filename, hasher)
+                    prefix.advance(offset)
+                    total_size = range_total or offset + int(r.headers.get('content-length', 0))
+                else:
+                    # Resposta completa: servidor sem suporte a Range ou arquivo alterado
+                    offset = 0
+                    mode = 'wb'
+                    total_size = int(r.headers.get('content-length', 0))
+                    new_etag = r.headers.get('etag')
+                    # ETags fracos (W/...) não valem em If-Range
+                    new_etag = new_etag if new_etag and not new_etag.startswith('W/') else None
+                    validator = new_etag or r.headers.get('last-modified')
+                    self.db.execute_query(
+                        "UPDATE downloads SET etag = ?, last_modified = ?, downloaded_bytes = 0 WHERE id = ?",
+                        (new_etag, r.headers.get('last-modified'), download_id)
+                    )
 
-            with open(local_filename, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        # Atualizar progresso
-                        current_size = os.path.getsize(local_filename)
-                        progress = (current_size / total_size) * 100 if total_size > 0 else 0
+                    if (segmented and self.SEGMENTS > 1 and total_size >= self.SEGMENT_THRESHOLD and validator
+                            and r.headers.get('accept-ranges', '').lower() == 'bytes'
+                            and not r.headers.get('content-encoding')):
+                        if os.path.exists(part_filename):
+                            os.remove(part_filename)
+                        # A conexão já aberta baixa o primeiro trecho
+                        if self.download_segmented(url, part_filename, total_size, [[0, total_size]],
+                                                   validator, download_id, first_response=r, hasher=hasher):
+                            return hasher.hexdigest()
+                        r.close()
+                        os.remove(part_filename)
+                        return self.fetch_generic(url, part_filename, download_id, segmented=False)
+
+                # Progresso contado em memória; o banco só recebe checkpoints (DownloadProgress)
+                downloaded = offset
+                self.progress.update(download_id, downloaded, total_size)
+                with open(part_filename, mode) as f:
+                    for chunk in r.iter_content(chunk_size=self.CHUNK_SIZE):
+                        if self.is_interrupted(download_id):
+                            raise Exception("Download interrompido")
+                        if chunk:
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                            if prefix is None:
+                                hasher.update(chunk)
+                            else:
+                                # O PrefixHasher lê o arquivo: os bytes precisam sair do buffer
+                                f.flush()
+                                prefix.advance(downloaded)
+                            self.progress.update(download_id, downloaded)
+
+            if self.is_interrupted(download_id):
+                raise Exception("Download interrompido")
+            if total_size and downloaded != total_size:
+                # O .part fica para a próxima tentativa continuar de onde parou
+                raise Exception(f"Download incompleto: {downloaded} de {total_size} bytes")
+        except BaseException:
+            if prefix is not None:
+                prefix.cancel()
+            raise
+        if prefix is not None:
+            prefix.finish(downloaded)
+        return hasher.hexdigest()
+
+    def download_segmented(self, url, part_filename, total_size, ranges, validator, download_id, first_response=None,
+                           hasher=None):
+        """Baixa os trechos `ranges` de um arquivo em SEGMENTS conexões (SegmentedDownload).
+
+        Os trechos que faltam ficam gravados em `segments` para a retomada:
+        no início, a cada checkpoint do DownloadProgress e quando o download
+        é interrompido ou falha. Retorna False se o servidor
+        ignorar o Range (o chamador recomeça do zero).
+        """
+        segmented = SegmentedDownload(
+            self.transport, url, part_filename, total_size, ranges,
+            connections=self.SEGMENTS,
+            validator=validator,
+            chunk_size=self.CHUNK_SIZE,
+            timeout=self.transport.timeout,
+            first_response=first_response,
+            on_progress=lambda done: self.progress.update(download_id, done, total_size),
+            is_interrupted=lambda: self.is_interrupted(download_id),
+            hasher=hasher
+        )
+        with self._transfers_lock:
+            # interrupt() fecha todas as conexões do download
+            self._responses[download_id] = segmented
+
+        def segments():
+            remaining = segmented.remaining()
+            return {'segments': json.dumps(remaining) if remaining else None}
+
+        # Os trechos que faltam vão para o banco já no início e a cada checkpoint do progresso,
+        # então a retomada funciona mesmo se o programa for fechado no meio da transferência
+        self.db.execute_query("UPDATE downloads SET segments = ? WHERE id = ?", (json.dumps(ranges), download_id))
+        self.progress.checkpoint_columns(download_id, segments)
+        try:
+            segmented.run()
+        except Exception:
+            self.db.execute_query(
+                "UPDATE downloads SET segments = ? WHERE id = ?",
+                (None if segmented.range_ignored else segments()['segments'], download_id)
+            )
+            if segmented.range_ignored:
+                return False
+            raise
+        finally:
+            self.progress.checkpoint_columns(download_id, None)
+
+        # As conexões relatam o progresso fora de ordem: garantir o total no final
+        self.progress.update(download_id, total_size, total_size)
+        self.db.execute_query("UPDATE downloads SET segments = NULL WHERE id = ?", (download_id,))
+        return True
 
-                        self.db.execute_query(
-                            "UPDATE downloads SET progress = ? WHERE id = ?",
-                            (progress, download_id))
+    @staticmethod
+    def _content_range(header):
+        """Extrai (início, tamanho total) de um cabeçalho Content-Range ("bytes 100-999/1000")"""
+        match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', header or '')
+        if not match:
+            return None, None
+        return int(match.group(1)), int(match.group(2)) if match.group(2) != '*' else None
 
     def progress_hook(self, d, download_id):
         """Atualiza o progresso do download"""
+        if self.is_interrupted(download_id):
+            # Uma exceção no hook interrompe o yt-dlp, que mantém o .part para continuar depois
+            raise Exception("Download interrompido")
         if d['status'] == 'downloading':
-            progress = d.get('_percent_str', '0%').replace('%', '')
-            self.db.execute_query(
-                "UPDATE downloads SET progress = ? WHERE id = ?",
-                (float(progress), download_id))
+            self.progress.update(
+                download_id,
+                d.get('downloaded_bytes') or 0,
+                d.get('total_bytes') or d.get('total_bytes_estimate')
+            )
 
     def get_downloads(self, status=None):
         """Obtém a lista de downloads"""
-        query = "SELECT * FROM downloads"
+        query = ("SELECT id, url, type, format, quality, save_path, status, progress, total_size, created_at "
+                 "FROM downloads")
         params = []
 
         if status:
@@ -4682,12 +8665,27 @@ class DownloadManager:
         query += " ORDER BY created_at DESC"
         return self.db.execute_query(query, params, fetchall=True)
 
+    def shutdown(self, timeout=5.0):
+        """Para a fila antes de fechar o programa.
+
+        Os downloads em andamento voltam a 'pending' e são interrompidos; cada
+        um grava o progresso (e o que falta, para a retomada) ao parar. Espera
+        os workers por até `timeout` segundos e fecha as conexões HTTP.
+        Retorna False se algum worker não terminou a tempo.
+        """
+        self.scheduler.stop()
+        running = self.db.execute_query("SELECT id FROM downloads WHERE status = 'downloading'", fetchall=True)
+        for (download_id,) in running:
+            if self.set_status(download_id, 'pending', ('downloading',)):
+                self.interrupt(download_id)
+        stopped = self.scheduler.join(timeout)
+        self.transport.close()
+        return stopped
+
     def pause_download(self, download_id):
-        """Pausa um download em andamento"""
-        # Implementação mais complexa requerida para pausar downloads reais
-        self.db.execute_query(
-            "UPDATE downloads SET status = ? WHERE id = ?",
-            ('paused', download_id))
+        """Pausa um download na fila ou em andamento (a transferência para na hora e pode ser retomada)"""
+        if self.set_status(download_id, 'paused', ('pending', 'downloading')):
+            self.interrupt(download_id)
 
     def resume_download(self, download_id):
         """Retoma um download pausado"""
@@ -4700,10 +8698,11 @@ class DownloadManager:
             self.start_download(download_id)
 
     def cancel_download(self, download_id):
-        """Cancela um download"""
-        self.db.execute_query(
-            "UPDATE downloads SET status = ? WHERE id = ?",
-            ('cancelled', download_id))
+        """Cancela um download e descarta o que já foi baixado"""
+        if self.set_status(download_id, 'cancelled', ('pending', 'downloading', 'paused')):
+            # Com transferência em andamento, o .part é apagado por run_download ao parar
+            if not self.interrupt(download_id):
+                self.remove_partial_file(download_id)
 
     def get_available_formats(self, url):
         """Obtém formatos disponíveis para um URL"""
@@ -4745,7 +8744,7 @@ class DownloadDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Adicionar Download")
-        self.setFixedSize(500, 300)
+        self.setFixedSize(500, 340)
 
         self.download_manager = parent.download_manager
         self.settings = parent.settings
@@ -4791,6 +8790,14 @@ class DownloadDialog(QDialog):
         format_layout.addWidget(quality_label)
         format_layout.addWidget(self.quality_combo)
 
+        # Checksum esperado (opcional)
+        checksum_layout = QHBoxLayout()
+        checksum_label = QLabel("SHA-256:")
+        self.checksum_input = QLineEdit()
+        self.checksum_input.setPlaceholderText("Opcional: checksum para verificar o arquivo")
+        checksum_layout.addWidget(checksum_label)
+        checksum_layout.addWidget(self.checksum_input)
+
         # Botões
         button_layout = QHBoxLayout()
         cancel_button = QPushButton("Cancelar")
@@ -4805,6 +8812,7 @@ class DownloadDialog(QDialog):
         layout.addWidget(detect_button)
         layout.addLayout(save_layout)
         layout.addLayout(format_layout)
+        layout.addLayout(checksum_layout)
         layout.addLayout(button_layout)
 
     def browse_save_location(self):
@@ -4853,22 +8861,16 @@ class DownloadDialog(QDialog):
         quality = self.quality_combo.currentText()
 
         try:
-            download_id = self.download_manager.add_download(
+            self.download_manager.add_download(
                 url=url,
                 download_type='video' if 'youtube' in url or 'vimeo' in url else 'file',
                 format=format.lower(),
                 quality=quality,
-                save_path=save_path
+                save_path=save_path,
+                expected_sha256=self.checksum_input.text().strip() or None
             )
 
-            # Iniciar download em uma thread separada
-            import threading
-            threading.Thread(
-                target=self.download_manager.start_download,
-                args=(download_id,),
-                daemon=True
-            ).start()
-
+            # O DownloadScheduler inicia o download assim que houver um worker livre
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Falha ao iniciar download: {str(e)}")
@@ -4978,11 +8980,21 @@ class DownloadItemWidget(QWidget):
             self.cancel_button.setEnabled(True)
             self.open_button.setEnabled(False)
 
+    def set_progress(self, downloaded, total, rate):
+        """Exibe o progresso ao vivo de um download em andamento"""
+        progress = (downloaded / total) * 100 if total else 0
+        self.progress_bar.setValue(int(progress))
+        speed = f"{rate / (1024 * 1024):.1f} MB/s"
+        if total:
+            self.progress_label.setText(f"{progress:.1f}% de {total / (1024 * 1024):.1f} MB - {speed}")
+        else:
+            self.progress_label.setText(f"{downloaded / (1024 * 1024):.1f} MB - {speed}")
+
     def toggle_pause(self):
         """Pausa ou retoma o download"""
         download_id = self.download_data[0]
 
-        if self.download_data[7] == 'paused':  # status
+        if self.download_data[6] == 'paused':  # status
             self.download_manager.resume_download(download_id)
             self.pause_button.setText("Pausar")
         else:
@@ -5012,19 +9024,27 @@ class DownloadItemWidget(QWidget):
             QMessageBox.warning(self, "Aviso", "Arquivo não encontrado.")
 class DownloadsPage(QWidget):
     """Página de gerenciamento de downloads"""
+    # Progresso vindo do DownloadProgress (id, baixados, total, bytes/s), repassado à thread da interface
+    progress_changed = pyqtSignal(object, object, object, float)
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.main_window = parent
         self.download_manager = parent.download_manager
+        self.item_widgets = {}
 
         self.setup_ui()
         self.load_downloads()
 
-        # Configurar timer para atualizar a lista
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.load_downloads)
-        self.update_timer.start(5000)  # Atualizar a cada 5 segundos
+        # O progresso chega pelo DownloadProgress e os status pelos eventos de alteração
+        self.progress_changed.connect(self.update_progress)
+        self.download_manager.progress.subscribe(self.progress_changed.emit)
+
+        # Mudanças de status agrupadas em uma única recarga
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(250)
+        self.reload_timer.timeout.connect(self.load_downloads)
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
@@ -5060,6 +9080,10 @@ class DownloadsPage(QWidget):
         layout.addLayout(filter_layout)
         layout.addWidget(self.downloads_list)
 
+    def schedule_reload(self):
+        """Recarrega a lista em breve (chamado a cada evento de alteração dos downloads)"""
+        self.reload_timer.start()
+
     def show_add_download_dialog(self):
         dialog = DownloadDialog(self.main_window)
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -5080,6 +9104,7 @@ class DownloadsPage(QWidget):
         downloads = self.download_manager.get_downloads(status)
 
         self.downloads_list.clear()
+        self.item_widgets = {}
 
         for download in downloads:
             item = QListWidgetItem()
@@ -5088,6 +9113,18 @@ class DownloadsPage(QWidget):
             item.setSizeHint(widget.sizeHint())
             self.downloads_list.addItem(item)
             self.downloads_list.setItemWidget(item, widget)
+            self.item_widgets[download[0]] = widget
+
+            # Downloads em andamento mostram o progresso em memória, mais recente que o do banco
+            live = self.download_manager.progress.get(download[0])
+            if live:
+                widget.set_progress(*live)
+
+    def update_progress(self, download_id, downloaded, total, rate):
+        """Atualiza a barra do download exibido (chamado no máximo a cada 250 ms por download)"""
+        widget = self.item_widgets.get(download_id)
+        if widget is not None:
+            widget.set_progress(downloaded, total, rate)
 
     def clear_downloads_list(self):
         """Limpa a lista de downloads concluídos ou não"""
@@ -5125,8 +9162,50 @@ class DownloadsPage(QWidget):
         # Ajustar o índice se necessário
         self.sidebar.setCurrentRow(0)
 
+def migrate_json_cli(argv):
+    """Linha de comando da migração dos dados do app.py: System_Wizard.py --migrate-json [pasta]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="System_Wizard.py --migrate-json",
+        description="Migra os arquivos JSON do app.py para o banco do Automate Pro (pode ser retomada)."
+    )
+    parser.add_argument("data_dir", nargs="?", default="data", help="pasta com projects.json, notes.json...")
+    parser.add_argument("--db", help="arquivo do banco (padrão: ~/AutomatePro/automate_pro.db)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="registros por transação")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    started = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - started, 0.001)
+        print(f"\r{done:,}/{total:,} registros ({rate:,.0f} registros/s)", end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = JsonMigrator(db, args.data_dir, batch_size=args.batch_size).migrate(progress_callback=progress)
+    except KeyboardInterrupt:
+        print("\nInterrompida; execute novamente para continuar.", file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"\nErro: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(file=sys.stderr)
+    migrated = sum(stats['migrated'].values())
+    for collection, count in stats['migrated'].items():
+        print(f"{collection:<10} {count:>10,} registros")
+    print(f"total      {migrated:>10,} registros em {stats['seconds']:.2f}s "
+          f"({migrated / max(stats['seconds'], 0.001):,.0f} registros/s), {stats['skipped']:,} já migrados")
+    return 0
+
 def main():
     """Função principal para iniciar o aplicativo"""
+    if sys.argv[1:2] == ["--migrate-json"]:
+        sys.exit(migrate_json_cli(sys.argv[2:]))
+
     app = QApplication(sys.argv)
 
     # Configurar fonte padrão
@@ -2,10 +2,11 @@ from PIL import Image
 import os
 from fpdf.enums import XPos, YPos
 import json
+import shutil
+import tempfile
 import subprocess
 import threading
 import datetime
-import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import customtkinter as ctk
@@ -17,6 +18,436 @@ ctk.set_appearance_mode("Dark")  # Modo escuro padrão
 ctk.set_default_color_theme("blue")  # Tema azul
 
 
+def atomic_write_text(path, text):
+    """Grava um arquivo de forma atômica: arquivo temporário no mesmo diretório, fsync e os.replace"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def atomic_write_json(path, data, indent=None):
+    """Grava JSON de forma atômica (ver atomic_write_text)"""
+    atomic_write_text(
+        path,
+        json.dumps(data, indent=indent, ensure_ascii=False, separators=None if indent else (",", ":"))
+    )
+
+
+class JsonStore:
+    """Persistência das coleções do PAS: snapshot JSON compacto + log de operações.
+
+    Cada coleção tem um snapshot (data/<nome>.json, uma lista de registros) e
+    um log somente de acréscimo (data/<nome>.json.log, uma operação JSON por
+    linha). Salvar um registro acrescenta uma linha ao log; quando o log passa
+    de `compact_ops` operações ele é compactado em um novo snapshot, gravado
+    com atomic_write_text, e então esvaziado. Uma queda durante a gravação não
+    corrompe o snapshot, e uma linha incompleta no fim do log é descartada ao
+    carregar. Operações pendentes do mesmo registro são combinadas em uma só.
+
+    Cada compactação grava também o número de registros do snapshot (e o
+    tamanho do snapshot, para reconhecer um contador desatualizado) em
+    data/<nome>.json.count, então count não precisa ler o snapshot.
+    """
+
+    def __init__(self, files, compact_ops=1000):
+        self.files = files
+        self.compact_ops = compact_ops
+        self._records = {}  # coleção -> contêiner vivo com os registros
+        self._pending = {}  # coleção -> {id: (operação, registro, novo)} ainda não gravado
+        self._log_ops = {}  # coleção -> operações no log desde o último snapshot
+        self._next_id = {}
+
+    def log_path(self, key):
+        return self.files[key] + ".log"
+
+    def count_path(self, key):
+        return self.files[key] + ".count"
+
+    def load(self, key):
+        """Lê o snapshot, reaplica o log e retorna a lista de registros da coleção"""
+        path = self.files[key]
+        records = []
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    records = json.load(f)
+            except ValueError as e:
+                # Preservar o arquivo ilegível (e uma cópia do log) para recuperação manual. O log
+                # continua no lugar: a próxima carga o reaplica sobre uma lista vazia
+                backup = f"{path}.corrupt-{datetime.datetime.now():%Y%m%d%H%M%S}"
+                os.replace(path, backup)
+                if os.path.exists(self.log_path(key)):
+                    shutil.copyfile(self.log_path(key), backup + ".log")
+                raise Exception(f"arquivo ilegível ({e}); cópia preservada em {backup}")
+
+        # Registros antigos, sem id, recebem um na primeira carga
+        next_id = max((r["id"] for r in records if isinstance(r.get("id"), int)), default=0) + 1
+        needs_compaction = False
+        by_id = {}
+        for record in records:
+            if not isinstance(record.get("id"), int):
+                record["id"] = next_id
+                next_id += 1
+                needs_compaction = True
+            by_id[record["id"]] = record
+
+        log_ops = 0
+        for op in self._read_log(key):
+            if op is None:
+                # Linha incompleta de uma gravação interrompida
+                needs_compaction = True
+                break
+            if op["op"] == "put":
+                by_id[op["id"]] = op["record"]
+                next_id = max(next_id, op["id"] + 1)
+            elif op["op"] == "delete":
+                by_id.pop(op["id"], None)
+            log_ops += 1
+
+        self._records[key] = list(by_id.values())
+        self._pending[key] = {}
+        self._log_ops[key] = log_ops
+        self._next_id[key] = next_id
+        if needs_compaction or log_ops >= self.compact_ops or not self._is_line_snapshot(path):
+            self.compact(key)
+        return self._records[key]
+
+    def bind(self, key, records):
+        """Define o contêiner vivo (lista ou dict.values()) gravado nas compactações"""
+        self._records[key] = records
+
+    def count(self, key):
+        """Conta os registros de uma coleção ainda não carregada sem interpretar o snapshot.
+
+        Usa o contador gravado na última compactação mais as operações do log;
+        sem contador válido (snapshot de uma versão anterior), conta as linhas
+        do snapshot. Retorna None se o snapshot não estiver no formato de um
+        registro por linha.
+        """
+        path = self.files[key]
+        total = None
+        if not os.path.exists(path):
+            total = 0
+        elif os.path.exists(self.count_path(key)):
+            try:
+                with open(self.count_path(key), "r", encoding="utf-8") as f:
+                    records, size = map(int, f.read().split())
+                if size == os.path.getsize(path):
+                    total = records
+            except ValueError:
+                pass
+        if total is None:
+            if not self._is_line_snapshot(path):
+                return None
+            with open(path, "rb") as f:
+                total = f.read().count(b"\n{")
+
+        for op in self._read_log(key):
+            if op is None:
+                break
+            if op["op"] == "put" and op.get("new"):
+                total += 1
+            elif op["op"] == "delete":
+                total -= 1
+        return max(total, 0)
+
+    def new_id(self, key):
+        """Reserva um id para um novo registro da coleção"""
+        record_id = self._next_id[key]
+        self._next_id[key] += 1
+        return record_id
+
+    def put(self, key, record, new=False):
+        """Marca um registro (novo ou alterado) para gravação"""
+        previous = self._pending[key].get(record["id"])
+        self._pending[key][record["id"]] = ("put", record, new or (previous is not None and previous[2]))
+
+    def delete(self, key, record_id):
+        """Marca a exclusão de um registro para gravação"""
+        previous = self._pending[key].get(record_id)
+        if previous is not None and previous[2]:
+            # Registro criado e excluído antes de chegar ao disco
+            del self._pending[key][record_id]
+        else:
+            self._pending[key][record_id] = ("delete", None, False)
+
+    def replace(self, key, records):
+        """Substitui todos os registros da coleção (importação/redefinição) e grava um snapshot"""
+        # Compactar antes deixa o log vazio, então nada antigo é reaplicado sobre os novos registros
+        if key in self._records:
+            self.compact(key)
+        elif os.path.exists(self.log_path(key)):
+            os.remove(self.log_path(key))
+        self._log_ops[key] = 0
+        self._records[key] = records
+        self._next_id[key] = max((r["id"] for r in records if isinstance(r.get("id"), int)), default=0) + 1
+        for record in records:
+            if not isinstance(record.get("id"), int):
+                record["id"] = self.new_id(key)
+        self._pending[key] = {}
+        self.compact(key)
+        return records
+
+    def has_pending(self, key=None):
+        keys = [key] if key else list(self._pending)
+        return any(self._pending.get(k) for k in keys)
+
+    def flush(self, key=None):
+        """Acrescenta as operações pendentes ao log (com fsync) e compacta se necessário"""
+        for key in ([key] if key else list(self._pending)):
+            self._write_pending(key)
+            if self._log_ops.get(key, 0) >= self.compact_ops:
+                self.compact(key)
+
+    def compact(self, key):
+        """Grava o estado atual como snapshot (atômico) e esvazia o log"""
+        # Com o log completo, reaplicá-lo sobre o novo snapshot (queda antes de
+        # esvaziá-lo) chega ao mesmo estado
+        self._write_pending(key)
+        lines = [json.dumps(record, ensure_ascii=False, separators=(",", ":")) for record in self._records[key]]
+        text = "[\n" + ",\n".join(lines) + "\n]\n" if lines else "[\n]\n"
+        atomic_write_text(self.files[key], text)
+        atomic_write_text(self.count_path(key), f"{len(lines)} {len(text.encode('utf-8'))}\n")
+        with open(self.log_path(key), "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_ops[key] = 0
+
+    def _write_pending(self, key):
+        pending = self._pending.get(key)
+        if not pending:
+            return
+        lines = []
+        for record_id, (op, record, new) in pending.items():
+            entry = {"op": op, "id": record_id}
+            if op == "put":
+                if new:
+                    entry["new"] = True
+                entry["record"] = record
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._pending[key] = {}
+
+        with open(self.log_path(key), "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_ops[key] += len(lines)
+
+    def _read_log(self, key):
+        """Percorre as operações do log; produz None ao encontrar uma linha incompleta"""
+        if not os.path.exists(self.log_path(key)):
+            return
+        with open(self.log_path(key), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None
+                    return
+
+    @staticmethod
+    def _is_line_snapshot(path):
+        # Snapshots antigos (indent=4) são convertidos na primeira carga
+        if not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            head = f.read(3)
+        return head in (b"[\n{", b"[\n]")
+
+
+class Collection:
+    """Coleção de registros (dicts) do PAS com ids estáveis e carga sob demanda.
+
+    Os registros só são lidos do JsonStore no primeiro acesso; antes disso,
+    len() usa JsonStore.count. Ficam em um dict por id, então obter, alterar
+    e excluir um registro custa O(1).
+    Iterar percorre os registros na ordem de inserção, como a lista antiga.
+    Se a carga falhar, `on_error` recebe a exceção e a coleção recomeça só com
+    os registros do log (gravados desde a última compactação).
+    `version` aumenta a cada alteração, para as telas saberem quando se atualizar.
+    """
+
+    def __init__(self, store, key, on_error=None):
+        self.store = store
+        self.key = key
+        self.on_error = on_error
+        self.version = 0
+        self._by_id = None
+
+    @property
+    def loaded(self):
+        return self._by_id is not None
+
+    def __len__(self):
+        if self._by_id is None:
+            total = self.store.count(self.key)
+            if total is not None:
+                return total
+        return len(self._records())
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return iter(list(self._records().values()))
+
+    def get(self, record_id):
+        """Obtém um registro pelo id (ou None)"""
+        return self._records().get(record_id)
+
+    def add(self, record):
+        """Acrescenta um registro novo, atribuindo o seu id"""
+        records = self._records()
+        record["id"] = self.store.new_id(self.key)
+        records[record["id"]] = record
+        self.store.put(self.key, record, new=True)
+        self.version += 1
+        return record
+
+    def update(self, record):
+        """Registra a alteração de um registro já existente (editado no lugar)"""
+        records = self._records()
+        if record.get("id") not in records:
+            raise KeyError(f"Registro inexistente em {self.key}: {record.get('id')}")
+        records[record["id"]] = record
+        self.store.put(self.key, record)
+        self.version += 1
+
+    def remove(self, record):
+        """Exclui um registro (ou id)"""
+        record_id = record["id"] if isinstance(record, dict) else record
+        records = self._records()
+        if records.pop(record_id, None) is None:
+            return
+        self.store.delete(self.key, record_id)
+        self.version += 1
+
+    def replace(self, records):
+        """Substitui todos os registros (importação/redefinição)"""
+        self._build(self.store.replace(self.key, list(records)))
+        self.version += 1
+
+    def _records(self):
+        if self._by_id is None:
+            try:
+                records = self.store.load(self.key)
+            except Exception as e:
+                if self.on_error is None:
+                    raise
+                self.on_error(e)
+                # O snapshot ilegível já foi preservado; reaplicar o log sobre uma lista vazia
+                records = self.store.load(self.key)
+            self._build(records)
+        return self._by_id
+
+    def _build(self, records):
+        self._by_id = {record["id"]: record for record in records}
+        self.store.bind(self.key, self._by_id.values())
+
+
+class VirtualList(ctk.CTkFrame):
+    """Lista rolável que só cria widgets para as linhas visíveis.
+
+    Em vez de um frame por item, mantém um conjunto fixo de linhas (quantas
+    cabem na altura atual) e, ao rolar, reaproveita essas linhas para os itens
+    que passaram a ficar visíveis: create_row(parent) monta uma linha vazia e
+    update_row(row, item) a preenche. Rolar ou trocar os itens (set_items)
+    custa o número de linhas visíveis, não o tamanho da coleção.
+
+    A roda do mouse chega por PAS.on_mouse_wheel, um único bind global que a
+    repassa à lista sob o cursor; as listas não fazem bind_all, então listas
+    destruídas ao trocar de página não deixam handlers para trás.
+    """
+
+    def __init__(self, master, create_row, update_row, row_height=46, empty_text="", **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.update_row = update_row
+        self.row_height = row_height
+        self.items = []
+        self.first = 0
+        self.rows = []
+        self._height = 0
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text)
+
+        self.body.bind("<Configure>", self.on_resize)
+
+    def set_items(self, items):
+        """Troca os itens exibidos, mantendo a posição de rolagem quando possível"""
+        self.items = items
+        self.render()
+
+    def visible_rows(self):
+        """Quantidade de linhas inteiras que cabem na altura atual"""
+        return max(1, self._height // self.row_height)
+
+    def scroll_to(self, first):
+        first = max(0, min(int(first), len(self.items) - self.visible_rows()))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def render(self):
+        # Uma linha a mais para a que aparece cortada no fim
+        count = self.visible_rows() + 1
+        while len(self.rows) < count:
+            self.rows.append(self.create_row(self.body))
+
+        self.first = max(0, min(self.first, len(self.items) - self.visible_rows()))
+        for position, row in enumerate(self.rows):
+            index = self.first + position
+            if position < count and index < len(self.items):
+                self.update_row(row, self.items[index])
+                # Widgets do customtkinter não aceitam width/height no place: a altura vem da própria linha
+                row.place(x=0, y=position * self.row_height, relwidth=1)
+            else:
+                row.place_forget()
+
+        if self.items:
+            self.empty_label.place_forget()
+            total = len(self.items)
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_rows()) / total))
+        else:
+            self.empty_label.place(relx=0.5, y=50, anchor="center")
+            self.scrollbar.set(0.0, 1.0)
+
+    def on_resize(self, event):
+        if event.height != self._height:
+            self._height = event.height
+            self.render()
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(value) * len(self.items)))
+        elif action == "scroll":
+            step = self.visible_rows() if unit == "pages" else 1
+            self.scroll_to(self.first + int(value) * step)
+
+    def on_mouse_wheel(self, event):
+        if not self.winfo_exists() or not self.winfo_ismapped():
+            return
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+
+
 class PAS(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -35,8 +466,31 @@ class PAS(ctk.CTk):
         # Layout principal
         self.create_main_layout()
 
+        # Gravar alterações pendentes ao fechar
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        # Como no CTkScrollableFrame, a roda do mouse é capturada globalmente
+        # (widgets do customtkinter não aceitam bind_all), mas uma vez só para
+        # todas as VirtualList
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self.on_mouse_wheel, add="+")
+
         # Exibir página inicial
         self.show_home_page()
+    def on_closing(self):
+        """Grava as operações pendentes e compacta os logs antes de fechar"""
+        try:
+            self.store.flush()
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha ao salvar dados: {e}")
+        self.destroy()
+    def on_mouse_wheel(self, event):
+        """Repassa a roda do mouse à VirtualList que contém o widget sob o cursor"""
+        widget = event.widget
+        while widget is not None and not isinstance(widget, VirtualList):
+            widget = getattr(widget, "master", None)
+        if widget is not None:
+            widget.on_mouse_wheel(event)
     def load_settings(self):
         """Carrega as configurações do arquivo settings.json"""
         self.settings_file = "data/settings.json"
@@ -51,10 +505,9 @@ class PAS(ctk.CTk):
         try:
             os.makedirs("data", exist_ok=True)
             if not os.path.exists(self.settings_file):
-                with open(self.settings_file, "w") as f:
-                    json.dump(default_settings, f, indent=4)
+                atomic_write_json(self.settings_file, default_settings, indent=4)
 
-            with open(self.settings_file, "r") as f:
+            with open(self.settings_file, "r", encoding="utf-8") as f:
                 self.settings = json.load(f)
 
             # Aplicar tema
@@ -66,8 +519,7 @@ class PAS(ctk.CTk):
     def save_settings(self):
         """Salva as configurações no arquivo settings.json"""
         try:
-            with open(self.settings_file, "w") as f:
-                json.dump(self.settings, f, indent=4)
+            atomic_write_json(self.settings_file, self.settings, indent=4)
             return True
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao salvar configurações: {e}")
@@ -82,33 +534,56 @@ class PAS(ctk.CTk):
         }
 
         self.data = {}
+        self.store = JsonStore(self.data_files)
+        self.save_job = None
+
+        # As coleções só leem os arquivos no primeiro acesso
+        for key in self.data_files:
+            self.data[key] = Collection(
+                self.store, key,
+                on_error=lambda e, key=key: messagebox.showerror("Erro", f"Falha ao carregar dados de {key}: {e}")
+            )
+    def save_data(self, key=None):
+        """Grava as alterações pendentes no log da coleção.
 
-        for key, file in self.data_files.items():
-            default_data = []
-
-            try:
-                if not os.path.exists(file):
-                    with open(file, "w") as f:
-                        json.dump(default_data, f, indent=4)
-
-                with open(file, "r") as f:
-                    self.data[key] = json.load(f)
-
-            except Exception as e:
-                messagebox.showerror("Erro", f"Falha ao carregar dados de {key}: {e}")
-                self.data[key] = default_data
-    def save_data(self, key):
-        """Salva os dados no arquivo correspondente"""
-        if key not in self.data_files:
+        Com auto_save ligado, as gravações são agrupadas e feitas logo depois
+        da última alteração; desligado, são feitas na hora.
+        """
+        if key is not None and key not in self.data_files:
             return False
 
+        if self.settings.get("auto_save", True):
+            # Cada alteração adia a gravação: ela acontece 500 ms depois da última
+            if self.save_job is not None:
+                self.after_cancel(self.save_job)
+            self.save_job = self.after(500, self.flush_data)
+            return True
+        return self.flush_data(key)
+    def flush_data(self, key=None):
+        """Grava imediatamente as operações pendentes"""
+        self.save_job = None
         try:
-            with open(self.data_files[key], "w") as f:
-                json.dump(self.data[key], f, indent=4)
+            self.store.flush(key)
             return True
         except Exception as e:
-            messagebox.showerror("Erro", f"Falha ao salvar dados de {key}: {e}")
+            messagebox.showerror("Erro", f"Falha ao salvar dados: {e}")
             return False
+    def add_record(self, key, record):
+        """Acrescenta um registro a uma coleção e agenda a gravação"""
+        self.data[key].add(record)
+        return self.save_data(key)
+    def update_record(self, key, record):
+        """Agenda a gravação de um registro alterado"""
+        self.data[key].update(record)
+        return self.save_data(key)
+    def delete_record(self, key, record):
+        """Remove um registro de uma coleção e agenda a gravação"""
+        self.data[key].remove(record)
+        return self.save_data(key)
+    def replace_data(self, key, records):
+        """Substitui todos os registros de uma coleção (importação/redefinição)"""
+        self.data[key].replace(records)
+        return True
     def create_main_layout(self):
         """Cria o layout principal da aplicação"""
         # Grid layout (4x4)
@@ -163,18 +638,65 @@ class PAS(ctk.CTk):
         )
         self.settings_btn.grid(row=9, column=0, padx=20, pady=(5, 20), sticky="ew")
 
-        # Frame principal para conteúdo
-        self.main_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
-        self.main_frame.grid(row=0, column=1, sticky="nsew")
-        self.main_frame.grid_rowconfigure(0, weight=1)
-        self.main_frame.grid_columnconfigure(0, weight=1)
-    def clear_main_frame(self):
-        """Limpa o frame principal"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        # Frame principal para conteúdo; cada página é um frame filho, criado uma vez
+        self.pages_frame = ctk.CTkFrame(self, corner_radius=0, fg_color="transparent")
+        self.pages_frame.grid(row=0, column=1, sticky="nsew")
+        self.main_frame = self.pages_frame
+        self.pages = {}  # nome -> frame da página
+        self.page_refreshers = {}  # nome -> (função de atualização, coleções exibidas)
+        self.page_versions = {}  # nome -> versões das coleções na última atualização
+        self.current_page = None
+    def show_cached_page(self, name):
+        """Exibe a página `name`, reaproveitando os widgets se ela já foi construída.
+
+        Retorna True se a página já existia (e foi atualizada caso as coleções
+        exibidas tenham mudado). Caso contrário cria um frame vazio para ela,
+        aponta self.main_frame para ele e retorna False, para o chamador
+        construir a página.
+        """
+        if self.current_page in self.pages:
+            self.pages[self.current_page].pack_forget()
+        self.current_page = name
+
+        page = self.pages.get(name)
+        if page is not None:
+            page.pack(fill="both", expand=True)
+            self.main_frame = page
+            self.refresh_page(name)
+            return True
+
+        page = ctk.CTkFrame(self.pages_frame, corner_radius=0, fg_color="transparent")
+        page.pack(fill="both", expand=True)
+        self.pages[name] = page
+        self.main_frame = page
+        return False
+    def register_page_refresh(self, refresh, *keys):
+        """Associa à página em construção a função que a atualiza quando as coleções `keys` mudam"""
+        self.page_refreshers[self.current_page] = (refresh, keys)
+        self.page_versions.pop(self.current_page, None)
+        self.refresh_page(self.current_page)
+    def refresh_page(self, name):
+        """Chama a função de atualização da página se alguma coleção exibida mudou"""
+        refresh, keys = self.page_refreshers.get(name, (None, ()))
+        if refresh is None:
+            return
+        versions = tuple(self.data[key].version for key in keys)
+        if self.page_versions.get(name) != versions:
+            self.page_versions[name] = versions
+            refresh()
+    def invalidate_pages(self):
+        """Descarta todas as páginas construídas (após importar ou redefinir os dados)"""
+        for page in self.pages.values():
+            page.destroy()
+        self.pages = {}
+        self.page_refreshers = {}
+        self.page_versions = {}
+        self.current_page = None
+        self.main_frame = self.pages_frame
     def show_home_page(self):
         """Exibe a página inicial"""
-        self.clear_main_frame()
+        if self.show_cached_page("home"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -197,21 +719,23 @@ class PAS(ctk.CTk):
         cards_frame.pack(fill="x", padx=20, pady=10)
 
         cards = [
-            ("Projetos", len(self.data["projects"])),
-            ("Utilitários", len(self.data["utilities"])),
-            ("Anotações", len(self.data["notes"])),
-            ("Comandos", len(self.data["commands"]))
+            ("Projetos", "projects"),
+            ("Utilitários", "utilities"),
+            ("Anotações", "notes"),
+            ("Comandos", "commands")
         ]
 
-        for i, (text, count) in enumerate(cards):
+        count_labels = {}
+        for i, (text, key) in enumerate(cards):
             card = ctk.CTkFrame(cards_frame, width=200, height=100)
             card.grid(row=0, column=i, padx=10, pady=10)
 
             label = ctk.CTkLabel(card, text=text, font=ctk.CTkFont(size=14))
             label.pack(pady=(15, 5))
 
-            count_label = ctk.CTkLabel(card, text=str(count), font=ctk.CTkFont(size=24, weight="bold"))
+            count_label = ctk.CTkLabel(card, text="", font=ctk.CTkFont(size=24, weight="bold"))
             count_label.pack(pady=5)
+            count_labels[key] = count_label
 
         # Projetos recentes
         recent_frame = ctk.CTkFrame(self.main_frame)
@@ -224,25 +748,40 @@ class PAS(ctk.CTk):
         )
         recent_title.pack(pady=(10, 5))
 
-        if not self.settings["recent_projects"]:
-            empty_label = ctk.CTkLabel(recent_frame, text="Nenhum projeto recente")
-            empty_label.pack(pady=20)
-        else:
-            for project in self.settings["recent_projects"][:5]:  # Mostrar apenas os 5 mais recentes
-                project_frame = ctk.CTkFrame(recent_frame, height=40)
-                project_frame.pack(fill="x", padx=10, pady=5)
+        recent_list = ctk.CTkFrame(recent_frame, fg_color="transparent")
+        recent_list.pack(fill="both", expand=True)
 
-                name_label = ctk.CTkLabel(project_frame, text=project["name"], width=150, anchor="w")
-                name_label.pack(side="left", padx=10)
+        def refresh():
+            for key, count_label in count_labels.items():
+                count_label.configure(text=str(len(self.data[key])))
 
-                path_label = ctk.CTkLabel(project_frame, text=project["path"], anchor="w")
-                path_label.pack(side="left", fill="x", expand=True, padx=10)
+            # No máximo cinco linhas: recriá-las é barato
+            for widget in recent_list.winfo_children():
+                widget.destroy()
 
-                date_label = ctk.CTkLabel(project_frame, text=project["date"], width=100, anchor="w")
-                date_label.pack(side="left", padx=10)
+            if not self.settings["recent_projects"]:
+                empty_label = ctk.CTkLabel(recent_list, text="Nenhum projeto recente")
+                empty_label.pack(pady=20)
+            else:
+                for project in self.settings["recent_projects"][:5]:  # Mostrar apenas os 5 mais recentes
+                    project_frame = ctk.CTkFrame(recent_list, height=40)
+                    project_frame.pack(fill="x", padx=10, pady=5)
+
+                    name_label = ctk.CTkLabel(project_frame, text=project["name"], width=150, anchor="w")
+                    name_label.pack(side="left", padx=10)
+
+                    path_label = ctk.CTkLabel(project_frame, text=project["path"], anchor="w")
+                    path_label.pack(side="left", fill="x", expand=True, padx=10)
+
+                    date_label = ctk.CTkLabel(project_frame, text=project["date"], width=100, anchor="w")
+                    date_label.pack(side="left", padx=10)
+
+        # Projetos recentes mudam junto com a coleção de projetos
+        self.register_page_refresh(refresh, "projects", "utilities", "notes", "commands")
     def show_projects_page(self):
         """Exibe a página de gerenciamento de projetos"""
-        self.clear_main_frame()
+        if self.show_cached_page("projects"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -389,8 +928,7 @@ class PAS(ctk.CTk):
             }
 
             # Adicionar aos dados e salvar
-            self.data["projects"].append(project)
-            self.save_data("projects")
+            self.add_record("projects", project)
 
             # Adicionar aos projetos recentes
             recent_project = {
@@ -415,7 +953,8 @@ class PAS(ctk.CTk):
 
     def show_image_converter_page(self):
         """Exibe a página de conversão de imagens"""
-        self.clear_main_frame()
+        if self.show_cached_page("image_converter"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -714,7 +1253,8 @@ class PAS(ctk.CTk):
             messagebox.showerror("Erro", f"Falha na conversão: {str(e)}")
     def show_pdf_page(self):
         """Exibe a página de criação de documentos PDF"""
-        self.clear_main_frame()
+        if self.show_cached_page("pdf"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1029,12 +1569,12 @@ class PAS(ctk.CTk):
         )
 
         if confirm:
-            self.data["projects"] = [p for p in self.data["projects"] if p != project]
-            self.save_data("projects")
+            self.delete_record("projects", project)
             self.show_projects_page()
     def show_spreadsheets_page(self):
         """Exibe a página de gerenciamento de planilhas"""
-        self.clear_main_frame()
+        if self.show_cached_page("spreadsheets"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1121,15 +1661,6 @@ class PAS(ctk.CTk):
             # Processar dados iniciais (opcional)
             initial_data = [d.strip() for d in initial_data_text.split("\n") if d.strip()]
 
-            # Criar DataFrame
-            data = {header: [""] * num_rows for header in headers}
-            df = pd.DataFrame(data)
-
-            # Preencher com dados iniciais se fornecidos
-            for i, value in enumerate(initial_data):
-                if i < num_rows and len(headers) > 0:
-                    df.at[i, headers[0]] = value
-
             # Salvar arquivo
             default_dir = self.settings["default_dir"]
             save_path = filedialog.asksaveasfilename(
@@ -1140,8 +1671,12 @@ class PAS(ctk.CTk):
             )
 
             if save_path:
-                df.to_excel(save_path, index=False)
-                messagebox.showinfo("Sucesso", f"Planilha gerada com sucesso em:\n{save_path}")
+                # Gravar em segundo plano para não travar a interface em planilhas grandes
+                threading.Thread(
+                    target=self.write_spreadsheet_file,
+                    args=(save_path, headers, num_rows, initial_data),
+                    daemon=True
+                ).start()
 
                 # Atualizar diretório padrão se necessário
                 dir_path = os.path.dirname(save_path)
@@ -1151,9 +1686,28 @@ class PAS(ctk.CTk):
 
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao gerar planilha: {e}")
+    def write_spreadsheet_file(self, save_path, headers, num_rows, initial_data):
+        """Grava a planilha em fluxo (openpyxl write-only), linha a linha, com memória constante"""
+        try:
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(headers)
+
+            empty_cells = [None] * (len(headers) - 1)
+            for i in range(num_rows):
+                first_cell = initial_data[i] if i < len(initial_data) else None
+                sheet.append([first_cell] + empty_cells)
+
+            workbook.save(save_path)
+            self.after(0, lambda: messagebox.showinfo("Sucesso", f"Planilha gerada com sucesso em:\n{save_path}"))
+        except Exception as e:
+            self.after(0, lambda error=e: messagebox.showerror("Erro", f"Falha ao gerar planilha: {error}"))
     def show_dev_page(self):
         """Exibe a página de projetos de desenvolvimento"""
-        self.clear_main_frame()
+        if self.show_cached_page("dev"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1565,7 +2119,8 @@ class PAS(ctk.CTk):
         self.terminal.see("end")
     def show_utilities_page(self):
         """Exibe a página de utilitários"""
-        self.clear_main_frame()
+        if self.show_cached_page("utilities"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1591,125 +2146,35 @@ class PAS(ctk.CTk):
         links_frame = ctk.CTkFrame(tabview.tab("Links Web"))
         links_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Separar utilitários em aplicativos e links
-        apps = [u for u in self.data["utilities"] if not u["path"].startswith(("http://", "https://"))]
-        links = [u for u in self.data["utilities"] if u["path"].startswith(("http://", "https://"))]
-
-        # Mostrar aplicativos em cards
-        if not apps:
-            empty_label = ctk.CTkLabel(apps_frame, text="Nenhum aplicativo cadastrado")
-            empty_label.pack(pady=50)
-        else:
-            # Grid para os cards
-            apps_frame.grid_columnconfigure((0, 1, 2), weight=1)  # 3 colunas
-            apps_frame.grid_rowconfigure(tuple(range((len(apps) + 2) // 3)), weight=1)  # Linhas necessárias
-
-            for i, utility in enumerate(apps):
-                row = i // 3
-                col = i % 3
-
-                card = ctk.CTkFrame(apps_frame, width=200, height=150, corner_radius=10)
-                card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-                # Nome do aplicativo
-                name_label = ctk.CTkLabel(card, text=utility["name"], font=ctk.CTkFont(weight="bold"))
-                name_label.pack(pady=(10, 5))
-
-                # Ícone (simulado)
-                icon_label = ctk.CTkLabel(card, text="📁", font=ctk.CTkFont(size=24))
-                icon_label.pack(pady=5)
-
-                # Botões de ação
-                btn_frame = ctk.CTkFrame(card, fg_color="transparent")
-                btn_frame.pack(pady=10)
-
-                run_btn = ctk.CTkButton(
-                    btn_frame,
-                    text="Abrir",
-                    width=70,
-                    command=lambda p=utility["path"]: self.run_utility(p)
-                )
-                run_btn.pack(side="left", padx=2)
-
-                edit_btn = ctk.CTkButton(
-                    btn_frame,
-                    text="Editar",
-                    width=70,
-                    command=lambda u=utility: self.edit_utility(u)
-                )
-                edit_btn.pack(side="left", padx=2)
-
-                delete_btn = ctk.CTkButton(
-                    btn_frame,
-                    text="Excluir",
-                    width=70,
-                    fg_color="red",
-                    hover_color="darkred",
-                    command=lambda u=utility: self.delete_utility(u)
-                )
-                delete_btn.pack(side="left", padx=2)
-
-        # Mostrar links em uma lista organizada
-        if not links:
-            empty_label = ctk.CTkLabel(links_frame, text="Nenhum link web cadastrado")
-            empty_label.pack(pady=50)
-        else:
-            # Cabeçalho
-            headers_frame = ctk.CTkFrame(links_frame, fg_color="transparent")
-            headers_frame.pack(fill="x", padx=10, pady=5)
-
-            ctk.CTkLabel(headers_frame, text="Nome", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
-                                                                                           fill="x", expand=True)
-            ctk.CTkLabel(headers_frame, text="URL", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
-                                                                                          fill="x", expand=True)
-            ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
-                                                                                                       padx=5, pady=5)
-
-            # Lista de links
-            scroll_frame = ctk.CTkScrollableFrame(links_frame)
-            scroll_frame.pack(fill="both", expand=True, padx=10, pady=5)
-
-            for link in links:
-                link_frame = ctk.CTkFrame(scroll_frame)
-                link_frame.pack(fill="x", padx=5, pady=5)
-
-                # Nome
-                name_label = ctk.CTkLabel(link_frame, text=link["name"], anchor="w")
-                name_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-
-                # URL
-                url_label = ctk.CTkLabel(link_frame, text=link["path"], anchor="w")
-                url_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-
-                # Botões de ação
-                action_frame = ctk.CTkFrame(link_frame, fg_color="transparent")
-                action_frame.pack(side="left", padx=5, pady=5)
-
-                open_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Abrir",
-                    width=50,
-                    command=lambda p=link["path"]: self.run_utility(p)
-                )
-                open_btn.pack(side="left", padx=2)
-
-                edit_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Editar",
-                    width=50,
-                    command=lambda u=link: self.edit_utility(u)
-                )
-                edit_btn.pack(side="left", padx=2)
-
-                delete_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Excluir",
-                    width=50,
-                    fg_color="red",
-                    hover_color="darkred",
-                    command=lambda u=link: self.delete_utility(u)
-                )
-                delete_btn.pack(side="left", padx=2)
+        # Aplicativos em cards, três por linha: cada linha da lista é um grupo de três
+        apps_list = VirtualList(
+            apps_frame,
+            self.create_utility_cards_row,
+            self.update_utility_cards_row,
+            row_height=170,
+            empty_text="Nenhum aplicativo cadastrado",
+            fg_color="transparent"
+        )
+        apps_list.pack(fill="both", expand=True)
+
+        # Links em uma lista organizada
+        headers_frame = ctk.CTkFrame(links_frame, fg_color="transparent")
+        headers_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(headers_frame, text="Nome", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
+                                                                                       fill="x", expand=True)
+        ctk.CTkLabel(headers_frame, text="URL", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
+                                                                                      fill="x", expand=True)
+        ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
+                                                                                                   padx=5, pady=5)
+
+        links_list = VirtualList(
+            links_frame,
+            self.create_link_row,
+            self.update_link_row,
+            empty_text="Nenhum link web cadastrado"
+        )
+        links_list.pack(fill="both", expand=True, padx=10, pady=5)
 
         # Botão para adicionar novo utilitário (comum para ambas as abas)
         add_btn = ctk.CTkButton(
@@ -1718,6 +2183,92 @@ class PAS(ctk.CTk):
             command=self.show_add_utility_dialog
         )
         add_btn.pack(pady=10)
+
+        def refresh():
+            # Separar utilitários em aplicativos e links
+            apps = [u for u in self.data["utilities"] if not u["path"].startswith(("http://", "https://"))]
+            links = [u for u in self.data["utilities"] if u["path"].startswith(("http://", "https://"))]
+            apps_list.set_items([apps[i:i + 3] for i in range(0, len(apps), 3)])
+            links_list.set_items(links)
+
+        self.register_page_refresh(refresh, "utilities")
+    def create_utility_cards_row(self, parent):
+        """Cria uma linha (ainda vazia) com três cards de aplicativos"""
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.grid_columnconfigure((0, 1, 2), weight=1, uniform="cards")  # 3 colunas
+        row.cards = []
+
+        for col in range(3):
+            card = ctk.CTkFrame(row, width=200, height=150, corner_radius=10)
+            card.grid(row=0, column=col, padx=10, pady=10, sticky="nsew")
+
+            # Nome do aplicativo
+            card.name_label = ctk.CTkLabel(card, font=ctk.CTkFont(weight="bold"))
+            card.name_label.pack(pady=(10, 5))
+
+            # Ícone (simulado)
+            icon_label = ctk.CTkLabel(card, text="📁", font=ctk.CTkFont(size=24))
+            icon_label.pack(pady=5)
+
+            # Botões de ação
+            btn_frame = ctk.CTkFrame(card, fg_color="transparent")
+            btn_frame.pack(pady=10)
+
+            card.run_btn = ctk.CTkButton(btn_frame, text="Abrir", width=70)
+            card.run_btn.pack(side="left", padx=2)
+
+            card.edit_btn = ctk.CTkButton(btn_frame, text="Editar", width=70)
+            card.edit_btn.pack(side="left", padx=2)
+
+            card.delete_btn = ctk.CTkButton(btn_frame, text="Excluir", width=70, fg_color="red",
+                                            hover_color="darkred")
+            card.delete_btn.pack(side="left", padx=2)
+            row.cards.append(card)
+        return row
+    def update_utility_cards_row(self, row, utilities):
+        """Preenche os cards de uma linha de aplicativos (a última pode ter menos de três)"""
+        for col, card in enumerate(row.cards):
+            if col >= len(utilities):
+                card.grid_remove()
+                continue
+            utility = utilities[col]
+            card.name_label.configure(text=utility["name"])
+            card.run_btn.configure(command=lambda p=utility["path"]: self.run_utility(p))
+            card.edit_btn.configure(command=lambda u=utility: self.edit_utility(u))
+            card.delete_btn.configure(command=lambda u=utility: self.delete_utility(u))
+            card.grid()
+    def create_link_row(self, parent):
+        """Cria uma linha (ainda vazia) da lista de links web"""
+        row = ctk.CTkFrame(parent)
+
+        # Nome
+        row.name_label = ctk.CTkLabel(row, anchor="w")
+        row.name_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+
+        # URL
+        row.url_label = ctk.CTkLabel(row, anchor="w")
+        row.url_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+
+        # Botões de ação
+        action_frame = ctk.CTkFrame(row, fg_color="transparent")
+        action_frame.pack(side="left", padx=5, pady=5)
+
+        row.open_btn = ctk.CTkButton(action_frame, text="Abrir", width=50)
+        row.open_btn.pack(side="left", padx=2)
+
+        row.edit_btn = ctk.CTkButton(action_frame, text="Editar", width=50)
+        row.edit_btn.pack(side="left", padx=2)
+
+        row.delete_btn = ctk.CTkButton(action_frame, text="Excluir", width=50, fg_color="red", hover_color="darkred")
+        row.delete_btn.pack(side="left", padx=2)
+        return row
+    def update_link_row(self, row, link):
+        """Preenche uma linha da lista de links web"""
+        row.name_label.configure(text=link["name"])
+        row.url_label.configure(text=link["path"])
+        row.open_btn.configure(command=lambda p=link["path"]: self.run_utility(p))
+        row.edit_btn.configure(command=lambda u=link: self.edit_utility(u))
+        row.delete_btn.configure(command=lambda u=link: self.delete_utility(u))
     def show_add_utility_dialog(self, utility=None):
         """Mostra o diálogo para adicionar/editar um utilitário"""
         dialog = ctk.CTkToplevel(self)
@@ -1776,15 +2327,15 @@ class PAS(ctk.CTk):
                 # Atualizar utilitário existente
                 utility["name"] = name
                 utility["path"] = path
+                self.update_record("utilities", utility)
             else:
                 # Adicionar novo utilitário
                 new_utility = {
                     "name": name,
                     "path": path
                 }
-                self.data["utilities"].append(new_utility)
+                self.add_record("utilities", new_utility)
 
-            self.save_data("utilities")
             dialog.destroy()
             self.show_utilities_page()
 
@@ -1811,12 +2362,12 @@ class PAS(ctk.CTk):
         )
 
         if confirm:
-            self.data["utilities"] = [u for u in self.data["utilities"] if u != utility]
-            self.save_data("utilities")
+            self.delete_record("utilities", utility)
             self.show_utilities_page()
     def show_cleanup_page(self):
         """Exibe a página de limpeza"""
-        self.clear_main_frame()
+        if self.show_cached_page("cleanup"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1916,7 +2467,8 @@ class PAS(ctk.CTk):
             raise Exception(f"Falha ao deletar logs: {e}")
     def show_notes_page(self):
         """Exibe a página de anotações"""
-        self.clear_main_frame()
+        if self.show_cached_page("notes"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -1995,72 +2547,67 @@ class PAS(ctk.CTk):
         existing_frame = ctk.CTkFrame(tabview.tab("Anotações Existentes"))
         existing_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        if not self.data["notes"]:
-            empty_label = ctk.CTkLabel(existing_frame, text="Nenhuma anotação cadastrada")
-            empty_label.pack(pady=50)
-        else:
-            # Cabeçalho
-            headers_frame = ctk.CTkFrame(existing_frame, fg_color="transparent")
-            headers_frame.pack(fill="x", padx=10, pady=5)
-
-            ctk.CTkLabel(headers_frame, text="Título", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
-                                                                                                        padx=5, pady=5)
-            ctk.CTkLabel(headers_frame, text="Data", font=ctk.CTkFont(weight="bold"), width=100).pack(side="left",
-                                                                                                      padx=5, pady=5)
-            ctk.CTkLabel(headers_frame, text="Tags", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
-                                                                                           fill="x", expand=True)
-            ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
-                                                                                                       padx=5, pady=5)
-
-            # Lista de anotações
-            scroll_frame = ctk.CTkScrollableFrame(existing_frame)
-            scroll_frame.pack(fill="both", expand=True, padx=10, pady=5)
-
-            for note in self.data["notes"]:
-                note_frame = ctk.CTkFrame(scroll_frame)
-                note_frame.pack(fill="x", padx=5, pady=5)
-
-                # Título
-                title_label = ctk.CTkLabel(note_frame, text=note["title"], width=150, anchor="w")
-                title_label.pack(side="left", padx=5, pady=5)
-
-                # Data
-                date_label = ctk.CTkLabel(note_frame, text=note["date"], width=100, anchor="w")
-                date_label.pack(side="left", padx=5, pady=5)
-
-                # Tags
-                tags_label = ctk.CTkLabel(note_frame, text=", ".join(note["tags"]), anchor="w")
-                tags_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-
-                # Botões de ação
-                action_frame = ctk.CTkFrame(note_frame, fg_color="transparent")
-                action_frame.pack(side="left", padx=5, pady=5)
-
-                view_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Ver",
-                    width=50,
-                    command=lambda n=note: self.view_note(n)
-                )
-                view_btn.pack(side="left", padx=2)
+        # Cabeçalho
+        headers_frame = ctk.CTkFrame(existing_frame, fg_color="transparent")
+        headers_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(headers_frame, text="Título", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
+                                                                                                    padx=5, pady=5)
+        ctk.CTkLabel(headers_frame, text="Data", font=ctk.CTkFont(weight="bold"), width=100).pack(side="left",
+                                                                                                  padx=5, pady=5)
+        ctk.CTkLabel(headers_frame, text="Tags", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5, pady=5,
+                                                                                       fill="x", expand=True)
+        ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
+                                                                                                   padx=5, pady=5)
+
+        # Lista de anotações: só as linhas visíveis têm widgets
+        notes_list = VirtualList(
+            existing_frame,
+            self.create_note_row,
+            self.update_note_row,
+            empty_text="Nenhuma anotação cadastrada"
+        )
+        notes_list.pack(fill="both", expand=True, padx=10, pady=5)
 
-                edit_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Editar",
-                    width=50,
-                    command=lambda n=note: self.edit_note(n)
-                )
-                edit_btn.pack(side="left", padx=2)
-
-                delete_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Excluir",
-                    width=50,
-                    fg_color="red",
-                    hover_color="darkred",
-                    command=lambda n=note: self.delete_note(n)
-                )
-                delete_btn.pack(side="left", padx=2)
+        self.notes_tabview = tabview
+        self.register_page_refresh(lambda: notes_list.set_items(list(self.data["notes"])), "notes")
+    def create_note_row(self, parent):
+        """Cria uma linha (ainda vazia) da lista de anotações"""
+        row = ctk.CTkFrame(parent)
+
+        # Título
+        row.title_label = ctk.CTkLabel(row, width=150, anchor="w")
+        row.title_label.pack(side="left", padx=5, pady=5)
+
+        # Data
+        row.date_label = ctk.CTkLabel(row, width=100, anchor="w")
+        row.date_label.pack(side="left", padx=5, pady=5)
+
+        # Tags
+        row.tags_label = ctk.CTkLabel(row, anchor="w")
+        row.tags_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+
+        # Botões de ação
+        action_frame = ctk.CTkFrame(row, fg_color="transparent")
+        action_frame.pack(side="left", padx=5, pady=5)
+
+        row.view_btn = ctk.CTkButton(action_frame, text="Ver", width=50)
+        row.view_btn.pack(side="left", padx=2)
+
+        row.edit_btn = ctk.CTkButton(action_frame, text="Editar", width=50)
+        row.edit_btn.pack(side="left", padx=2)
+
+        row.delete_btn = ctk.CTkButton(action_frame, text="Excluir", width=50, fg_color="red", hover_color="darkred")
+        row.delete_btn.pack(side="left", padx=2)
+        return row
+    def update_note_row(self, row, note):
+        """Preenche uma linha da lista de anotações"""
+        row.title_label.configure(text=note["title"])
+        row.date_label.configure(text=note["date"])
+        row.tags_label.configure(text=", ".join(note["tags"]))
+        row.view_btn.configure(command=lambda n=note: self.view_note(n))
+        row.edit_btn.configure(command=lambda n=note: self.edit_note(n))
+        row.delete_btn.configure(command=lambda n=note: self.delete_note(n))
     def clear_note_form(self):
         """Limpa o formulário de anotação"""
         for label_text, widget in self.note_entries.items():
@@ -2101,8 +2648,7 @@ class PAS(ctk.CTk):
             }
 
             # Adicionar aos dados e salvar
-            self.data["notes"].append(note)
-            self.save_data("notes")
+            self.add_record("notes", note)
 
             # Limpar formulário e mostrar mensagem
             self.clear_note_form()
@@ -2164,11 +2710,8 @@ class PAS(ctk.CTk):
         content_text.configure(state="disabled")  # Somente leitura
     def edit_note(self, note):
         """Preenche o formulário com os dados da anotação para edição"""
-        # Muda para a aba de novo projeto
-        for widget in self.main_frame.winfo_children():
-            if isinstance(widget, ctk.CTkTabview):
-                widget.set("Nova Anotação")
-                break
+        # Muda para a aba do formulário
+        self.notes_tabview.set("Nova Anotação")
 
         # Preenche os campos
         self.clear_note_form()
@@ -2203,16 +2746,14 @@ class PAS(ctk.CTk):
                 return
 
             # Atualizar a anotação existente nos dados
-            for note in self.data["notes"]:
-                if note == self.current_note_being_edited:
-                    note["title"] = title
-                    note["date"] = date
-                    note["tags"] = tags
-                    note["content"] = content
-                    break
+            note = self.current_note_being_edited
+            note["title"] = title
+            note["date"] = date
+            note["tags"] = tags
+            note["content"] = content
 
             # Salvar as alterações
-            self.save_data("notes")
+            self.update_record("notes", note)
 
             # Limpar formulário e mostrar mensagem
             self.clear_note_form()
@@ -2248,12 +2789,12 @@ class PAS(ctk.CTk):
         )
 
         if confirm:
-            self.data["notes"] = [n for n in self.data["notes"] if n != note]
-            self.save_data("notes")
+            self.delete_record("notes", note)
             self.show_notes_page()
     def show_commands_page(self):
         """Exibe a página de comandos personalizados"""
-        self.clear_main_frame()
+        if self.show_cached_page("commands"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -2267,69 +2808,27 @@ class PAS(ctk.CTk):
         main_content = ctk.CTkFrame(self.main_frame)
         main_content.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-        # Lista de comandos existentes
-        if not self.data["commands"]:
-            empty_label = ctk.CTkLabel(main_content, text="Nenhum comando cadastrado")
-            empty_label.pack(pady=50)
-        else:
-            # Cabeçalho
-            headers_frame = ctk.CTkFrame(main_content, fg_color="transparent")
-            headers_frame.pack(fill="x", padx=10, pady=5)
-
-            ctk.CTkLabel(headers_frame, text="Título", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5,
-                                                                                             pady=5, fill="x",
-                                                                                             expand=True)
-            ctk.CTkLabel(headers_frame, text="Comando", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5,
-                                                                                              pady=5, fill="x",
-                                                                                              expand=True)
-            ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
-                                                                                                       padx=5, pady=5)
-
-            # Lista de comandos
-            scroll_frame = ctk.CTkScrollableFrame(main_content)
-            scroll_frame.pack(fill="both", expand=True, padx=10, pady=5)
-
-            for cmd in self.data["commands"]:
-                cmd_frame = ctk.CTkFrame(scroll_frame)
-                cmd_frame.pack(fill="x", padx=5, pady=5)
-
-                # Título
-                title_label = ctk.CTkLabel(cmd_frame, text=cmd["title"], anchor="w")
-                title_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-
-                # Comando
-                command_label = ctk.CTkLabel(cmd_frame, text=cmd["command"], anchor="w")
-                command_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
-
-                # Botões de ação
-                action_frame = ctk.CTkFrame(cmd_frame, fg_color="transparent")
-                action_frame.pack(side="left", padx=5, pady=5)
-
-                run_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Executar",
-                    width=50,
-                    command=lambda c=cmd["command"]: self.run_command(c)
-                )
-                run_btn.pack(side="left", padx=2)
-
-                edit_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Editar",
-                    width=50,
-                    command=lambda c=cmd: self.edit_command(c)
-                )
-                edit_btn.pack(side="left", padx=2)
-
-                delete_btn = ctk.CTkButton(
-                    action_frame,
-                    text="Excluir",
-                    width=50,
-                    fg_color="red",
-                    hover_color="darkred",
-                    command=lambda c=cmd: self.delete_command(c)
-                )
-                delete_btn.pack(side="left", padx=2)
+        # Cabeçalho
+        headers_frame = ctk.CTkFrame(main_content, fg_color="transparent")
+        headers_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(headers_frame, text="Título", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5,
+                                                                                         pady=5, fill="x",
+                                                                                         expand=True)
+        ctk.CTkLabel(headers_frame, text="Comando", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5,
+                                                                                          pady=5, fill="x",
+                                                                                          expand=True)
+        ctk.CTkLabel(headers_frame, text="Ações", font=ctk.CTkFont(weight="bold"), width=150).pack(side="left",
+                                                                                                   padx=5, pady=5)
+
+        # Lista de comandos: só as linhas visíveis têm widgets
+        commands_list = VirtualList(
+            main_content,
+            self.create_command_row,
+            self.update_command_row,
+            empty_text="Nenhum comando cadastrado"
+        )
+        commands_list.pack(fill="both", expand=True, padx=10, pady=5)
 
         # Botão para adicionar novo comando
         add_btn = ctk.CTkButton(
@@ -2338,6 +2837,40 @@ class PAS(ctk.CTk):
             command=self.show_add_command_dialog
         )
         add_btn.pack(pady=10)
+
+        self.register_page_refresh(lambda: commands_list.set_items(list(self.data["commands"])), "commands")
+    def create_command_row(self, parent):
+        """Cria uma linha (ainda vazia) da lista de comandos"""
+        row = ctk.CTkFrame(parent)
+
+        # Título
+        row.title_label = ctk.CTkLabel(row, anchor="w")
+        row.title_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+
+        # Comando
+        row.command_label = ctk.CTkLabel(row, anchor="w")
+        row.command_label.pack(side="left", padx=5, pady=5, fill="x", expand=True)
+
+        # Botões de ação
+        action_frame = ctk.CTkFrame(row, fg_color="transparent")
+        action_frame.pack(side="left", padx=5, pady=5)
+
+        row.run_btn = ctk.CTkButton(action_frame, text="Executar", width=50)
+        row.run_btn.pack(side="left", padx=2)
+
+        row.edit_btn = ctk.CTkButton(action_frame, text="Editar", width=50)
+        row.edit_btn.pack(side="left", padx=2)
+
+        row.delete_btn = ctk.CTkButton(action_frame, text="Excluir", width=50, fg_color="red", hover_color="darkred")
+        row.delete_btn.pack(side="left", padx=2)
+        return row
+    def update_command_row(self, row, cmd):
+        """Preenche uma linha da lista de comandos"""
+        row.title_label.configure(text=cmd["title"])
+        row.command_label.configure(text=cmd["command"])
+        row.run_btn.configure(command=lambda c=cmd["command"]: self.run_command(c))
+        row.edit_btn.configure(command=lambda c=cmd: self.edit_command(c))
+        row.delete_btn.configure(command=lambda c=cmd: self.delete_command(c))
     def show_add_command_dialog(self, command=None):
         """Mostra o diálogo para adicionar/editar um comando"""
         dialog = ctk.CTkToplevel(self)
@@ -2396,15 +2929,15 @@ class PAS(ctk.CTk):
                 # Atualizar comando existente
                 command["title"] = title
                 command["command"] = cmd
+                self.update_record("commands", command)
             else:
                 # Adicionar novo comando
                 new_command = {
                     "title": title,
                     "command": cmd
                 }
-                self.data["commands"].append(new_command)
+                self.add_record("commands", new_command)
 
-            self.save_data("commands")
             dialog.destroy()
             self.show_commands_page()
 
@@ -2490,12 +3023,12 @@ class PAS(ctk.CTk):
         )
 
         if confirm:
-            self.data["commands"] = [c for c in self.data["commands"] if c != command]
-            self.save_data("commands")
+            self.delete_record("commands", command)
             self.show_commands_page()
     def show_guide_page(self):
         """Exibe a página do guia do sistema"""
-        self.clear_main_frame()
+        if self.show_cached_page("guide"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -2557,7 +3090,8 @@ class PAS(ctk.CTk):
         textbox.configure(state="disabled")  # Somente leitura
     def show_settings_page(self):
         """Exibe a página de configurações"""
-        self.clear_main_frame()
+        if self.show_cached_page("settings"):
+            return
 
         # Título
         title = ctk.CTkLabel(
@@ -2686,10 +3220,10 @@ class PAS(ctk.CTk):
             # Criar objeto com todos os dados
             export_data = {
                 "settings": self.settings,
-                "projects": self.data["projects"],
-                "utilities": self.data["utilities"],
-                "notes": self.data["notes"],
-                "commands": self.data["commands"]
+                "projects": list(self.data["projects"]),
+                "utilities": list(self.data["utilities"]),
+                "notes": list(self.data["notes"]),
+                "commands": list(self.data["commands"])
             }
 
             # Solicitar local para salvar
@@ -2732,20 +3266,19 @@ class PAS(ctk.CTk):
 
                 if confirm:
                     self.settings = import_data["settings"]
-                    self.data["projects"] = import_data["projects"]
-                    self.data["utilities"] = import_data["utilities"]
-                    self.data["notes"] = import_data["notes"]
-                    self.data["commands"] = import_data["commands"]
 
                     # Salvar tudo
                     self.save_settings()
                     for key in self.data_files:
-                        self.save_data(key)
+                        self.replace_data(key, import_data[key])
 
                     # Aplicar configurações
                     ctk.set_appearance_mode(self.settings["theme"])
 
+                    # As páginas guardadas exibem as configurações antigas
+                    self.invalidate_pages()
                     messagebox.showinfo("Sucesso", "Dados importados com sucesso!")
+                    self.show_home_page()
 
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao importar dados: {e}")
@@ -2767,22 +3300,16 @@ class PAS(ctk.CTk):
                     "recent_projects": []
                 }
 
-                # Redefinir dados
-                self.data = {
-                    "projects": [],
-                    "utilities": [],
-                    "notes": [],
-                    "commands": []
-                }
-
-                # Salvar tudo
+                # Salvar tudo, redefinindo os dados
                 self.save_settings()
                 for key in self.data_files:
-                    self.save_data(key)
+                    self.replace_data(key, [])
 
                 # Aplicar configurações
                 ctk.set_appearance_mode(self.settings["theme"])
 
+                # As páginas guardadas exibem as configurações antigas
+                self.invalidate_pages()
                 messagebox.showinfo("Sucesso", "Todos os dados foram redefinidos!")
                 self.show_home_page()
 
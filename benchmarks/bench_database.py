@@ -0,0 +1,93 @@
+"""Micro-benchmark da camada de acesso ao SQLite.
+
+Compara o modelo antigo (uma conexão + commit por chamada) com o pool
+persistente do DatabaseManager executando a mesma carga de trabalho:
+um INSERT de entidade seguido de um INSERT no histórico, mais leituras.
+A última rodada agrupa entidade e histórico em db.transaction().
+
+Uso: python benchmarks/bench_database.py [operacoes]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager
+
+
+class LegacyDatabase:
+    """Reprodução do execute_query original: nova conexão a cada chamada"""
+    def __init__(self, db_path):
+        self.db_path = db_path
+    def execute_query(self, query, params=None, fetchone=False, fetchall=False):
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            conn.commit()
+
+            if fetchone:
+                return cursor.fetchone()
+            if fetchall:
+                return cursor.fetchall()
+            return cursor.lastrowid
+
+
+def create_note(db, i):
+    note_id = db.execute_query(
+        "INSERT INTO notes (title, content, tags) VALUES (?, ?, ?)",
+        (f"Nota {i}", "conteúdo " * 20, "bench")
+    )
+    db.execute_query(
+        "INSERT INTO history (action, module, details) VALUES (?, ?, ?)",
+        ('create', 'notes', f'Created note {i}')
+    )
+    return note_id
+
+
+def workload(db, operations, grouped=False):
+    """Simula ações dos gerenciadores: criação com histórico e consulta"""
+    for i in range(operations):
+        if grouped:
+            with db.transaction():
+                note_id = create_note(db, i)
+        else:
+            note_id = create_note(db, i)
+        db.execute_query("SELECT title FROM notes WHERE id = ?", (note_id,), fetchone=True)
+
+
+def run(label, db, operations, grouped=False):
+    start = time.perf_counter()
+    workload(db, operations, grouped)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {operations} ações em {elapsed:.3f}s -> {operations / elapsed:,.0f} ações/s")
+    return elapsed
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pooled_path = os.path.join(tmp, "pooled.db")
+        pooled = DatabaseManager(pooled_path)
+
+        # O banco legado usa o mesmo esquema, mas em modo de journal padrão
+        legacy_path = os.path.join(tmp, "legacy.db")
+        DatabaseManager(legacy_path).close()
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("PRAGMA journal_mode = DELETE")
+        legacy = LegacyDatabase(legacy_path)
+
+        legacy_time = run("antes", legacy, operations)
+        pooled_time = run("depois", pooled, operations)
+        grouped_time = run("transação", pooled, operations, grouped=True)
+        pooled.close()
+
+        print(f"ganho (pool): {legacy_time / pooled_time:.1f}x")
+        print(f"ganho (pool + transação): {legacy_time / grouped_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark da verificação (SHA-256) e da deduplicação dos downloads.
+
+Baixa um arquivo de um servidor HTTP local com download_generic, que
+calcula o SHA-256 enquanto grava, e compara com o custo de verificar o
+arquivo numa segunda leitura depois do download. Em seguida pede a mesma
+URL de novo em outra pasta, atendida pelo índice de conteúdo (hardlink ou
+cópia) sem nova transferência.
+
+Uso: python benchmarks/bench_download_integrity.py [MB]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    data = b""
+    requests = 0
+
+    def do_GET(self):
+        FileHandler.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(self.data)))
+        self.end_headers()
+        self.wfile.write(self.data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def download(manager, db, url, save_path, expected_sha256=None):
+    os.makedirs(save_path)
+    # Fora da fila ('paused'), para o DownloadScheduler não executá-lo
+    download_id = db.execute_query(
+        "INSERT INTO downloads (url, type, save_path, status, expected_sha256) VALUES (?, 'file', ?, 'paused', ?)",
+        (url, save_path, expected_sha256)
+    )
+    requests_before = FileHandler.requests
+    start = time.perf_counter()
+    manager.progress.start(download_id)
+    manager.download_generic(url, save_path, download_id)
+    manager.progress.finish(download_id)
+    # Um download concluído entra na busca por URL (find_content)
+    db.execute_query("UPDATE downloads SET status = 'completed' WHERE id = ?", (download_id,))
+    elapsed = time.perf_counter() - start
+    file_path, sha256 = db.execute_query(
+        "SELECT file_path, sha256 FROM downloads WHERE id = ?", (download_id,), fetchone=True
+    )
+    return elapsed, file_path, sha256, FileHandler.requests - requests_before
+
+
+def main():
+    FileHandler.data = os.urandom((int(sys.argv[1]) if len(sys.argv) > 1 else 128) * 1024 * 1024)
+    expected = hashlib.sha256(FileHandler.data).hexdigest()
+    size_mb = len(FileHandler.data) / 1024 / 1024
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    print(f"arquivo de {size_mb:.0f} MB em servidor local")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "downloads.db"))
+        manager = BenchDownloadManager(db, 1)
+
+        elapsed, file_path, sha256, fetched = download(manager, db, url, os.path.join(tmp, "a"), expected)
+        print(f"download + SHA-256 em fluxo   {elapsed:7.2f}s  {size_mb / elapsed:8.1f} MB/s  "
+              f"checksum {'ok' if sha256 == expected else 'DIFERENTE'}")
+
+        start = time.perf_counter()
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(block)
+        reread = time.perf_counter() - start
+        print(f"segunda leitura para o hash   {reread:7.2f}s  (evitada; com o arquivo ainda em cache)")
+
+        elapsed, copy_path, sha256, fetched = download(manager, db, url, os.path.join(tmp, "b"))
+        linked = os.stat(copy_path).st_ino == os.stat(file_path).st_ino
+        print(f"mesma URL de novo             {elapsed:7.2f}s  {fetched} requisições  "
+              f"{'hardlink' if linked else 'cópia'}  checksum {'ok' if sha256 == expected else 'DIFERENTE'}")
+
+        manager.shutdown()
+        db.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Benchmark do acompanhamento de progresso dos downloads.
+
+Baixa o mesmo arquivo de um servidor HTTP local com a implementação antiga
+de download_generic (blocos de 8 KB, os.path.getsize e UPDATE com commit a
+cada bloco) e com a atual (contagem em memória no DownloadProgress e
+checkpoints no banco), medindo a vazão e o número de escritas no banco.
+
+Uso: python benchmarks/bench_download_progress.py [MB]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    size = 64 * 1024 * 1024
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(self.size))
+        self.end_headers()
+
+        block = b"x" * (1024 * 1024)
+        for start in range(0, self.size, len(block)):
+            self.wfile.write(block[:min(len(block), self.size - start)])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CountingDatabase(DatabaseManager):
+    """DatabaseManager que conta os UPDATEs executados (fora de transações, um commit cada)"""
+    def __init__(self, *args, **kwargs):
+        self.writes = 0
+        super().__init__(*args, **kwargs)
+    def execute_query(self, query, params=None, fetchone=False, fetchall=False):
+        if query.lstrip().upper().startswith("UPDATE"):
+            self.writes += 1
+        return super().execute_query(query, params, fetchone, fetchall)
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def legacy_download_generic(db, url, save_path, download_id):
+    """download_generic original: getsize e UPDATE a cada bloco de 8 KB"""
+    import requests
+    from urllib.parse import urlparse
+
+    local_filename = os.path.join(save_path, os.path.basename(urlparse(url).path))
+
+    with requests.get(url, stream=True) as r:
+        r.raise_for_status()
+        total_size = int(r.headers.get('content-length', 0))
+
+        db.execute_query(
+            "UPDATE downloads SET total_size = ? WHERE id = ?",
+            (total_size, download_id))
+
+        with open(local_filename, 'wb') as f:
+            for chunk in r.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
+                    current_size = os.path.getsize(local_filename)
+                    progress = (current_size / total_size) * 100 if total_size > 0 else 0
+
+                    db.execute_query(
+                        "UPDATE downloads SET progress = ? WHERE id = ?",
+                        (progress, download_id))
+
+
+def run(mode, url, tmp):
+    db = CountingDatabase(os.path.join(tmp, f"{mode}.db"))
+    save_path = os.path.join(tmp, mode)
+    os.makedirs(save_path)
+    # Fora da fila ('paused'), para o DownloadScheduler não executá-lo
+    download_id = db.execute_query(
+        "INSERT INTO downloads (url, type, save_path, status) VALUES (?, 'file', ?, 'paused')",
+        (url, save_path)
+    )
+    db.writes = 0
+
+    start = time.perf_counter()
+    if mode == "antigo":
+        legacy_download_generic(db, url, save_path, download_id)
+    else:
+        manager = BenchDownloadManager(db, 1)
+        manager.progress.start(download_id)
+        manager.download_generic(url, save_path, download_id)
+        manager.progress.finish(download_id)
+        manager.shutdown()
+    elapsed = time.perf_counter() - start
+
+    size_mb = os.path.getsize(os.path.join(save_path, "file.bin")) / 1024 / 1024
+    print(f"{mode:<7} {elapsed:7.2f}s  {size_mb / elapsed:8.1f} MB/s  {db.writes:8,} escritas no banco")
+    db.close()
+
+
+def main():
+    FileHandler.size = (int(sys.argv[1]) if len(sys.argv) > 1 else 64) * 1024 * 1024
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    print(f"arquivo de {FileHandler.size // 1024 // 1024} MB em servidor local")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("antigo", "atual"):
+            run(mode, url, tmp)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
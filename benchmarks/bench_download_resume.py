@@ -0,0 +1,171 @@
+"""Verificação da pausa e retomada de downloads (Range/If-Range).
+
+Sobe um servidor HTTP local com suporte a Range e, para cada cenário,
+pausa um download no meio da transferência, confere que o .part parou de
+crescer, retoma e compara o arquivo final byte a byte com o do servidor,
+mostrando os cabeçalhos da requisição de retomada e quantos bytes foram
+baixados de novo. Cenários: retomada normal (206), servidor que ignora o
+Range (200), arquivo alterado (ETag diferente) e .part maior que o arquivo
+do servidor (416). Termina com código 1 se algum cenário falhar.
+
+Uso: python benchmarks/bench_download_resume.py [MB]
+"""
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+BANDWIDTH = 8 * 1024 * 1024  # bytes/s por conexão, para a pausa cair no meio da transferência
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    data = b""
+    etag = '"v1"'
+    support_range = True
+    requests = []
+    sent = 0
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # Conexão fechada pela pausa
+            pass
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        RangeHandler.requests.append((range_header, self.headers.get("If-Range")))
+        data = self.data
+        start = 0
+        match = re.match(r"bytes=(\d+)-$", range_header or "")
+        if match and self.support_range and self.headers.get("If-Range") in (None, self.etag):
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+
+        for position in range(start, len(data), 65536):
+            chunk = data[position:position + 65536]
+            self.wfile.write(chunk)
+            RangeHandler.sent += len(chunk)
+            time.sleep(len(chunk) / BANDWIDTH)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def wait_status(db, download_id, statuses, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = db.execute_query("SELECT status FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0]
+        if status in statuses:
+            return status
+        time.sleep(0.01)
+    return None
+
+
+def run(name, manager, db, url, save_path, size, before_resume, resumed):
+    """Executa um cenário; retorna True se tudo conferir.
+
+    Com `resumed`, a retomada precisa ter pedido só os bytes que faltavam.
+    """
+    RangeHandler.data = os.urandom(size)
+    RangeHandler.etag = '"v1"'
+    RangeHandler.support_range = True
+
+    download_id = manager.add_download(url, 'file', 'auto', 'Máxima', save_path)
+    wait_status(db, download_id, ('downloading',))
+    time.sleep(size / BANDWIDTH / 3)
+    manager.pause_download(download_id)
+    paused = wait_status(db, download_id, ('paused',)) == 'paused'
+
+    part = db.execute_query("SELECT file_path FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0] + ".part"
+    time.sleep(0.1)
+    part_size = os.path.getsize(part) if os.path.exists(part) else 0
+    time.sleep(0.3)
+    stopped = part_size == (os.path.getsize(part) if os.path.exists(part) else 0)
+
+    before_resume()
+    RangeHandler.requests = []
+    RangeHandler.sent = 0
+    manager.resume_download(download_id)
+    completed = wait_status(db, download_id, ('completed', 'failed')) == 'completed'
+
+    file_path = db.execute_query("SELECT file_path FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0]
+    with open(file_path, "rb") as f:
+        identical = completed and f.read() == RangeHandler.data
+    range_header, if_range = RangeHandler.requests[0] if RangeHandler.requests else (None, None)
+    ok = (paused and 0 < part_size < size and stopped and identical
+          and range_header == f"bytes={part_size}-" and if_range == '"v1"'
+          and (not resumed or RangeHandler.sent == size - part_size))
+    print(f"{name:<22} {'ok' if ok else 'FALHOU':<7} .part {part_size / 1024 / 1024:5.2f} MB "
+          f"{'parado' if stopped else 'CRESCENDO'}  Range={range_header} If-Range={if_range}  "
+          f"{RangeHandler.sent / 1024 / 1024:5.2f} MB baixados na retomada")
+    return ok
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 3 * 1024 * 1024
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def ignore_range():
+        RangeHandler.support_range = False
+
+    def change_etag():
+        RangeHandler.data = os.urandom(size)
+        RangeHandler.etag = '"v2"'
+
+    def shrink_file():
+        # Mesmo ETag, mas o .part já passa do tamanho do arquivo: o servidor responde 416
+        RangeHandler.data = RangeHandler.data[:1024]
+
+    scenarios = (
+        ("retomada (206)", lambda: None, True),
+        ("Range ignorado (200)", ignore_range, False),
+        ("ETag alterado", change_etag, False),
+        (".part maior (416)", shrink_file, False),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "downloads.db"))
+        manager = BenchDownloadManager(db, 1)
+        print(f"arquivo de {size / 1024 / 1024:.1f} MB, {BANDWIDTH // 1024 // 1024} MB/s por conexão")
+        results = [run(name, manager, db, f"{base_url}/file{i}.bin", tmp, size, before_resume, resumed)
+                   for i, (name, before_resume, resumed) in enumerate(scenarios)]
+        manager.shutdown()
+        db.close()
+
+    server.shutdown()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
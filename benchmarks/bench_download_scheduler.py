@@ -0,0 +1,93 @@
+"""Benchmark do DownloadScheduler contra um servidor HTTP local.
+
+Sobe um servidor que atende cada arquivo com latência inicial e banda
+limitada por conexão (como um servidor remoto) e mede o tempo para baixar
+um lote de arquivos com 1, 3 e 6 downloads simultâneos
+(max_parallel_downloads).
+
+Uso: python benchmarks/bench_download_scheduler.py [arquivos] [KB por arquivo]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+LATENCY = 0.05              # segundos até o primeiro byte
+BANDWIDTH = 4 * 1024 * 1024  # bytes/s por conexão
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    size = 128 * 1024
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(self.size))
+        self.end_headers()
+
+        block = b"x" * 16384
+        for start in range(0, self.size, len(block)):
+            chunk = block[:min(len(block), self.size - start)]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / BANDWIDTH)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def run(base_url, files, parallel, tmp):
+    db = DatabaseManager(os.path.join(tmp, f"parallel_{parallel}.db"))
+    save_path = os.path.join(tmp, f"parallel_{parallel}")
+    os.makedirs(save_path)
+    manager = BenchDownloadManager(db, parallel)
+
+    start = time.perf_counter()
+    for i in range(files):
+        manager.add_download(f"{base_url}/file{i}.bin", 'file', 'auto', 'Máxima', save_path)
+    while db.execute_query(
+        "SELECT COUNT(*) FROM downloads WHERE status IN ('pending', 'downloading')", fetchone=True
+    )[0]:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    completed = db.execute_query("SELECT COUNT(*) FROM downloads WHERE status = 'completed'", fetchone=True)[0]
+    manager.shutdown()
+    db.close()
+    return elapsed, completed
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    ThrottledHandler.size = (int(sys.argv[2]) if len(sys.argv) > 2 else 128) * 1024
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    total_mb = files * ThrottledHandler.size / 1024 / 1024
+    print(f"{files} arquivos de {ThrottledHandler.size // 1024} KB, latência {LATENCY * 1000:.0f} ms, "
+          f"{BANDWIDTH // 1024 // 1024} MB/s por conexão")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for parallel in (1, 3, 6):
+            elapsed, completed = run(base_url, files, parallel, tmp)
+            print(f"paralelos={parallel}  {elapsed:7.2f}s  {total_mb / elapsed:7.2f} MB/s  "
+                  f"{completed}/{files} concluídos")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
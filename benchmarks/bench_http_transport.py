@@ -0,0 +1,110 @@
+"""Benchmark do HttpTransport (conexões reaproveitadas entre downloads).
+
+Sobe um servidor HTTP/1.1 local com keep-alive em que cada nova conexão
+custa um atraso (como o handshake TCP e TLS de um servidor remoto) e mede o
+tempo para baixar um lote de arquivos pequenos do mesmo servidor com
+requests.get avulso por arquivo (como antes) e com o HttpTransport
+compartilhado, contando as conexões abertas.
+
+Uso: python benchmarks/bench_http_transport.py [arquivos] [KB por arquivo]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager, HttpTransport
+
+HANDSHAKE = 0.03  # segundos para estabelecer cada conexão
+LATENCY = 0.005   # segundos até o primeiro byte de cada resposta
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas; com Nagle, o ACK atrasado do cliente segura o corpo
+    disable_nagle_algorithm = True
+    size = 16 * 1024
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with KeepAliveHandler.lock:
+            KeepAliveHandler.connections += 1
+        time.sleep(HANDSHAKE)
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(self.size))
+        self.end_headers()
+        self.wfile.write(b"x" * self.size)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OneShotTransport(HttpTransport):
+    """Comportamento anterior: requests.get avulso, uma conexão nova por arquivo"""
+    def get(self, url, **kwargs):
+        import requests
+
+        kwargs.setdefault('timeout', self.timeout)
+        return requests.get(url, **kwargs)
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def run(mode, base_url, files, parallel, tmp):
+    db = DatabaseManager(os.path.join(tmp, f"{mode}.db"))
+    save_path = os.path.join(tmp, mode)
+    os.makedirs(save_path)
+    transport = OneShotTransport() if mode == "avulso" else HttpTransport(pool_size=parallel)
+    manager = BenchDownloadManager(db, parallel, transport)
+    KeepAliveHandler.connections = 0
+
+    start = time.perf_counter()
+    for i in range(files):
+        manager.add_download(f"{base_url}/file{i}.bin", 'file', 'auto', 'Máxima', save_path)
+    while db.execute_query(
+        "SELECT COUNT(*) FROM downloads WHERE status IN ('pending', 'downloading')", fetchone=True
+    )[0]:
+        time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    completed = db.execute_query("SELECT COUNT(*) FROM downloads WHERE status = 'completed'", fetchone=True)[0]
+    manager.shutdown()
+    db.close()
+    print(f"{mode:<12} {elapsed:7.2f}s  {files / elapsed:7.1f} arquivos/s  "
+          f"{KeepAliveHandler.connections:5} conexões  {completed}/{files} concluídos")
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    KeepAliveHandler.size = (int(sys.argv[2]) if len(sys.argv) > 2 else 16) * 1024
+    parallel = 3
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"{files} arquivos de {KeepAliveHandler.size // 1024} KB, {parallel} downloads simultâneos, "
+          f"{HANDSHAKE * 1000:.0f} ms por conexão nova")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ("avulso", "compartilhado"):
+            run(mode, base_url, files, parallel, tmp)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
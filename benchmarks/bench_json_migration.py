@@ -0,0 +1,82 @@
+"""Benchmark da migração dos dados do app.py para o SQLite.
+
+Gera um notes.json grande e mede, em processos separados, o tempo e o pico
+de memória (RSS) para migrá-lo com a abordagem ingênua (json.load do arquivo
+inteiro e NotesManager.create_note por registro, um commit cada) e com o
+JsonMigrator (leitura em fluxo e transações em lote).
+
+Uso: python benchmarks/bench_json_migration.py [anotações]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_notes(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(count):
+            note = {"id": i + 1, "title": f"Anotação {i}", "date": "2024-01-01",
+                    "tags": ["trabalho", f"t{i % 50}"], "content": "texto da anotação " * 40}
+            f.write(json.dumps(note, ensure_ascii=False) + (",\n" if i < count - 1 else "\n"))
+        f.write("]\n")
+
+
+def migrate(mode, db_path, data_dir):
+    from System_Wizard import DatabaseManager, JsonMigrator, NotesManager
+
+    db = DatabaseManager(db_path)
+    start = time.perf_counter()
+    if mode == "naive":
+        with open(os.path.join(data_dir, "notes.json"), encoding="utf-8") as f:
+            notes = json.load(f)
+        manager = NotesManager(db)
+        for note in notes:
+            manager.create_note(note["title"], note["content"], ", ".join(note["tags"]))
+        count = len(notes)
+    else:
+        stats = JsonMigrator(db, data_dir).migrate()
+        count = sum(stats["migrated"].values())
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    print(f"{mode:<7} {elapsed:8.3f}s   {count / elapsed:12,.0f} registros/s   pico RSS {peak_rss_mb():8.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        migrate(sys.argv[2], sys.argv[3], sys.argv[4])
+        return
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "data")
+        os.makedirs(data_dir)
+        write_notes(os.path.join(data_dir, "notes.json"), count)
+        size = os.path.getsize(os.path.join(data_dir, "notes.json"))
+        print(f"notes.json com {count} anotações ({size / 1024 / 1024:.1f} MB)")
+
+        for mode in ("naive", "stream"):
+            db_path = os.path.join(tmp, f"{mode}.db")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, db_path, data_dir],
+                           check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark de gravação das coleções do app.py: reescrita completa contra log de operações.
+
+Mede o custo de salvar uma anotação em uma coleção grande com o save_data
+antigo (json.dump de toda a lista com indent=4) e com o JsonStore (uma linha
+acrescentada ao log, com fsync), além de contar e excluir registros em uma
+lista contra a Collection (contador do JsonStore e dict por id).
+
+Uso: python benchmarks/bench_json_store.py [anotações] [gravações]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    notes_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    from app import Collection, JsonStore
+
+    notes = [{"title": f"Anotação {i}", "date": "2024-01-01", "tags": ["trabalho"], "content": "texto " * 80}
+             for i in range(notes_count)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notes.json")
+
+        start = time.perf_counter()
+        for i in range(saves):
+            notes[i]["content"] += "!"
+            with open(path, "w") as f:
+                json.dump(notes, f, indent=4)
+        legacy = (time.perf_counter() - start) / saves
+        legacy_bytes = os.path.getsize(path)
+
+        store = JsonStore({"notes": path}, compact_ops=10 ** 9)
+        records = store.load("notes")
+        start = time.perf_counter()
+        for i in range(saves):
+            records[i]["content"] += "!"
+            store.put("notes", records[i])
+            store.flush("notes")
+        appended = (time.perf_counter() - start) / saves
+        log_bytes = os.path.getsize(store.log_path("notes")) / saves
+
+        print(f"{notes_count} anotações, {saves} gravações")
+        print(f"reescrita  {legacy * 1000:9.2f} ms/gravação   {legacy_bytes / 1024:10.1f} KB gravados")
+        print(f"log        {appended * 1000:9.2f} ms/gravação   {log_bytes / 1024:10.1f} KB gravados")
+
+        store.compact("notes")
+        start = time.perf_counter()
+        with open(path) as f:
+            listed = len(json.load(f))
+        legacy_count = time.perf_counter() - start
+        start = time.perf_counter()
+        counted = len(Collection(JsonStore({"notes": path}), "notes"))
+        fast_count = time.perf_counter() - start
+        assert listed == counted
+
+        # Exclusões do fim da coleção (pior caso da busca linear)
+        targets = [records[-1 - i]["id"] for i in range(saves)]
+        records = list(records)
+        start = time.perf_counter()
+        for record_id in targets:
+            for index, record in enumerate(records):
+                if record["id"] == record_id:
+                    del records[index]
+                    break
+        scan = (time.perf_counter() - start) / saves
+
+        collection = Collection(JsonStore({"notes": path}), "notes")
+        collection.get(1)
+        start = time.perf_counter()
+        for record_id in targets:
+            collection.remove(record_id)
+        indexed = (time.perf_counter() - start) / saves
+
+        print(f"contagem   lista {legacy_count * 1000:9.2f} ms   coleção {fast_count * 1000:9.2f} ms")
+        print(f"exclusão   lista {scan * 1000:9.3f} ms   coleção {indexed * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark da busca global: índice FTS5 contra varreduras LIKE.
+
+Popula um banco temporário com anotações, comandos e utilitários e mede
+o tempo médio de uma busca usando as consultas LIKE dos gerenciadores
+(get_notes, get_commands, get_utilities) e usando o SearchManager.
+
+Uso: python benchmarks/bench_search.py [anotacoes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import (DatabaseManager, NotesManager, CommandsManager,
+                           UtilitiesManager, SearchManager)
+
+random.seed(42)
+# Vocabulário com termos comuns e um grande número de termos raros
+WORDS = ("projeto reunião orçamento cliente entrega relatório servidor backup "
+         "planilha financeiro contrato fatura python deploy banco índice").split()
+WORDS += ["".join(random.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(7)) for _ in range(20000)]
+QUERIES = ["orçamento", "servidor deploy", WORDS[100], WORDS[5000] + " " + WORDS[7000], "inexistente"]
+
+
+def random_text(words):
+    # Termos comuns aparecem com frequência bem menor que os raros somados
+    return " ".join(random.choice(WORDS[:16]) if random.random() < 0.02 else random.choice(WORDS)
+                    for _ in range(words))
+
+
+def populate(db, notes):
+    with db.transaction():
+        db.execute_many(
+            "INSERT INTO notes (title, content, tags) VALUES (?, ?, ?)",
+            ((random_text(4), random_text(200), random_text(2)) for _ in range(notes))
+        )
+        db.execute_many(
+            "INSERT INTO custom_commands (name, command, category, tags) VALUES (?, ?, ?, ?)",
+            ((random_text(3), random_text(6), random_text(1), random_text(2)) for _ in range(notes // 10))
+        )
+        db.execute_many(
+            "INSERT INTO utilities (name, type, path) VALUES (?, ?, ?)",
+            ((random_text(3), 'site', random_text(2)) for _ in range(notes // 10))
+        )
+
+
+def like_search(notes_manager, commands_manager, utilities_manager, query):
+    return (notes_manager.get_notes(query)
+            + commands_manager.get_commands(query)
+            + utilities_manager.get_utilities(search_query=query))
+
+
+def measure(label, func, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            func(query)
+    elapsed = (time.perf_counter() - start) / (repeat * len(QUERIES))
+    print(f"{label:<6} {elapsed * 1000:8.2f} ms por busca")
+    return elapsed
+
+
+def main():
+    notes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, "search.db"))
+        populate(db, notes)
+        print(f"{notes} anotações indexadas")
+
+        notes_manager = NotesManager(db)
+        commands_manager = CommandsManager(db)
+        utilities_manager = UtilitiesManager(db)
+        search_manager = SearchManager(db)
+
+        like_time = measure("LIKE", lambda q: like_search(notes_manager, commands_manager, utilities_manager, q))
+        fts_time = measure("FTS5", lambda q: search_manager.search(q))
+        db.close()
+
+        print(f"ganho: {like_time / fts_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark dos downloads segmentados (SegmentedDownload).
+
+Sobe um servidor HTTP local com suporte a Range que atende cada conexão com
+latência inicial e banda limitada (como um servidor remoto que limita cada
+conexão) e mede o tempo para baixar o mesmo arquivo em uma conexão e em
+várias (DownloadManager.SEGMENTS), conferindo o conteúdo byte a byte.
+
+Uso: python benchmarks/bench_segmented_download.py [MB]
+"""
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+LATENCY = 0.05              # segundos até o primeiro byte
+BANDWIDTH = 4 * 1024 * 1024  # bytes/s por conexão
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    data = b""
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        start, end = 0, len(self.data)
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and self.headers.get("If-Range") in (None, '"bench"'):
+            start = int(match.group(1))
+            end = int(match.group(2)) + 1 if match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(self.data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"bench"')
+        self.end_headers()
+
+        try:
+            for position in range(start, end, 16384):
+                chunk = self.data[position:min(position + 16384, end)]
+                self.wfile.write(chunk)
+                time.sleep(len(chunk) / BANDWIDTH)
+        except (BrokenPipeError, ConnectionResetError):
+            # Conexão fechada pelo cliente (trecho encurtado)
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BenchDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+def run(url, segments, tmp):
+    db = DatabaseManager(os.path.join(tmp, f"segments_{segments}.db"))
+    save_path = os.path.join(tmp, f"segments_{segments}")
+    os.makedirs(save_path)
+    # Fora da fila ('paused'), para o DownloadScheduler não executá-lo
+    download_id = db.execute_query(
+        "INSERT INTO downloads (url, type, save_path, status) VALUES (?, 'file', ?, 'paused')",
+        (url, save_path)
+    )
+    manager = BenchDownloadManager(db, 1)
+    manager.SEGMENTS = segments
+
+    start = time.perf_counter()
+    manager.progress.start(download_id)
+    manager.download_generic(url, save_path, download_id)
+    manager.progress.finish(download_id)
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(save_path, "file.bin"), "rb") as f:
+        ok = hashlib.sha256(f.read()).digest() == hashlib.sha256(RangeHandler.data).digest()
+    manager.shutdown()
+    db.close()
+    return elapsed, ok
+
+
+def main():
+    RangeHandler.data = os.urandom((int(sys.argv[1]) if len(sys.argv) > 1 else 32) * 1024 * 1024)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/file.bin"
+    size_mb = len(RangeHandler.data) / 1024 / 1024
+    print(f"arquivo de {size_mb:.0f} MB, latência {LATENCY * 1000:.0f} ms, "
+          f"{BANDWIDTH // 1024 // 1024} MB/s por conexão")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for segments in (1, 4, 8):
+            elapsed, ok = run(url, segments, tmp)
+            print(f"conexões={segments}  {elapsed:7.2f}s  {size_mb / elapsed:7.2f} MB/s  "
+                  f"conteúdo {'ok' if ok else 'DIFERENTE'}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
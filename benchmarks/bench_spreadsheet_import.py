@@ -0,0 +1,98 @@
+"""Benchmark de importação de CSV: pandas + JSON único contra o importador em fluxo.
+
+Gera um CSV grande e mede, em processos separados, o tempo e o pico de
+memória (RSS) para importá-lo com a abordagem ingênua (pandas.read_csv,
+conversão para lista e um único JSON gravado em spreadsheets.data) e com
+SpreadsheetManager.import_file, que lê e grava o arquivo em blocos.
+
+Uso: python benchmarks/bench_spreadsheet_import.py [linhas] [colunas]
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def write_csv(path, rows, columns):
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(f"col{c}" for c in range(columns)) + "\n")
+        for r in range(rows):
+            values = []
+            for c in range(columns):
+                kind = c % 3
+                if kind == 0:
+                    values.append(str(r * columns + c))
+                elif kind == 1:
+                    values.append(f"{rng.random() * 1000:.2f}")
+                else:
+                    values.append(f"item-{rng.randrange(100000)}")
+            f.write(",".join(values) + "\n")
+
+
+def import_csv(mode, db_path, csv_path):
+    from System_Wizard import DatabaseManager, SpreadsheetManager
+
+    db = DatabaseManager(db_path)
+    manager = SpreadsheetManager(db)
+
+    start = time.perf_counter()
+    if mode == "pandas":
+        try:
+            import pandas
+        except ImportError:
+            print("pandas  não instalado, ignorado")
+            return
+        frame = pandas.read_csv(csv_path)
+        data = json.dumps(frame.values.tolist())
+        with db.transaction():
+            db.execute_query(
+                "INSERT INTO spreadsheets (name, headers, data) VALUES (?, ?, ?)",
+                ("bench", "\n".join(frame.columns), data)
+            )
+        rows = len(frame)
+    else:
+        sheet_id = manager.import_file(csv_path, name="bench")
+        rows = manager.get_row_count(sheet_id)
+    elapsed = time.perf_counter() - start
+    db.close()
+
+    print(f"{mode:<7} {elapsed:8.3f}s   {rows / elapsed:12,.0f} linhas/s   pico RSS {peak_rss_mb():8.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        import_csv(sys.argv[2], sys.argv[3], sys.argv[4])
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "dados.csv")
+        write_csv(csv_path, rows, columns)
+        print(f"CSV com {rows} linhas x {columns} colunas ({os.path.getsize(csv_path) / 1024 / 1024:.1f} MB)")
+
+        for mode in ("pandas", "stream"):
+            db_path = os.path.join(tmp, f"{mode}.db")
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, db_path, csv_path],
+                           check=True)
+
+
+if __name__ == "__main__":
+    main()
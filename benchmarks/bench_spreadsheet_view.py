@@ -0,0 +1,85 @@
+"""Benchmark de abertura de planilhas: QTableWidget contra o modelo virtualizado.
+
+Cria uma planilha grande em um banco temporário e mede, em processos
+separados, o tempo para exibi-la e o pico de memória (RSS) usando o
+preenchimento antigo (um QTableWidgetItem por célula) e o
+SpreadsheetTableModel em um QTableView.
+
+Uso: python benchmarks/bench_spreadsheet_view.py [linhas] [colunas]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def open_sheet(mode, db_path, sheet_id):
+    from PyQt6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView
+    from System_Wizard import DatabaseManager, SpreadsheetManager, SpreadsheetTableModel
+
+    app = QApplication(sys.argv)
+    manager = SpreadsheetManager(DatabaseManager(db_path))
+
+    start = time.perf_counter()
+    if mode == "widget":
+        # Mesmo procedimento do open_spreadsheet original
+        headers = manager.get_headers(sheet_id)
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setRowCount(manager.get_row_count(sheet_id))
+        for row_idx, row_data in enumerate(manager.iter_rows(sheet_id)):
+            for col_idx, cell_data in enumerate(row_data):
+                table.setItem(row_idx, col_idx, QTableWidgetItem(str(cell_data)))
+    else:
+        table = QTableView()
+        table.setModel(SpreadsheetTableModel(manager, sheet_id))
+    table.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+
+    print(f"{mode:<7} abertura {elapsed:8.3f}s   pico RSS {peak_rss_mb():8.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        open_sheet(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    from System_Wizard import DatabaseManager, SpreadsheetManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sheets.db")
+        db = DatabaseManager(db_path)
+        manager = SpreadsheetManager(db)
+        sheet_id = manager.create_spreadsheet("bench", [f"Coluna {c}" for c in range(columns)])
+        batch = [[f"{r}-{c}" for c in range(columns)] for r in range(manager.CHUNK_ROWS)]
+        for _ in range(0, rows, manager.CHUNK_ROWS):
+            manager.append_rows(sheet_id, batch)
+        db.close()
+        print(f"planilha com {rows} linhas x {columns} colunas")
+
+        for mode in ("widget", "model"):
+            subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, db_path, str(sheet_id)],
+                           check=True)
+
+
+if __name__ == "__main__":
+    main()
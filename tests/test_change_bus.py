@@ -0,0 +1,72 @@
+"""Eventos de alteração (ChangeBus/DatabaseManager.publish_change)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import ChangeEvent, DatabaseManager, NotesManager
+
+
+class ChangeBusTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.events = []
+        self.db.changes.subscribe(self.events.append)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_events_are_published_after_commit(self):
+        seen_in_block = []
+        with self.db.transaction():
+            note_id = self.db.execute_query("INSERT INTO notes (title) VALUES ('a')")
+            self.db.publish_change('notes', note_id, 'insert')
+            seen_in_block.extend(self.events)
+
+        self.assertEqual(seen_in_block, [])
+        self.assertEqual(self.events, [ChangeEvent('notes', note_id, 'insert')])
+
+    def test_subscriber_sees_the_committed_row(self):
+        titles = []
+        self.db.changes.subscribe(lambda event: titles.append(self.db.execute_query(
+            "SELECT title FROM notes WHERE id = ?", (event.item_id,), fetchone=True
+        )))
+        NotesManager(self.db).create_note("a", "texto")
+        self.assertEqual(titles, [("a",)])
+
+    def test_rollback_discards_events(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.publish_change('notes', 1, 'insert')
+                raise RuntimeError("falha")
+        self.assertEqual(self.events, [])
+
+        # A próxima transação não herda os eventos descartados
+        with self.db.transaction():
+            self.db.publish_change('notes', 2, 'update')
+        self.assertEqual(self.events, [ChangeEvent('notes', 2, 'update')])
+
+    def test_nested_block_publishes_with_the_outer_commit(self):
+        with self.db.transaction():
+            with self.db.transaction():
+                self.db.publish_change('notes', 1, 'update')
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [ChangeEvent('notes', 1, 'update')])
+
+    def test_failing_subscriber_does_not_block_the_others(self):
+        def fail(event):
+            raise ValueError("assinante com erro")
+
+        self.db.changes.unsubscribe(self.events.append)
+        self.db.changes.subscribe(fail)
+        self.db.changes.subscribe(self.events.append)
+        self.db.publish_change('notes', None, 'delete')
+        self.assertEqual(self.events, [ChangeEvent('notes', None, 'delete')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Totais do dashboard mantidos por triggers (table_counts/DashboardStats)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import (CommandsManager, DashboardStats, DatabaseManager, NotesManager, ProjectManager,
+                           SpreadsheetManager, UtilitiesManager)
+
+
+class DashboardCountsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.stats = DashboardStats(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def assertCountsMatchTables(self):
+        counts = self.stats.counts()
+        for table in DatabaseManager.COUNTED_TABLES:
+            total = self.db.execute_query(f"SELECT COUNT(*) FROM {table}", fetchone=True)[0]
+            self.assertEqual(counts[table], total, table)
+        return counts
+
+    def test_new_database_starts_at_zero(self):
+        self.assertEqual(self.stats.counts(), dict.fromkeys(DatabaseManager.COUNTED_TABLES, 0))
+
+    def test_inserts_and_deletes_of_every_module(self):
+        notes = NotesManager(self.db)
+        note_ids = [notes.create_note(f"nota {i}", "", "") for i in range(3)]
+        notes.delete_note(note_ids[0])
+        projects = ProjectManager(self.db)
+        projects.create_project("p", "Python", os.path.join(self.tmp.name, "p"), "", "")
+        utilities = UtilitiesManager(self.db)
+        utilities.delete_utility(utilities.add_utility("editor", "app", path="/usr/bin/editor"))
+        CommandsManager(self.db).add_command("listar", "ls")
+        SpreadsheetManager(self.db).create_spreadsheet("A", ["x"], [["1"]])
+
+        counts = self.assertCountsMatchTables()
+        self.assertEqual(counts, {'projects': 1, 'spreadsheets': 1, 'notes': 2, 'utilities': 0,
+                                  'custom_commands': 1})
+
+    def test_bulk_and_rolled_back_writes(self):
+        self.db.execute_many("INSERT INTO notes (title) VALUES (?)", [(f"nota {i}",) for i in range(100)])
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.execute_query("INSERT INTO notes (title) VALUES ('desfeita')")
+                self.db.execute_query("DELETE FROM notes WHERE id <= 10")
+                raise RuntimeError("falha")
+        self.db.execute_query("DELETE FROM notes WHERE id > 90")
+
+        self.assertEqual(self.assertCountsMatchTables()['notes'], 90)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Migrações versionadas do banco (DatabaseManager.migrate)."""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, SearchManager, SpreadsheetManager
+
+# Esquema criado pelo init_db original, antes das migrações (user_version 0)
+BASELINE_SCHEMA = '''
+    CREATE TABLE downloads (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, type TEXT NOT NULL,
+        format TEXT, quality TEXT, save_path TEXT, status TEXT DEFAULT 'pending', progress REAL DEFAULT 0,
+        total_size INTEGER, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE spreadsheets (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, headers TEXT,
+        data TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE notes (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, content TEXT, tags TEXT,
+        is_favorite BOOLEAN DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE utilities (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, type TEXT NOT NULL,
+        path TEXT, command TEXT, is_favorite BOOLEAN DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE custom_commands (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, command TEXT NOT NULL,
+        category TEXT, tags TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE settings (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, value TEXT);
+    CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL UNIQUE, password TEXT NOT NULL,
+        is_admin BOOLEAN DEFAULT 0, theme TEXT DEFAULT 'dark', language TEXT DEFAULT 'pt',
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+        due_date TEXT, is_completed BOOLEAN DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+    CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, module TEXT NOT NULL,
+        details TEXT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP);
+    INSERT INTO users (username, password, is_admin) VALUES ('admin', 'admin123', 1);
+'''
+
+
+def create_table_x(self, cursor):
+    cursor.execute("CREATE TABLE x (id INTEGER PRIMARY KEY)")
+
+
+def create_table_y_and_fail(self, cursor):
+    cursor.execute("CREATE TABLE y (id INTEGER PRIMARY KEY)")
+    raise sqlite3.OperationalError("erro de teste")
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "baseline.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(BASELINE_SCHEMA)
+        conn.execute("INSERT INTO notes (title, content) VALUES ('Reunião', 'pauta da semana')")
+        conn.execute("INSERT INTO spreadsheets (name, headers, data) VALUES ('A', ?, ?)",
+                     ("nome\nqtd", json.dumps([["a", 1], ["b", 2]])))
+        conn.execute("INSERT INTO downloads (url, type, status) VALUES ('http://example.invalid/a', 'file', 'paused')")
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def user_version(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_baseline_database_is_migrated_to_the_latest_version(self):
+        db = DatabaseManager(self.path)
+        try:
+            self.assertEqual(self.user_version(), len(DatabaseManager.MIGRATIONS))
+
+            indexes = {row[0] for row in db.execute_query(
+                "SELECT name FROM sqlite_master WHERE type = 'index'", fetchall=True
+            )}
+            self.assertTrue({'idx_downloads_status', 'idx_notes_title', 'idx_downloads_queue'} <= indexes)
+
+            # Dados existentes: busca indexada, planilha em blocos, contadores e colunas novas
+            self.assertEqual([row[1] for row in SearchManager(db).search("reuniao")], [1])
+            spreadsheets = SpreadsheetManager(db)
+            self.assertEqual(spreadsheets.get_rows(1), [["a", 1], ["b", 2]])
+            self.assertIsNone(db.execute_query("SELECT data FROM spreadsheets WHERE id = 1", fetchone=True)[0])
+            counts = dict(db.execute_query("SELECT name, count FROM table_counts", fetchall=True))
+            self.assertEqual((counts['notes'], counts['spreadsheets'], counts['projects']), (1, 1, 0))
+            self.assertEqual(
+                db.execute_query("SELECT priority, downloaded_bytes FROM downloads WHERE id = 1", fetchone=True),
+                (0, 0)
+            )
+        finally:
+            db.close()
+
+    def test_only_new_migrations_run_on_an_up_to_date_database(self):
+        DatabaseManager(self.path).close()
+
+        class NewerDatabaseManager(DatabaseManager):
+            MIGRATIONS = DatabaseManager.MIGRATIONS + [("tabela x", create_table_x)]
+
+        db = NewerDatabaseManager(self.path)
+        try:
+            self.assertEqual(self.user_version(), len(DatabaseManager.MIGRATIONS) + 1)
+            self.assertEqual(db.execute_query("SELECT COUNT(*) FROM notes", fetchone=True)[0], 1)
+        finally:
+            db.close()
+
+    def test_failed_migration_is_rolled_back(self):
+        DatabaseManager(self.path).close()
+
+        class BrokenDatabaseManager(DatabaseManager):
+            MIGRATIONS = DatabaseManager.MIGRATIONS + [("tabela y", create_table_y_and_fail)]
+
+        with self.assertRaises(Exception) as raised:
+            BrokenDatabaseManager(self.path)
+        self.assertIn(f"migração {len(DatabaseManager.MIGRATIONS) + 1} (tabela y)", str(raised.exception))
+        self.assertEqual(self.user_version(), len(DatabaseManager.MIGRATIONS))
+
+        conn = sqlite3.connect(self.path)
+        try:
+            self.assertIsNone(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'y'").fetchone())
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Transações do DatabaseManager (db.transaction)."""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, NotesManager
+
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def count(self, table):
+        return self.db.execute_query(f"SELECT COUNT(*) FROM {table}", fetchone=True)[0]
+
+    def insert_note(self, title):
+        return self.db.execute_query("INSERT INTO notes (title, content) VALUES (?, '')", (title,))
+
+    def test_exception_rolls_back_every_write(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.insert_note("a")
+                self.db.log_history('create', 'notes', 'Created note a')
+                raise RuntimeError("falha")
+
+        self.assertEqual(self.count("notes"), 0)
+        self.db.flush_history()
+        self.assertEqual(self.count("history"), 0)
+
+    def test_nested_block_joins_the_outer_transaction(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.insert_note("externa")
+                with self.db.transaction():
+                    self.insert_note("interna")
+                raise RuntimeError("falha depois do bloco interno")
+
+        self.assertEqual(self.count("notes"), 0)
+
+    def test_writes_are_visible_only_after_commit(self):
+        other = sqlite3.connect(self.db.db_path)
+        try:
+            with self.db.transaction():
+                self.insert_note("a")
+                self.insert_note("b")
+                self.assertEqual(other.execute("SELECT COUNT(*) FROM notes").fetchone()[0], 0)
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM notes").fetchone()[0], 2)
+        finally:
+            other.close()
+
+    def test_failed_history_row_undoes_the_entity_write(self):
+        notes = NotesManager(self.db)
+
+        def fail(*args):
+            raise sqlite3.OperationalError("disco cheio")
+
+        self.db.log_history = fail
+        with self.assertRaises(sqlite3.OperationalError):
+            notes.create_note("a", "texto")
+        self.assertEqual(self.count("notes"), 0)
+
+    def test_connection_is_released_after_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                raise RuntimeError("falha")
+
+        # Fora do bloco as escritas voltam a fazer commit sozinhas
+        self.insert_note("a")
+        other = sqlite3.connect(self.db.db_path)
+        try:
+            self.assertEqual(other.execute("SELECT COUNT(*) FROM notes").fetchone()[0], 1)
+        finally:
+            other.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Índice de conteúdo dos downloads (DownloadManager.find_content/register_content)."""
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+
+class OfflineDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+class DownloadContentTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = OfflineDownloadManager(self.db, 1)
+        self.data = os.urandom(4096)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+        self.path = os.path.join(self.tmp.name, "file.bin")
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+        # Fora da fila ('paused'), para o DownloadScheduler não executá-lo
+        download_id = self.db.execute_query(
+            "INSERT INTO downloads (url, type, save_path, status) VALUES (?, 'file', ?, 'paused')",
+            ("http://example.invalid/file.bin", self.tmp.name)
+        )
+        self.manager.register_content(download_id, self.path, self.sha256)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def count_hashes(self):
+        calls = []
+        file_sha256 = self.manager.file_sha256
+        self.manager.file_sha256 = lambda path: calls.append(path) or file_sha256(path)
+        return calls
+
+    def touch(self):
+        # mtime explícito: a resolução do relógio do sistema de arquivos pode
+        # não distinguir uma escrita logo depois do registro
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_indexed_content_is_found(self):
+        self.assertEqual(self.manager.find_content(None, self.sha256), (self.sha256, self.path, len(self.data)))
+
+    def test_unchanged_file_is_not_hashed_again(self):
+        calls = self.count_hashes()
+        for _ in range(3):
+            self.assertIsNotNone(self.manager.find_content(None, self.sha256))
+        self.assertEqual(calls, [])
+
+    def test_touched_file_is_hashed_once(self):
+        self.touch()
+        calls = self.count_hashes()
+        for _ in range(3):
+            self.assertIsNotNone(self.manager.find_content(None, self.sha256))
+        self.assertEqual(calls, [self.path])
+
+    def test_file_modified_in_place_is_not_reused(self):
+        with open(self.path, "r+b") as f:
+            f.write(b"x" * 16)
+        self.touch()
+
+        self.assertIsNone(self.manager.find_content(None, self.sha256))
+        self.assertIsNone(self.db.execute_query(
+            "SELECT 1 FROM download_contents WHERE sha256 = ?", (self.sha256,), fetchone=True
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Progresso dos downloads em memória (DownloadProgress)."""
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadProgress
+
+
+class DownloadProgressTest(unittest.TestCase):
+    # Intervalo entre blocos (exato em ponto flutuante)
+    STEP = 1 / 16
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.download_id = self.db.execute_query(
+            "INSERT INTO downloads (url, type, save_path, status) VALUES (?, 'file', ?, 'downloading')",
+            ("http://example.invalid/file.bin", self.tmp.name)
+        )
+        self.progress = DownloadProgress(self.db, interval=0.25, checkpoint_interval=5.0)
+        self.notifications = []
+        self.progress.subscribe(lambda *args: self.notifications.append(args[:3]))
+
+        # Relógio controlado pelo teste
+        self.now = 1000.0
+        patcher = mock.patch("System_Wizard.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def stored(self, columns="downloaded_bytes, progress"):
+        return self.db.execute_query(f"SELECT {columns} FROM downloads WHERE id = ?", (self.download_id,),
+                                     fetchone=True)
+
+    def feed(self, blocks, chunk=1000):
+        """Simula `blocks` blocos recebidos, um a cada STEP segundos"""
+        done = self.progress.get(self.download_id)[0]
+        for _ in range(blocks):
+            self.now += self.STEP
+            done += chunk
+            self.progress.update(self.download_id, done, 10 ** 6)
+        return done
+
+    def test_subscribers_are_notified_at_most_once_per_interval(self):
+        self.progress.start(self.download_id)
+        self.feed(16)
+        # 16 blocos em 1 s: a primeira atualização e depois uma a cada 0,25 s
+        self.assertEqual([done for _, done, _ in self.notifications], [1000, 5000, 9000, 13000])
+
+    def test_database_is_written_only_at_checkpoints(self):
+        self.progress.start(self.download_id)
+        self.feed(79)
+        self.assertEqual(self.stored(), (0, 0))
+
+        # 5 s depois do início
+        done = self.feed(1)
+        self.assertEqual(self.stored(), (done, done / 10 ** 6 * 100))
+
+        self.feed(79)
+        self.assertEqual(self.stored()[0], done)
+        done = self.feed(1)
+        self.assertEqual(self.stored()[0], done)
+
+    def test_finish_writes_the_final_progress(self):
+        self.progress.start(self.download_id)
+        done = self.feed(16)
+        self.notifications.clear()
+        self.progress.finish(self.download_id)
+
+        self.assertEqual(self.stored(), (done, done / 10 ** 6 * 100))
+        self.assertEqual(self.notifications, [(self.download_id, done, 10 ** 6)])
+        self.assertIsNone(self.progress.get(self.download_id))
+        # Depois do finish, atualizações atrasadas são ignoradas
+        self.progress.update(self.download_id, 1, 10 ** 6)
+        self.assertEqual(self.stored()[0], done)
+
+    def test_checkpoint_columns_are_saved_with_the_progress(self):
+        self.progress.start(self.download_id)
+        self.progress.checkpoint_columns(self.download_id, lambda: {'segments': '[[10, 20]]'})
+        self.feed(80)
+        self.assertEqual(self.stored("segments"), ('[[10, 20]]',))
+
+        self.progress.checkpoint_columns(self.download_id, None)
+        self.db.execute_query("UPDATE downloads SET segments = NULL WHERE id = ?", (self.download_id,))
+        self.progress.finish(self.download_id)
+        self.assertEqual(self.stored("segments"), (None,))
+
+    def test_rate_uses_the_elapsed_time(self):
+        self.progress.start(self.download_id)
+        self.feed(32)
+        self.assertEqual(self.progress.get(self.download_id), (32000, 10 ** 6, 16000))
+
+
+if __name__ == "__main__":
+    unittest.main()
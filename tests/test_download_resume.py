@@ -0,0 +1,214 @@
+"""Retomada de downloads genéricos com Range/If-Range (DownloadManager.fetch_generic)."""
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Servidor local com suporte a Range; o estado fica no servidor (self.server)"""
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # Conexão fechada pela pausa
+            pass
+
+    def do_GET(self):
+        server = self.server
+        range_header = self.headers.get("Range")
+        server.requests.append((range_header, self.headers.get("If-Range")))
+        data = server.data
+        start = 0
+        match = re.match(r"bytes=(\d+)-$", range_header or "")
+        if match and server.support_range and self.headers.get("If-Range") in (None, server.etag):
+            start = max(0, int(match.group(1)) + server.range_shift)
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", server.etag)
+        self.end_headers()
+
+        for position in range(start, len(data), 16384):
+            chunk = data[position:position + 16384]
+            self.wfile.write(chunk)
+            server.sent += len(chunk)
+            if server.bandwidth:
+                time.sleep(len(chunk) / server.bandwidth)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OfflineDownloadManager(DownloadManager):
+    def check_dependencies(self):
+        # yt-dlp não é usado por downloads genéricos
+        pass
+
+
+class DownloadResumeTest(unittest.TestCase):
+    SIZE = 256 * 1024
+    PART = 100000
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.data = os.urandom(self.SIZE)
+        self.server.etag = '"v1"'
+        self.server.support_range = True
+        self.server.bandwidth = 0
+        # Deslocamento do trecho enviado em relação ao pedido (servidor com Range errado)
+        self.server.range_shift = 0
+        self.server.requests = []
+        self.server.sent = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/file.bin"
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = OfflineDownloadManager(self.db, 1)
+        # Uma conexão só: os cenários são os da retomada com Range: bytes=N-
+        self.manager.SEGMENTS = 1
+        self.file_path = os.path.join(self.tmp.name, "file.bin")
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def paused_download(self, part):
+        """Download pausado com `part` já gravado no .part e o ETag da primeira resposta"""
+        with open(self.file_path + ".part", "wb") as f:
+            f.write(part)
+        # Fora da fila ('paused'), para o DownloadScheduler não executá-lo
+        return self.db.execute_query(
+            '''INSERT INTO downloads (url, type, save_path, status, file_path, etag, downloaded_bytes)
+               VALUES (?, 'file', ?, 'paused', ?, '"v1"', ?)''',
+            (self.url, self.tmp.name, self.file_path, len(part))
+        )
+
+    def resume(self, download_id):
+        self.server.requests = []
+        self.server.sent = 0
+        self.manager.progress.start(download_id)
+        try:
+            self.manager.download_generic(self.url, self.tmp.name, download_id)
+        finally:
+            self.manager.progress.finish(download_id)
+
+    def assertDownloaded(self, download_id):
+        with open(self.file_path, "rb") as f:
+            self.assertEqual(f.read(), self.server.data)
+        self.assertFalse(os.path.exists(self.file_path + ".part"))
+        sha256 = self.db.execute_query("SELECT sha256 FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0]
+        self.assertEqual(sha256, hashlib.sha256(self.server.data).hexdigest())
+
+    def wait_status(self, download_id, status, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            current = self.db.execute_query(
+                "SELECT status FROM downloads WHERE id = ?", (download_id,), fetchone=True
+            )[0]
+            if current == status:
+                return current
+            time.sleep(0.01)
+        return None
+
+    def wait_for_worker(self, download_id, timeout=10):
+        """Espera a transferência interrompida soltar o download (o .part para de crescer)"""
+        deadline = time.monotonic() + timeout
+        while self.manager.is_interrupted(download_id) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_resume_requests_only_the_missing_bytes(self):
+        download_id = self.paused_download(self.server.data[:self.PART])
+        self.resume(download_id)
+
+        self.assertEqual(self.server.requests, [(f"bytes={self.PART}-", '"v1"')])
+        self.assertEqual(self.server.sent, self.SIZE - self.PART)
+        self.assertDownloaded(download_id)
+
+    def test_server_ignoring_range_restarts_from_zero(self):
+        download_id = self.paused_download(self.server.data[:self.PART])
+        self.server.support_range = False
+        self.resume(download_id)
+
+        self.assertEqual(self.server.requests, [(f"bytes={self.PART}-", '"v1"')])
+        self.assertEqual(self.server.sent, self.SIZE)
+        self.assertDownloaded(download_id)
+
+    def test_changed_etag_restarts_with_the_new_file(self):
+        download_id = self.paused_download(self.server.data[:self.PART])
+        self.server.data = os.urandom(self.SIZE)
+        self.server.etag = '"v2"'
+        self.resume(download_id)
+
+        self.assertEqual(self.server.sent, self.SIZE)
+        self.assertDownloaded(download_id)
+        etag = self.db.execute_query("SELECT etag FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0]
+        self.assertEqual(etag, '"v2"')
+
+    def test_part_larger_than_the_file_restarts_after_416(self):
+        download_id = self.paused_download(self.server.data[:self.PART])
+        # Mesmo ETag, mas o .part já passa do tamanho do arquivo
+        self.server.data = self.server.data[:1024]
+        self.resume(download_id)
+
+        self.assertEqual(self.server.requests, [(f"bytes={self.PART}-", '"v1"'), (None, None)])
+        self.assertDownloaded(download_id)
+
+    def test_206_from_another_offset_restarts_without_range(self):
+        download_id = self.paused_download(self.server.data[:self.PART])
+        self.server.range_shift = -50000
+        self.resume(download_id)
+
+        self.assertEqual(self.server.requests, [(f"bytes={self.PART}-", '"v1"'), (None, None)])
+        self.assertDownloaded(download_id)
+
+    def test_pause_stops_the_transfer_and_resume_continues_it(self):
+        self.server.bandwidth = 512 * 1024
+        download_id = self.manager.add_download(self.url, 'file', 'auto', 'Máxima', self.tmp.name)
+        part = self.file_path + ".part"
+        deadline = time.monotonic() + 10
+        while not (os.path.exists(part) and os.path.getsize(part)) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.manager.pause_download(download_id)
+        self.assertEqual(self.wait_status(download_id, 'paused'), 'paused')
+
+        self.wait_for_worker(download_id)
+        part_size = os.path.getsize(part)
+        time.sleep(0.2)
+        self.assertEqual(os.path.getsize(part), part_size)
+        self.assertTrue(0 < part_size < self.SIZE)
+
+        self.server.requests = []
+        self.server.bandwidth = 0
+        self.manager.resume_download(download_id)
+        self.assertEqual(self.wait_status(download_id, 'completed'), 'completed')
+        self.assertEqual(self.server.requests, [(f"bytes={part_size}-", '"v1"')])
+        self.assertDownloaded(download_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Fila de downloads (DownloadScheduler) com um run_download falso."""
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, DownloadManager, DownloadScheduler
+
+
+class FakeDownloadManager:
+    """Executa os downloads reservados só registrando a ordem e quantos rodam ao mesmo tempo"""
+
+    def __init__(self, db, duration=0.0):
+        self.db = db
+        self.duration = duration
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def run_download(self, download_id):
+        status = self.db.execute_query("SELECT status FROM downloads WHERE id = ?", (download_id,), fetchone=True)[0]
+        with self._lock:
+            self.started.append((download_id, status))
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.duration)
+        with self._lock:
+            self.running -= 1
+        self.db.execute_query(
+            "UPDATE downloads SET status = 'completed' WHERE id = ? AND status = 'downloading'", (download_id,)
+        )
+
+
+class BlockingDownloadManager(DownloadManager):
+    """DownloadManager cujas transferências só terminam quando interrompidas"""
+
+    def check_dependencies(self):
+        # yt-dlp não é usado
+        pass
+
+    def run_download(self, download_id):
+        interrupt = threading.Event()
+        with self._transfers_lock:
+            self._interrupts[download_id] = interrupt
+        self.running.release()
+        try:
+            interrupt.wait(10)
+        finally:
+            with self._transfers_lock:
+                self._interrupts.pop(download_id, None)
+
+
+class DownloadSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.scheduler = None
+
+    def tearDown(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler.join(5)
+        self.db.close()
+        self.tmp.cleanup()
+
+    def add(self, priority=0, status='pending'):
+        return self.db.execute_query(
+            "INSERT INTO downloads (url, type, save_path, status, priority) VALUES (?, 'file', ?, ?, ?)",
+            ("http://example.invalid/file.bin", self.tmp.name, status, priority)
+        )
+
+    def run_queue(self, manager, max_workers, count):
+        self.scheduler = DownloadScheduler(manager, max_workers)
+        self.scheduler.start()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            completed = self.db.execute_query(
+                "SELECT COUNT(*) FROM downloads WHERE status = 'completed'", fetchone=True
+            )[0]
+            if completed == count:
+                break
+            time.sleep(0.01)
+        self.scheduler.stop()
+        self.assertTrue(self.scheduler.join(5))
+
+    def test_each_download_is_claimed_once(self):
+        ids = [self.add() for _ in range(50)]
+        manager = FakeDownloadManager(self.db)
+        self.run_queue(manager, 4, len(ids))
+
+        self.assertEqual(sorted(download_id for download_id, _ in manager.started), ids)
+        self.assertTrue(all(status == 'downloading' for _, status in manager.started))
+
+    def test_higher_priority_first_then_oldest(self):
+        ids = [self.add(priority) for priority in (0, 5, 0, 5, 1)]
+        manager = FakeDownloadManager(self.db)
+        self.run_queue(manager, 1, len(ids))
+
+        self.assertEqual([download_id for download_id, _ in manager.started],
+                         [ids[1], ids[3], ids[4], ids[0], ids[2]])
+
+    def test_start_requeues_interrupted_downloads(self):
+        interrupted = self.add(status='downloading')
+        pending = self.add()
+        manager = FakeDownloadManager(self.db)
+        self.run_queue(manager, 1, 2)
+
+        self.assertEqual(manager.started, [(interrupted, 'downloading'), (pending, 'downloading')])
+
+    def test_concurrency_is_limited_to_max_workers(self):
+        ids = [self.add() for _ in range(12)]
+        manager = FakeDownloadManager(self.db, duration=0.05)
+        self.run_queue(manager, 3, len(ids))
+
+        self.assertEqual(len(manager.started), len(ids))
+        self.assertEqual(manager.max_running, 3)
+
+    def test_shutdown_interrupts_and_joins_the_workers(self):
+        manager = BlockingDownloadManager(self.db, 2)
+        manager.running = threading.Semaphore(0)
+        ids = [manager.add_download("http://example.invalid/file.bin", 'file', 'auto', 'Máxima', self.tmp.name)
+               for _ in range(3)]
+        for _ in range(2):
+            self.assertTrue(manager.running.acquire(timeout=5))
+
+        start = time.monotonic()
+        self.assertTrue(manager.shutdown(timeout=5))
+        self.assertLess(time.monotonic() - start, 5)
+        statuses = [manager.get_status(download_id) for download_id in ids]
+        self.assertEqual(sorted(statuses), ['pending', 'pending', 'pending'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""VACUUM incremental da retenção do histórico (HistoryRetentionManager.vacuum)."""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, HistoryRetentionManager
+
+
+class HistoryVacuumTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def auto_vacuum(self, db):
+        return db.execute_query("PRAGMA auto_vacuum", fetchone=True)[0]
+
+    def test_new_database_uses_incremental_vacuum(self):
+        db = DatabaseManager(self.path)
+        try:
+            self.assertEqual(self.auto_vacuum(db), 2)
+            HistoryRetentionManager(db).vacuum(100)
+        finally:
+            db.close()
+
+    def test_existing_database_is_not_converted(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE legado (x)")
+        conn.commit()
+        conn.close()
+
+        db = DatabaseManager(self.path)
+        try:
+            HistoryRetentionManager(db).vacuum(100)
+            self.assertEqual(self.auto_vacuum(db), 0)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
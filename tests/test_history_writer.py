@@ -0,0 +1,67 @@
+"""Gravação do histórico em segundo plano (HistoryWriter)."""
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, HistoryWriter
+
+
+class HistoryWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test.db")
+        self.db = DatabaseManager(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def history(self):
+        return self.db.execute_query("SELECT action, module, details FROM history ORDER BY id", fetchall=True)
+
+    def test_close_writes_pending_events(self):
+        # Prazo longo: sem o close, nada seria gravado durante o teste
+        writer = HistoryWriter(self.db, flush_interval=60)
+        for i in range(3):
+            writer.log('create', 'notes', f'Created note {i}')
+        writer.close()
+
+        self.assertEqual(self.history(), [('create', 'notes', f'Created note {i}') for i in range(3)])
+
+    def test_database_close_flushes_log_history(self):
+        for i in range(3):
+            self.db.log_history('delete', 'notes', f'Deleted note ID {i}')
+        self.db.close()
+
+        self.db = DatabaseManager(self.path)
+        self.assertEqual(len(self.history()), 3)
+
+    def test_full_batch_is_written_without_waiting_for_the_interval(self):
+        writer = HistoryWriter(self.db, batch_size=10, flush_interval=60)
+        try:
+            for i in range(25):
+                writer.log('add', 'downloads', f'Added download {i}')
+            deadline = time.monotonic() + 5
+            while len(self.history()) < 20 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(self.history()), 20)
+        finally:
+            writer.close()
+        self.assertEqual(len(self.history()), 25)
+
+    def test_flush_waits_for_the_write(self):
+        writer = HistoryWriter(self.db, flush_interval=60)
+        try:
+            writer.log('update', 'notes', 'Updated note ID 1')
+            writer.flush()
+            self.assertEqual(self.history(), [('update', 'notes', 'Updated note ID 1')])
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
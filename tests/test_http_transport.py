@@ -0,0 +1,97 @@
+"""Conexões HTTP reaproveitadas e repetição de falhas temporárias (HttpTransport)."""
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import HttpTransport
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Responde com os status de self.server.statuses (depois, 200) e anota a porta do cliente"""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.client_address[1])
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b"ok" if status == 200 else b"erro"
+        self.send_response(status)
+        if status != 200 and server.retry_after is not None:
+            self.send_header("Retry-After", str(server.retry_after))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        self.server.statuses = []
+        self.server.retry_after = None
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/file.bin"
+        self.transport = HttpTransport(retries=2, backoff=0, timeout=5)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_is_reused_between_requests(self):
+        for _ in range(3):
+            response = self.transport.get(self.url)
+            self.assertEqual(response.content, b"ok")
+
+        # Uma única conexão TCP (mesma porta do cliente) para os três pedidos
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(set(self.server.requests)), 1)
+
+    def test_each_host_gets_its_own_session(self):
+        other_url = f"http://localhost:{self.server.server_address[1]}/file.bin"
+        same_host_url = f"HTTP://127.0.0.1:{self.server.server_address[1]}/other.bin"
+        self.assertIs(self.transport.session(self.url), self.transport.session(same_host_url))
+        self.assertIsNot(self.transport.session(self.url), self.transport.session(other_url))
+
+    def test_temporary_failures_are_retried(self):
+        self.server.statuses = [503, 502]
+        response = self.transport.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_retry_after_is_respected(self):
+        self.server.statuses = [503]
+        self.server.retry_after = 1
+        started = time.monotonic()
+        response = self.transport.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 0.9)
+
+    def test_last_response_is_returned_when_retries_run_out(self):
+        self.server.statuses = [503] * 5
+        response = self.transport.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.server.statuses = [404]
+        response = self.transport.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(self.server.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
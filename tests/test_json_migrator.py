@@ -0,0 +1,65 @@
+"""Migração dos dados do app.py (JsonMigrator)."""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, JsonMigrator
+
+
+class JsonMigratorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp.name, "data")
+        os.makedirs(self.data_dir)
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def write_notes(self, notes):
+        with open(os.path.join(self.data_dir, "notes.json"), "w", encoding="utf-8") as f:
+            json.dump(notes, f)
+
+    def note_count(self):
+        return self.db.execute_query("SELECT COUNT(*) FROM notes", fetchone=True)[0]
+
+    def test_rerun_after_json_store_assigns_ids(self):
+        from app import JsonStore
+
+        # Arquivo do app.py original: registros sem id
+        self.write_notes([{"title": "a", "content": "1"}, {"title": "b", "content": "2"}])
+        JsonMigrator(self.db, self.data_dir).migrate()
+        self.assertEqual(self.note_count(), 2)
+
+        # O JsonStore atribui ids e regrava o arquivo na primeira carga
+        JsonStore({"notes": os.path.join(self.data_dir, "notes.json")}).load("notes")
+        stats = JsonMigrator(self.db, self.data_dir).migrate()
+        self.assertEqual(stats["skipped"], 2)
+        self.assertEqual(self.note_count(), 2)
+
+    def test_rerun_after_moving_data_folder(self):
+        self.write_notes([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+        JsonMigrator(self.db, self.data_dir).migrate()
+
+        moved = os.path.join(self.tmp.name, "moved")
+        shutil.move(self.data_dir, moved)
+        JsonMigrator(self.db, moved).migrate()
+        self.assertEqual(self.note_count(), 2)
+
+    def test_new_records_are_migrated_on_rerun(self):
+        self.write_notes([{"id": 1, "title": "a"}])
+        JsonMigrator(self.db, self.data_dir).migrate()
+        self.write_notes([{"id": 1, "title": "a"}, {"id": 2, "title": "b"}])
+        stats = JsonMigrator(self.db, self.data_dir).migrate()
+        self.assertEqual(stats["migrated"]["notes"], 1)
+        self.assertEqual(self.note_count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Persistência das coleções do app.py (JsonStore e Collection)."""
+import glob
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Collection, JsonStore
+
+
+class JsonStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "notes.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, store, title):
+        record = {"id": store.new_id("notes"), "title": title}
+        store.put("notes", record)
+        return record
+
+    def test_log_is_replayed_after_reload(self):
+        store = JsonStore({"notes": self.path})
+        store.load("notes")
+        self.add(store, "a")
+        store.flush()
+
+        reloaded = JsonStore({"notes": self.path}).load("notes")
+        self.assertEqual([note["title"] for note in reloaded], ["a"])
+
+    def test_corrupt_snapshot_keeps_logged_changes(self):
+        store = JsonStore({"notes": self.path})
+        store.load("notes")
+        self.add(store, "compactada")
+        store.flush()
+        store.compact("notes")
+        self.add(store, "no log")
+        store.flush()
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("[\n{corrompido")
+
+        store = JsonStore({"notes": self.path})
+        with self.assertRaises(Exception):
+            store.load("notes")
+        self.assertEqual([note["title"] for note in store.load("notes")], ["no log"])
+
+        backups = glob.glob(self.path + ".corrupt-*")
+        self.assertEqual(sorted(os.path.basename(p).endswith(".log") for p in backups), [False, True])
+
+    def test_count_uses_the_stored_counter_and_the_log(self):
+        store = JsonStore({"notes": self.path})
+        notes = Collection(store, "notes")
+        for title in ("a", "b", "c"):
+            notes.add({"title": title})
+        store.compact("notes")
+        notes.remove(notes.add({"title": "d"}))
+        notes.add({"title": "e"})
+        notes.remove(1)
+        store.flush()
+
+        # O contador basta: o snapshot não é lido
+        with open(store.count_path("notes"), encoding="utf-8") as f:
+            self.assertEqual(int(f.read().split()[0]), 3)
+        with open(self.path, "r+b") as f:
+            f.write(b"[\n{" + b"x" * (os.path.getsize(self.path) - 3))
+        self.assertEqual(JsonStore({"notes": self.path}).count("notes"), 3)
+
+    def test_count_without_counter_reads_the_snapshot(self):
+        store = JsonStore({"notes": self.path})
+        notes = Collection(store, "notes")
+        for title in ("a", "b"):
+            notes.add({"title": title})
+        store.compact("notes")
+        os.remove(store.count_path("notes"))
+
+        self.assertEqual(JsonStore({"notes": self.path}).count("notes"), 2)
+
+    def test_collection_recovers_logged_changes_after_corruption(self):
+        store = JsonStore({"notes": self.path})
+        notes = Collection(store, "notes")
+        notes.add({"title": "compactada"})
+        store.compact("notes")
+        notes.add({"title": "no log"})
+        store.flush()
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("[\n{corrompido")
+
+        errors = []
+        reloaded = Collection(JsonStore({"notes": self.path}), "notes", on_error=errors.append)
+        self.assertEqual([note["title"] for note in reloaded], ["no log"])
+        self.assertEqual(len(errors), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
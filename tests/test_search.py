@@ -0,0 +1,66 @@
+"""Busca global (SearchManager) com o índice FTS5 e a alternativa com LIKE."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import CommandsManager, DatabaseManager, NotesManager, SearchManager
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.notes = NotesManager(self.db)
+        self.search = SearchManager(self.db)
+        self.note_id = self.notes.create_note("Receita de café", "moer os grãos", "cozinha")
+        self.command_id = CommandsManager(self.db).add_command("Listar arquivos", "ls -la", "shell", "terminal")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def found(self, text):
+        return {(module, item_id) for module, item_id, *_ in self.search.search(text)}
+
+    def test_index_is_filled_on_insert(self):
+        self.assertTrue(self.db.fts_available)
+        # Prefixo por termo e sem acentos
+        self.assertEqual(self.found("cafe"), {("notes", self.note_id)})
+        self.assertEqual(self.found("grão"), {("notes", self.note_id)})
+        self.assertEqual(self.found("termin"), {("commands", self.command_id)})
+
+    def test_triggers_follow_updates_and_deletes(self):
+        self.notes.update_note(self.note_id, title="Receita de chá")
+        self.assertEqual(self.found("café"), set())
+        self.assertEqual(self.found("chá"), {("notes", self.note_id)})
+
+        self.notes.delete_note(self.note_id)
+        self.assertEqual(self.found("chá"), set())
+
+    def test_title_matches_rank_first(self):
+        other = self.notes.create_note("Compras", "comprar café", "")
+        results = self.search.search("café")
+        self.assertEqual([item_id for _, item_id, *_ in results], [self.note_id, other])
+
+    def test_fts_operators_are_searched_as_text(self):
+        for text in ('café"', "(café", "café*)", "-café", "receita: café"):
+            with self.subTest(text=text):
+                self.assertEqual(self.found(text), {("notes", self.note_id)})
+        # Os termos são combinados com AND: "OR" é só mais uma palavra
+        self.assertEqual(self.found('café" OR x'), set())
+        self.assertEqual(self.search.search('" * ()'), [])
+
+    def test_like_fallback_without_fts(self):
+        self.db.fts_available = False
+        self.assertEqual(self.found("café"), {("notes", self.note_id)})
+        self.assertEqual(self.found("ls -la"), {("commands", self.command_id)})
+
+        self.notes.update_note(self.note_id, title="Receita de chá")
+        self.assertEqual(self.found("café"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Importação de CSV em blocos (SpreadsheetManager.import_file)."""
+import csv
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, SpreadsheetManager
+
+
+class SpreadsheetImportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = SpreadsheetManager(self.db)
+        self.path = os.path.join(self.tmp.name, "codigos.csv")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def write_csv(self, rows):
+        with open(self.path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["codigo", "valor"])
+            writer.writerows(rows)
+
+    def test_leading_zeros_after_the_sample_are_kept(self):
+        rows = [[str(n + 1), "1.5"] for n in range(SpreadsheetManager.CHUNK_ROWS)]
+        rows += [["00123", "0.5"], ["42", "007.5"]]
+        self.write_csv(rows)
+
+        sheet = self.manager.import_file(self.path)
+        self.assertEqual(self.manager.get_column_types(sheet), ["int", "float"])
+        tail = self.manager.get_rows(sheet, SpreadsheetManager.CHUNK_ROWS)
+        self.assertEqual(tail, [["00123", 0.5], [42, "007.5"]])
+
+        self.db.flush_history()
+        details = self.db.execute_query(
+            "SELECT details FROM history WHERE action = 'import' ORDER BY id DESC LIMIT 1", fetchone=True
+        )[0]
+        self.assertIn("2 values kept as text", details)
+
+    def test_import_does_not_change_csv_field_limit(self):
+        self.write_csv([["1", "2"]])
+        limit = csv.field_size_limit()
+        csv.field_size_limit(1 << 20)
+        try:
+            self.manager.import_file(self.path)
+            self.assertEqual(csv.field_size_limit(), 1 << 20)
+        finally:
+            csv.field_size_limit(limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
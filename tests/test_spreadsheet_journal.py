@@ -0,0 +1,59 @@
+"""Diário de alterações das planilhas (desfazer/refazer)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, SpreadsheetManager
+
+
+class SpreadsheetJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = SpreadsheetManager(self.db)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_undo_restores_previous_value(self):
+        sheet = self.manager.create_spreadsheet("A", ["x"], [["0"]])
+        self.manager.patch_cells(sheet, [(0, 0, "1")])
+        self.manager.patch_cells(sheet, [(0, 0, "2")])
+
+        self.assertEqual(self.manager.undo(sheet), [(0, 0)])
+        self.assertEqual(self.manager.get_rows(sheet)[0][0], "1")
+        self.assertEqual(self.manager.redo(sheet), [(0, 0)])
+        self.assertEqual(self.manager.get_rows(sheet)[0][0], "2")
+
+    def test_edits_to_other_sheets_keep_undo_history(self):
+        sheet_a = self.manager.create_spreadsheet("A", ["x"], [["0"]])
+        sheet_b = self.manager.create_spreadsheet("B", ["x"], [["0"]])
+        for value in range(10):
+            self.manager.patch_cells(sheet_a, [(0, 0, f"a{value}")])
+        for value in range(SpreadsheetManager.JOURNAL_LIMIT):
+            self.manager.patch_cells(sheet_b, [(0, 0, f"b{value}")])
+        self.manager.patch_cells(sheet_a, [(0, 0, "a10")])
+
+        undone = 0
+        while self.manager.undo(sheet_a):
+            undone += 1
+        self.assertEqual(undone, 11)
+        self.assertEqual(self.manager.get_rows(sheet_a)[0][0], "0")
+
+    def test_journal_is_limited_per_sheet(self):
+        sheet = self.manager.create_spreadsheet("A", ["x"], [["0"]])
+        for value in range(SpreadsheetManager.JOURNAL_LIMIT + 5):
+            self.manager.patch_cells(sheet, [(0, 0, str(value))])
+
+        count = self.db.execute_query(
+            "SELECT COUNT(*) FROM spreadsheet_changes WHERE sheet_id = ?", (sheet,), fetchone=True
+        )[0]
+        self.assertEqual(count, SpreadsheetManager.JOURNAL_LIMIT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Ordenação e filtro do SpreadsheetTableModel (calculados em segundo plano)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer, Qt
+
+from System_Wizard import DatabaseManager, SpreadsheetManager, SpreadsheetTableModel
+
+
+class SpreadsheetModelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = SpreadsheetManager(self.db)
+        rows = [["banana", "3"], ["maçã", "1"], ["bacon", "2"], ["uva", "4"]]
+        sheet = self.manager.create_spreadsheet("A", ["nome", "qtd"], rows)
+        self.model = SpreadsheetTableModel(self.manager, sheet)
+        self.states = []
+        self.model.busy.connect(self.states.append)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def wait(self):
+        loop = QEventLoop()
+        self.model.busy.connect(lambda busy: busy or loop.quit())
+        QTimer.singleShot(5000, loop.quit)
+        if self.model.is_busy():
+            loop.exec()
+        self.assertFalse(self.model.is_busy())
+
+    def column(self, column):
+        return [self.model.data(self.model.index(row, column)) for row in range(self.model.rowCount())]
+
+    def test_sort_is_applied_when_the_scan_finishes(self):
+        self.model.fetchMore()
+        self.model.sort(1, Qt.SortOrder.DescendingOrder)
+        self.assertTrue(self.model.is_busy())
+        self.assertEqual(self.column(1), ["3", "1", "2", "4"])
+
+        self.wait()
+        self.assertEqual(self.column(1), ["4", "3", "2", "1"])
+        self.assertEqual(self.states, [True, False])
+
+    def test_filter_keeps_active_sort(self):
+        self.model.sort(1)
+        self.model.set_filter("ba")
+        self.wait()
+        self.model.fetchMore()
+        self.assertEqual(self.column(0), ["bacon", "banana"])
+        self.assertEqual(self.states, [True, False])
+
+        self.model.set_filter("")
+        self.wait()
+        self.model.fetchMore()
+        self.assertEqual(self.column(0), ["maçã", "bacon", "banana", "uva"])
+
+    def test_close_cancels_the_scan(self):
+        self.model.fetchMore()
+        self.model.sort(1)
+        self.model.close()
+        self.assertFalse(self.model.is_busy())
+        self.assertEqual(self.states, [True, False])
+
+        # O resultado da varredura cancelada não chega ao modelo
+        QTimer.singleShot(100, self.app.quit)
+        self.app.exec()
+        self.assertEqual(self.column(1), ["3", "1", "2", "4"])
+        self.assertEqual(self.states, [True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
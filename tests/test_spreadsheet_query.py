@@ -0,0 +1,88 @@
+"""Consultas sobre planilhas (SpreadsheetQuery/QueryResult)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from System_Wizard import DatabaseManager, SpreadsheetManager, SpreadsheetQuery
+
+
+class SpreadsheetQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "test.db"))
+        self.manager = SpreadsheetManager(self.db)
+        rows = [
+            ["caneta", "Recife", 2.5, 10, 2 ** 53 + 1],
+            ["lápis", "Recife", 1.0, 30, 2 ** 53 + 3],
+            ["caderno", "Natal", 12.0, 5, 2 ** 62 + 7],
+            ["borracha", "Natal", 0.5, None, 1],
+        ]
+        self.sheet = self.manager.create_spreadsheet(
+            "estoque", ["produto", "cidade", "preco", "qtd", "codigo"], rows,
+            column_types=["text", "text", "float", "int", "int"]
+        )
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def query(self):
+        return SpreadsheetQuery(self.manager, self.sheet)
+
+    def test_expressions_outside_the_allowlist_are_rejected(self):
+        for expression in ("produto.upper()", "__import__('os')", "open('x')", "preco.real > 1",
+                           "estoque > 1", "lower(produto, x=1)", "(lambda: 1)()", "[x for x in qtd]"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(Exception):
+                    self.query().where(expression).execute()
+
+    def test_where_and_compute(self):
+        result = (self.query()
+                  .compute("total", "preco * qtd")
+                  .where("total >= 25 and cidade in ['Recife', 'Natal']")
+                  .select("produto", "total")
+                  .order_by("total", descending=True)
+                  .execute())
+        self.assertEqual(result.get_rows(), [["caderno", 60], ["lápis", 30], ["caneta", 25]])
+
+    def test_functions_and_quoted_names(self):
+        result = self.query().compute("nome maiúsculo", "upper(produto)").where(
+            "contains(`nome maiúsculo`, 'CA') and not isempty(qtd)"
+        ).select("nome maiúsculo").execute()
+        self.assertEqual(result.get_rows(), [["CANETA"], ["CADERNO"]])
+
+    def test_group_by_with_aggregates(self):
+        result = (self.query()
+                  .group_by("cidade")
+                  .aggregate("count")
+                  .aggregate("sum", "qtd")
+                  .aggregate("avg", "preco")
+                  .aggregate("max", "preco")
+                  .order_by("cidade")
+                  .execute())
+        self.assertEqual(result.headers, ["cidade", "count", "sum(qtd)", "avg(preco)", "max(preco)"])
+        self.assertEqual(result.get_rows(), [["Natal", 2, 5, 6.25, 12], ["Recife", 2, 40, 1.75, 2.5]])
+
+    def test_integers_above_2_53_keep_their_value(self):
+        result = self.query().where("codigo > 2 ** 53").select("codigo").order_by("codigo").execute()
+        self.assertEqual(result.get_rows(), [[2 ** 53 + 1], [2 ** 53 + 3], [2 ** 62 + 7]])
+
+        result = self.query().group_by("codigo").aggregate("max", "codigo", "maior").order_by("codigo").execute()
+        self.assertEqual([row[0] for row in result.get_rows()], [1, 2 ** 53 + 1, 2 ** 53 + 3, 2 ** 62 + 7])
+        self.assertEqual([row[1] for row in result.get_rows()], [1, 2 ** 53 + 1, 2 ** 53 + 3, 2 ** 62 + 7])
+
+        result = self.query().where("cidade == 'Recife'").aggregate("sum", "codigo").execute()
+        self.assertEqual(result.get_rows(), [[2 ** 54 + 4]])
+
+    def test_result_saved_as_spreadsheet_keeps_integer_columns(self):
+        result = self.query().select("produto", "codigo").execute()
+        sheet = result.to_spreadsheet(self.manager, "códigos")
+        self.assertEqual(self.manager.get_column_types(sheet), ["text", "int"])
+        self.assertEqual(self.manager.get_rows(sheet, 0, 3)[2], ["caderno", 2 ** 62 + 7])
+
+
+if __name__ == "__main__":
+    unittest.main()